@@ -1,45 +1,17 @@
 import os
 import json
-from openai import OpenAI
-from dotenv import load_dotenv
+import time
+import hashlib
+import asyncio
+import threading
+from typing import Callable, Optional
 
 # The path to store the assistant ID
 ASSISTANT_ID_FILE = ".assistant_id"
+# A stored assistant ID verified this recently is used without asking OpenAI again
+ASSISTANT_VERIFY_TTL_SECONDS = float(os.getenv("LINKEDIN_ASSISTANT_VERIFY_TTL_SECONDS", "86400"))
 
-def get_assistant(client):
-    """
-    Retrieves the assistant ID from a local file.
-    """
-    # Check if the assistant ID is already stored
-    if os.path.exists(ASSISTANT_ID_FILE):
-        with open(ASSISTANT_ID_FILE, 'r') as f:
-            assistant_id = f.read().strip()
-        
-        # Verify the assistant exists on OpenAI's servers
-        try:
-            assistant = client.beta.assistants.retrieve(assistant_id)
-            print(f"Using existing assistant with ID: {assistant_id}")
-            return assistant_id
-        except Exception as e:
-            print(f"Assistant with ID {assistant_id} not found or error occurred: {str(e)}")
-            # Delete the invalid assistant ID file
-            try:
-                os.remove(ASSISTANT_ID_FILE)
-            except:
-                pass
-            return None
-    
-    return None
-
-def create_assistant(client):
-    """
-    Creates a new assistant.
-    """
-    
-    print("Creating a new assistant...")
-    assistant = client.beta.assistants.create(
-        name="LinkedIn Network Assistant",
-        instructions="""Mission: Help job seekers effectively grow their professional network by identifying valuable connections, leveraging existing relationships, and crafting tailored outreach messages. Always be empathetic, proactive, strategic, and efficient.
+ASSISTANT_INSTRUCTIONS = """Mission: Help job seekers effectively grow their professional network by identifying valuable connections, leveraging existing relationships, and crafting tailored outreach messages. Always be empathetic, proactive, strategic, and efficient.
 
 ⚠️ CRITICAL REQUIREMENT - SINGLE TOOL CALLS ⚠️
 You must only make ONE tool call at a time. If multiple tool calls are needed:
@@ -115,6 +87,7 @@ Explicitly suggest content to mention to enhance message relevance and effective
   * 2: Connection via mutual contact.
   * 3: Too distant for effective networking.
 * Retain returned data (role, location, mutual connections, etc.) and avoid redundant searches.
+* Results arrive ranked and compacted: mutual connections are a count plus the top names. When "truncated" is true, call get_more_results with the returned job_id and next_cursor only if the user needs more people.
 * Never request data you've already retrieved previously.
 
 💬 Tone & Interaction Style
@@ -148,133 +121,310 @@ Explicitly suggest content to mention to enhance message relevance and effective
 
 Remember: ONE tool call at a time, always wait for results before proceeding!
 
-""",
-        model="gpt-3.5-turbo",
-        tools=[
-            {
-                "type": "function",
-                "function": {
-                    "name": "who_do_i_know_at_company",
-                    "description": (
-                        "Use only if the user explicitly asks to find connections at a specific company. "
-                        "Returns direct (level 1) and indirect (level 2) connections at the specified company, including mutual connections."
-                        "Do NOT call this if you already have sufficient data about connections at the company."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "company": {
-                                "type": "string",
-                                "description": "Name of the company to find connections at. Never undefined. Always specific."
-                            }
-                        },
-                        "required": ["company"],
-                        "additionalProperties": False
+"""
+
+ASSISTANT_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "who_do_i_know_at_company",
+            "description": (
+                "Use only if the user explicitly asks to find connections at a specific company. "
+                "Returns direct (level 1) and indirect (level 2) connections at the specified company, including mutual connections."
+                "Do NOT call this if you already have sufficient data about connections at the company."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "company": {
+                        "type": "string",
+                        "description": "Name of the company to find connections at. Never undefined. Always specific."
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "who_works_as_role_at_company",
-                    "description": (
-                        "Use only when the user explicitly asks to find people in a specific role at a specific company. "
-                        "Returns relevant connections holding that role at the company."
-                        "Do NOT call repeatedly for already-known roles or companies."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "role": {
-                                "type": "string",
-                                "description": "Role or job title to search for. Never undefined.  Always specific."
-                            },
-                            "company": {
-                                "type": "string",
-                                "description": "Target company for search. Never undefined. Always specific."
-                            }
-                        },
-                        "required": ["role", "company"],
-                        "additionalProperties": False
+                },
+                "required": ["company"],
+                "additionalProperties": False
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "who_works_as_role_at_company",
+            "description": (
+                "Use only when the user explicitly asks to find people in a specific role at a specific company. "
+                "Returns relevant connections holding that role at the company."
+                "Do NOT call repeatedly for already-known roles or companies."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "role": {
+                        "type": "string",
+                        "description": "Role or job title to search for. Never undefined.  Always specific."
+                    },
+                    "company": {
+                        "type": "string",
+                        "description": "Target company for search. Never undefined. Always specific."
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "who_can_introduce_me_to_person",
-                    "description": (
-                        "Use explicitly when the user requests an introduction to a specific individual. "
-                        "Identify the target person by either profile_url (preferred) or both person and company."
-                        "Returns connection details and mutual contacts if applicable."
-                        "Do NOT call this unless explicitly asked."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "person": {
-                                "type": "string",
-                                "description": "Full name of the target person. Required if no profile_url."
-                            },
-                            "company": {
-                                "type": "string",
-                                "description": "Company the target person works at. Required if no profile_url. Always specific."
-                            },
-                            "profile_url": {
-                                "type": "string",
-                                "description": "Direct LinkedIn profile URL. Provide this exclusively if available."
-                            }
-                        },
-                        "required": [],
-                        "additionalProperties": False
+                },
+                "required": ["role", "company"],
+                "additionalProperties": False
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "who_can_introduce_me_to_person",
+            "description": (
+                "Use explicitly when the user requests an introduction to a specific individual. "
+                "Identify the target person by either profile_url (preferred) or both person and company."
+                "Returns connection details and mutual contacts if applicable."
+                "Do NOT call this unless explicitly asked."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "person": {
+                        "type": "string",
+                        "description": "Full name of the target person. Required if no profile_url."
+                    },
+                    "company": {
+                        "type": "string",
+                        "description": "Company the target person works at. Required if no profile_url. Always specific."
+                    },
+                    "profile_url": {
+                        "type": "string",
+                        "description": "Direct LinkedIn profile URL. Provide this exclusively if available."
+                    }
+                },
+                "required": [],
+                "additionalProperties": False
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "who_does_person_know_at_company",
+            "description": (
+                "Use explicitly if the user requests the connections a specific person has at a specified company. "
+                "Target person must be a direct (1st-level) connection."
+                "Provide either profile_url (preferred) or person_name. Always provide company_name."
+                "Do NOT call without explicit user instruction."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "person_name": {
+                        "type": "string",
+                        "description": "Full name of the direct connection to search. Required if no profile_url."
+                    },
+                    "company_name": {
+                        "type": "string",
+                        "description": "Target company for searching connections. Always specific."
+                    },
+                    "profile_url": {
+                        "type": "string",
+                        "description": "Direct LinkedIn profile URL. Provide this exclusively if available."
                     }
-                }
-            },
-            {
-                "type": "function",
-                "function": {
-                    "name": "who_does_person_know_at_company",
-                    "description": (
-                        "Use explicitly if the user requests the connections a specific person has at a specified company. "
-                        "Target person must be a direct (1st-level) connection."
-                        "Provide either profile_url (preferred) or person_name. Always provide company_name."
-                        "Do NOT call without explicit user instruction."
-                    ),
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "person_name": {
-                                "type": "string",
-                                "description": "Full name of the direct connection to search. Required if no profile_url."
-                            },
-                            "company_name": {
-                                "type": "string",
-                                "description": "Target company for searching connections. Always specific."
-                            },
-                            "profile_url": {
-                                "type": "string",
-                                "description": "Direct LinkedIn profile URL. Provide this exclusively if available."
-                            }
-                        },
-                        "required": ["company_name"],
-                        "additionalProperties": False
+                },
+                "required": ["company_name"],
+                "additionalProperties": False
+            }
+        }
+    },
+    {
+        "type": "function",
+        "function": {
+            "name": "get_more_results",
+            "description": (
+                "Fetch the next page of a truncated result from any of the other tools. "
+                "Use only when the user needs more people than the previous result contained."
+            ),
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "job_id of the truncated result."
+                    },
+                    "cursor": {
+                        "type": "string",
+                        "description": "next_cursor of the truncated result."
                     }
-                }
+                },
+                "required": ["job_id", "cursor"],
+                "additionalProperties": False
             }
-        ]
+        }
+    }
+]
+
+# Stored assistants created with other instructions or tools are updated to these
+ASSISTANT_CONFIG_VERSION = hashlib.sha1(json.dumps([ASSISTANT_INSTRUCTIONS, ASSISTANT_TOOLS], sort_keys=True)
+                                        .encode("utf-8")).hexdigest()[:12]
+
+def openai_client():
+    """OpenAI client for OPENAI_API_KEY, or None when the key isn't set; openai is imported on first use"""
+    api_key = os.getenv("OPENAI_API_KEY")
+    if not api_key:
+        return None
+    from openai import OpenAI
+    return OpenAI(api_key=api_key)
+
+def get_assistant(client):
+    """
+    Retrieves the assistant ID from a local file.
+    """
+    # Check if the assistant ID is already stored
+    if os.path.exists(ASSISTANT_ID_FILE):
+        with open(ASSISTANT_ID_FILE, 'r') as f:
+            assistant_id = f.readline().strip()
+        
+        # Verify the assistant exists on OpenAI's servers
+        try:
+            assistant = client.beta.assistants.retrieve(assistant_id)
+            print(f"Using existing assistant with ID: {assistant_id}")
+            return assistant_id
+        except Exception as e:
+            print(f"Assistant with ID {assistant_id} not found or error occurred: {str(e)}")
+            # Delete the invalid assistant ID file
+            try:
+                os.remove(ASSISTANT_ID_FILE)
+            except:
+                pass
+            return None
+    
+    return None
+
+def create_assistant(client, id_file: str = ASSISTANT_ID_FILE):
+    """
+    Creates a new assistant.
+    """
+    
+    print("Creating a new assistant...")
+    assistant = client.beta.assistants.create(
+        name="LinkedIn Network Assistant",
+        instructions=ASSISTANT_INSTRUCTIONS,
+        model="gpt-3.5-turbo",
+        tools=ASSISTANT_TOOLS,
+        metadata={"config_version": ASSISTANT_CONFIG_VERSION}
     )
     
     assistant_id = assistant.id
     print(f"New assistant created with ID: {assistant_id}")
     
     # Store the new assistant ID
-    with open(ASSISTANT_ID_FILE, 'w') as f:
-        f.write(assistant_id)
+    store_assistant_id(id_file, assistant_id)
         
     return assistant_id 
 
+def update_assistant(client, assistant_id: str, id_file: str = ASSISTANT_ID_FILE):
+    """Bring an existing assistant's instructions and tools up to the current configuration"""
+    print(f"Updating assistant {assistant_id} to configuration {ASSISTANT_CONFIG_VERSION}")
+    client.beta.assistants.update(assistant_id, instructions=ASSISTANT_INSTRUCTIONS, tools=ASSISTANT_TOOLS,
+                                  metadata={"config_version": ASSISTANT_CONFIG_VERSION})
+    store_assistant_id(id_file, assistant_id)
+
+def store_assistant_id(id_file: str, assistant_id: str):
+    """Store the assistant ID, with the configuration version it was created or updated with on the second line"""
+    with open(id_file, 'w') as f:
+        f.write(f"{assistant_id}\n{ASSISTANT_CONFIG_VERSION}")
+
+class AssistantResolver:
+    """Resolves the assistant ID on a background thread, so importing or starting the server needs no network.
+
+    A stored ID verified within ASSISTANT_VERIFY_TTL_SECONDS, on the current configuration, is
+    used as is (the file's mtime is the verification time). Otherwise it is checked with OpenAI:
+    an assistant on older instructions or tools is updated, an ID OpenAI no longer knows is
+    replaced by a new assistant, and a failed check (offline, no key) keeps the stored ID.
+    """
+
+    def __init__(self, id_file: str = ASSISTANT_ID_FILE, client_factory: Callable = openai_client,
+                 verify_ttl_seconds: float = ASSISTANT_VERIFY_TTL_SECONDS):
+        self.id_file = id_file
+        self.client_factory = client_factory
+        self.verify_ttl_seconds = verify_ttl_seconds
+        self.assistant_id: Optional[str] = None
+        self.verified = False
+        self.error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._done = threading.Event()
+
+    def start(self):
+        """Begin resolving in the background; later calls do nothing"""
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self.resolve, name="assistant-resolver", daemon=True)
+                self._thread.start()
+
+    def _stored_lines(self) -> list:
+        try:
+            with open(self.id_file, 'r') as f:
+                return [line.strip() for line in f.read().splitlines()]
+        except OSError:
+            return []
+
+    def stored_id(self) -> Optional[str]:
+        lines = self._stored_lines()
+        return lines[0] or None if lines else None
+
+    def stored_config_version(self) -> Optional[str]:
+        lines = self._stored_lines()
+        return lines[1] if len(lines) > 1 else None
+
+    def resolve(self) -> Optional[str]:
+        try:
+            self.assistant_id = self.stored_id()
+            current = self.stored_config_version() == ASSISTANT_CONFIG_VERSION
+            if self.assistant_id and current and time.time() - os.path.getmtime(self.id_file) < self.verify_ttl_seconds:
+                self.verified = True
+                return self.assistant_id
+            client = self.client_factory()
+            if client is None:
+                self.error = "OPENAI_API_KEY environment variable not set."
+                return self.assistant_id
+            if self.assistant_id:
+                try:
+                    assistant = client.beta.assistants.retrieve(self.assistant_id)
+                    if (getattr(assistant, "metadata", None) or {}).get("config_version") != ASSISTANT_CONFIG_VERSION:
+                        update_assistant(client, self.assistant_id, self.id_file)
+                    elif not current:
+                        store_assistant_id(self.id_file, self.assistant_id)
+                    os.utime(self.id_file)
+                    self.verified = True
+                    return self.assistant_id
+                except Exception as e:
+                    if getattr(e, "status_code", None) != 404:
+                        self.error = f"Could not verify assistant {self.assistant_id}: {e}"
+                        return self.assistant_id
+                    print(f"Assistant with ID {self.assistant_id} not found; creating a new one")
+            self.assistant_id = create_assistant(client, self.id_file)
+            self.verified = True
+            self.error = None
+        except Exception as e:
+            self.error = f"Could not resolve assistant: {e}"
+        finally:
+            self._done.set()
+        return self.assistant_id
+
+    async def wait(self, timeout: float) -> Optional[str]:
+        """The assistant ID once resolved (or whatever is known at the timeout)"""
+        self.start()
+        await asyncio.to_thread(self._done.wait, timeout)
+        return self.assistant_id
+
+    def status(self) -> dict:
+        return {"assistant_id": self.assistant_id, "resolved": self._done.is_set(),
+                "verified": self.verified, "error": self.error}
+
+# Create a global assistant resolver instance
+assistant_resolver = AssistantResolver()
+
 # main function to create a new assistant
 if __name__ == "__main__":
+    from dotenv import load_dotenv
     load_dotenv()
-    client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-    create_assistant(client)
\ No newline at end of file
+    create_assistant(openai_client())
\ No newline at end of file
@@ -0,0 +1,27 @@
+import os
+import json
+import threading
+from typing import Callable, IO
+
+def replace_atomically(path: str, write: Callable[[IO], None], binary: bool = False):
+    """Write a file through a temporary file renamed over it, so readers see the old file or the new one,
+    never part of one. The parent directory is created if it doesn't exist yet."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    mode = "wb" if binary else "w"
+    try:
+        try:
+            f = open(tmp_path, mode)
+        except FileNotFoundError:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            f = open(tmp_path, mode)
+        with f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def write_json_atomic(path: str, data, **dump_kwargs):
+    """json.dump data to path atomically"""
+    replace_atomically(path, lambda f: json.dump(data, f, **dump_kwargs))
@@ -0,0 +1,94 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from cache_store import CACHE_DIR, save_to_cache
+from job_events import job_events, TERMINAL_STATUSES
+
+# Most queries accepted in one batch
+BATCH_MAX_ITEMS = int(os.getenv("LINKEDIN_BATCH_MAX_ITEMS", "100"))
+# Longest a batch waits for an item whose job another request is already running
+BATCH_MAX_WAIT_SECONDS = float(os.getenv("LINKEDIN_BATCH_MAX_WAIT_SECONDS", "1800"))
+
+BATCH_FILE_PREFIX = "_batch_"
+
+# Query (assistant tool) name -> parameters it accepts
+BATCH_QUERIES = {
+    "who_do_i_know_at_company": ("company",),
+    "who_works_as_role_at_company": ("role", "company"),
+    "who_can_introduce_me_to_person": ("profile_url", "person", "company"),
+    "who_does_person_know_at_company": ("profile_url", "person_name", "company_name"),
+}
+# Parameters a query can't run without; the other queries check their own combinations
+BATCH_REQUIRED = {
+    "who_do_i_know_at_company": ("company",),
+    "who_works_as_role_at_company": ("role", "company"),
+}
+
+def parse_batch_queries(queries: List[dict]) -> List[Tuple[str, dict]]:
+    """(query name, params) per batch item; raises ValueError for anything malformed"""
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("Provide a non-empty list of queries")
+    if len(queries) > BATCH_MAX_ITEMS:
+        raise ValueError(f"A batch takes at most {BATCH_MAX_ITEMS} queries")
+    parsed = []
+    for index, query in enumerate(queries):
+        if not isinstance(query, dict) or query.get("query") not in BATCH_QUERIES:
+            raise ValueError(f"Query {index}: 'query' must be one of {', '.join(BATCH_QUERIES)}")
+        params = {key: value for key, value in query.items() if key != "query"}
+        unknown = set(params) - set(BATCH_QUERIES[query["query"]])
+        if unknown:
+            raise ValueError(f"Query {index}: unknown parameters {', '.join(sorted(unknown))}")
+        missing = [key for key in BATCH_REQUIRED.get(query["query"], ()) if not params.get(key)]
+        if missing:
+            raise ValueError(f"Query {index}: missing {', '.join(missing)}")
+        parsed.append((query["query"], params))
+    return parsed
+
+class BatchJob:
+    """State of one /batch request, stored as a job document so /job_status and the event stream serve it.
+
+    Each item moves from "queued" (the batch scrapes it) or "waiting" (another job produces
+    it) to "complete" or "error"; every change is pushed as an "item" event on the batch's job id.
+    """
+
+    def __init__(self, queries: List[Tuple[str, dict]], cache_dir: str = CACHE_DIR):
+        self.batch_id = os.path.join(cache_dir, f"{BATCH_FILE_PREFIX}{uuid.uuid4().hex}.json").replace('\\', '/')
+        self.items: List[dict] = [{"index": i, "query": name, "params": params, "status": "queued", "job_id": None}
+                                  for i, (name, params) in enumerate(queries)]
+        self.timestamp = datetime.now().isoformat()
+        self._saved_status: Optional[str] = None
+
+    @property
+    def is_done(self) -> bool:
+        return all(item["status"] in TERMINAL_STATUSES for item in self.items)
+
+    def document(self) -> dict:
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+        return {"batch_id": self.batch_id, "job_id": self.batch_id,
+                "status": "complete" if self.is_done else "processing",
+                "timestamp": self.timestamp, "counts": counts, "items": self.items}
+
+    def update(self, index: int, status: str, job_id: Optional[str] = None, source: Optional[str] = None,
+               result: Optional[dict] = None, error: Optional[str] = None, publish: bool = True):
+        """Record an item's new state and push it to the batch's subscribers"""
+        item = self.items[index]
+        item["status"] = status
+        for key, value in (("job_id", job_id), ("source", source), ("result", result), ("error", error)):
+            if value is not None:
+                item[key] = value
+        if publish:
+            job_events.publish(self.batch_id, "item", dict(item))
+
+    def items_with_status(self, status: str) -> List[dict]:
+        return [item for item in self.items if item["status"] == status]
+
+    def save(self):
+        """Write the batch document. Status changes notify the save listeners, so streams and
+        long-polls on the batch wake up; item updates in between are quiet rewrites."""
+        document = self.document()
+        changed = document["status"] != self._saved_status
+        save_to_cache(self.batch_id, document, notify=changed)
+        self._saved_status = document["status"]
@@ -0,0 +1,139 @@
+import os
+import time
+import asyncio
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+# Launch the browser and log in at server startup (opt-in: it opens a browser window)
+BROWSER_PREWARM_ENABLED = os.getenv("LINKEDIN_BROWSER_PREWARM", "0") == "1"
+# Logged-in pages kept open and idle, so the next jobs start scraping immediately
+BROWSER_PREWARM_PAGES = int(os.getenv("LINKEDIN_BROWSER_PREWARM_PAGES", "2"))
+# Neutral page the idle pages wait on
+BROWSER_PREWARM_URL = os.getenv("LINKEDIN_BROWSER_PREWARM_URL", "about:blank")
+
+class LeasedBrowser:
+    """The warm browser as one job sees it: closing it closes only the job's page"""
+
+    def __init__(self, pool: "BrowserPool", page):
+        self._pool = pool
+        self.page = page
+
+    def __getattr__(self, name):
+        return getattr(self._pool.browser, name)
+
+    async def close(self):
+        await self._pool.release(self.page)
+
+class BrowserPool:
+    """A browser launched and logged in ahead of the first query, with idle pages on a neutral URL.
+
+    Jobs lease a page (an idle one, or a new one in the logged-in context) instead of launching
+    their own browser; a leased page is closed when the job closes its browser, and the pool
+    tops the idle pages back up. When the pool isn't ready, jobs launch browsers as before.
+    """
+
+    def __init__(self, pages: int = BROWSER_PREWARM_PAGES, url: str = BROWSER_PREWARM_URL):
+        self.pages = pages
+        self.url = url
+        self.state = "cold"
+        self.error: Optional[str] = None
+        self.warm_seconds: Optional[float] = None
+        self.browser = None
+        self.context = None
+        self.playwright = None
+        self._idle: List = []
+        self._leased: set = set()
+        self._refill_lock = asyncio.Lock()
+        self._refill_tasks: set = set()
+        self._warmed: Optional[asyncio.Event] = None
+
+    async def warm(self, launch: Callable[[], Awaitable[Tuple]]) -> bool:
+        """Launch and log in through launch() (which returns browser, logged-in page, playwright), then open idle pages"""
+        if self.state in ("warming", "ready"):
+            return self.state == "ready"
+        self.state = "warming"
+        self._warmed = asyncio.Event()
+        started = time.perf_counter()
+        try:
+            browser, page, playwright = await launch()
+            if not browser or not page:
+                raise RuntimeError("Failed to initialize browser or login to LinkedIn")
+            self.browser, self.context, self.playwright = browser, page.context, playwright
+            await page.goto(self.url)
+            self._idle.append(page)
+            await self._refill()
+            self.state = "ready"
+            self.error = None
+        except Exception as e:
+            self.state = "failed"
+            self.error = str(e)
+            print(f"Browser pre-warm failed, jobs will launch their own browsers: {e}")
+        finally:
+            self._warmed.set()
+        if self.state == "ready":
+            self.warm_seconds = round(time.perf_counter() - started, 3)
+            print(f"Browser pre-warmed in {self.warm_seconds}s with {len(self._idle)} idle pages")
+        return self.state == "ready"
+
+    def is_ready(self) -> bool:
+        if self.state == "ready" and not self.browser.is_connected():
+            self.state = "failed"
+            self.error = "Browser disconnected"
+        return self.state == "ready"
+
+    async def acquire(self) -> Optional[LeasedBrowser]:
+        """Lease a logged-in page, or None when the pool isn't ready. A job arriving during warm-up
+        waits for it rather than launching a second browser."""
+        if self.state == "warming":
+            await self._warmed.wait()
+        if not self.is_ready():
+            return None
+        page = self._idle.pop() if self._idle else await self.context.new_page()
+        self._leased.add(page)
+        task = asyncio.create_task(self._refill())
+        self._refill_tasks.add(task)
+        task.add_done_callback(self._refill_tasks.discard)
+        return LeasedBrowser(self, page)
+
+    async def release(self, page):
+        """Close a leased page; releasing twice is harmless"""
+        if page not in self._leased:
+            return
+        self._leased.discard(page)
+        try:
+            await page.close()
+        except Exception as e:
+            print(f"Could not close pooled page: {e}")
+
+    async def _refill(self):
+        async with self._refill_lock:
+            try:
+                while self.context is not None and len(self._idle) < self.pages:
+                    page = await self.context.new_page()
+                    await page.goto(self.url)
+                    self._idle.append(page)
+            except Exception as e:
+                print(f"Could not open idle page: {e}")
+
+    async def close(self):
+        """Shut the warm browser down"""
+        browser, playwright = self.browser, self.playwright
+        self.state = "cold"
+        self.browser = self.context = self.playwright = None
+        self._idle, self._leased = [], set()
+        if browser:
+            await browser.close()
+        if playwright:
+            await playwright.stop()
+
+    def status(self) -> dict:
+        return {
+            "enabled": BROWSER_PREWARM_ENABLED,
+            "state": self.state,
+            "idle_pages": len(self._idle),
+            "leased_pages": len(self._leased),
+            "warm_seconds": self.warm_seconds,
+            "error": self.error
+        }
+
+# Create a global browser pool instance
+browser_pool = BrowserPool()
@@ -0,0 +1,248 @@
+import os
+import re
+import sys
+import json
+import hashlib
+import unicodedata
+import urllib.parse
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+from atomic_files import write_json_atomic
+
+# Legal suffixes that never distinguish two companies
+COMPANY_SUFFIXES = {"inc", "llc", "ltd", "limited", "corp", "corporation", "co", "company", "plc", "gmbh", "ag", "sa"}
+
+# Well known renames; learned aliases are added on top of these
+SEED_COMPANY_ALIASES = {
+    "facebook": "meta",
+    "meta platforms": "meta",
+    "alphabet": "google",
+    "amazon web services": "amazon",
+    "aws": "amazon",
+}
+
+# Honorifics and credentials people add to their display names
+NAME_NOISE = {"dr", "mr", "mrs", "ms", "prof", "phd", "mba", "md", "cpa", "pmp", "jr", "sr", "ii", "iii"}
+
+# Fraction of a company search's headlines that must name the same employer before it is learned as an alias
+ALIAS_LEARN_THRESHOLD = 0.9
+# Headlines naming an employer a company search needs before it can teach an alias
+ALIAS_LEARN_MIN_PEOPLE = 10
+
+def _fold(value: str) -> str:
+    """Lowercase, strip accents and collapse whitespace"""
+    value = unicodedata.normalize("NFKD", str(value))
+    value = "".join(c for c in value if not unicodedata.combining(c))
+    return " ".join(value.lower().split())
+
+def normalize_company(name: str) -> str:
+    """Normalize a company name without applying aliases.
+
+    Punctuation that carries meaning (AT&T vs ATT) is kept; legal suffixes are dropped.
+    """
+    if not name:
+        return ""
+    words = re.findall(r"[\w&+.'-]+", _fold(name))
+    words = [w.strip(".,'-") for w in words]
+    while len(words) > 1 and words[-1].replace(".", "") in COMPANY_SUFFIXES:
+        words.pop()
+    return " ".join(w for w in words if w)
+
+def normalize_person_name(name: str) -> str:
+    """Normalize a person's display name (accents, case, credentials and honorifics)"""
+    if not name:
+        return ""
+    # Credentials usually follow a comma: "Jane Doe, PhD"
+    name = _fold(name).split(",")[0]
+    words = [w.strip(".") for w in re.findall(r"[\w.'-]+", name)]
+    return " ".join(w for w in words if w and w not in NAME_NOISE)
+
+def normalize_profile_url(url: str) -> str:
+    """Canonical https://www.linkedin.com/in/<slug> form of a profile URL.
+
+    Tracking query strings, fragments, locale subdomains and trailing slashes are removed.
+    URLs that are not /in/ profiles are returned with only the query string stripped.
+    """
+    if not url:
+        return ""
+    url = url.strip()
+    if url.startswith("/"):
+        url = "https://www.linkedin.com" + url
+    parsed = urllib.parse.urlsplit(url)
+    match = re.match(r"/in/([^/]+)", parsed.path)
+    if not match:
+        return urllib.parse.urlunsplit((parsed.scheme, parsed.netloc.lower(), parsed.path.rstrip("/"), "", ""))
+    slug = urllib.parse.unquote(match.group(1)).lower()
+    return f"https://www.linkedin.com/in/{urllib.parse.quote(slug)}"
+
+def headline_company(role: str) -> Optional[str]:
+    """Employer named in a headline such as 'Engineer at Meta' or 'PM @ Meta | ex-Google'"""
+    if not role:
+        return None
+    match = re.search(r"(?:\bat\b|@)\s+([^|,;•·]+)", role, flags=re.IGNORECASE)
+    if not match:
+        return None
+    return normalize_company(match.group(1)) or None
+
+class CompanyAliasTable:
+    """Maps company name variants to one canonical name, learning aliases from scraped results.
+
+    Learned aliases only widen matching (headlines, indexes, plans). Cache keys use the seed
+    aliases alone (canonical(name, learned=False)), so learning never moves an entry to a new key.
+    """
+
+    def __init__(self, path: Optional[str] = None, seeds: Dict[str, str] = None):
+        self.path = path
+        self.seeds: Dict[str, str] = dict(SEED_COMPANY_ALIASES if seeds is None else seeds)
+        self.learned: Dict[str, str] = {}
+        self.aliases: Dict[str, str] = dict(self.seeds)
+        self._load()
+
+    def _load(self):
+        if self.path and os.path.exists(self.path):
+            try:
+                with open(self.path, 'r') as f:
+                    stored = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"Could not load company aliases from {self.path}: {e}")
+                return
+            # Older files hold the seeds too
+            self.learned = {alias: target for alias, target in stored.items() if self.seeds.get(alias) != target}
+            self.aliases.update(self.learned)
+
+    def _save(self):
+        if self.path:
+            write_json_atomic(self.path, self.learned, indent=2, sort_keys=True)
+
+    def canonical(self, name: str, learned: bool = True) -> str:
+        """Canonical company name, following alias chains; learned=False applies the seed aliases only"""
+        aliases = self.aliases if learned else self.seeds
+        key = normalize_company(name)
+        seen = set()
+        while key in aliases and key not in seen:
+            seen.add(key)
+            key = aliases[key]
+        return key
+
+    def add_alias(self, alias: str, canonical: str) -> bool:
+        """Record alias -> canonical. Returns True if the table changed."""
+        alias_key = normalize_company(alias)
+        target = self.canonical(canonical)
+        if not alias_key or not target or alias_key == target or self.aliases.get(alias_key) == target:
+            return False
+        # Refuse aliases that would create a cycle
+        if self.canonical(target) == alias_key:
+            return False
+        self.aliases[alias_key] = target
+        self.learned[alias_key] = target
+        self._save()
+        return True
+
+    def learn(self, company: str, people: Iterable[dict]) -> Optional[str]:
+        """Learn an alias when nearly all headlines of a company search name one different employer.
+
+        A search for "Facebook" whose people all say "... at Meta" records facebook -> meta. Nothing
+        is learned while any headline still names the searched company, or when one name extends
+        the other ("Google" vs "Google DeepMind"): that is a division or parent, not a rename.
+        Returns the learned canonical name, if any.
+        """
+        employers = [headline_company(p.get("role")) for p in people]
+        employers = [e for e in employers if e]
+        if len(employers) < ALIAS_LEARN_MIN_PEOPLE:
+            return None
+        employer, count = Counter(employers).most_common(1)[0]
+        if count / len(employers) < ALIAS_LEARN_THRESHOLD:
+            return None
+        searched = self.canonical(company)
+        if any(self.canonical(e) == searched for e in employers):
+            return None
+        searched_words, employer_words = normalize_company(company).split(), employer.split()
+        shorter = min(len(searched_words), len(employer_words))
+        if searched_words[:shorter] == employer_words[:shorter]:
+            return None
+        if self.add_alias(company, employer):
+            print(f"Learned company alias: '{company}' -> '{self.canonical(employer)}'")
+            return self.canonical(employer)
+        return None
+
+def canonical_params(aliases: CompanyAliasTable, **kwargs) -> Dict[str, str]:
+    """Canonical value of every non-empty query parameter (seed company aliases only, see CompanyAliasTable)"""
+    params = {}
+    for key, value in sorted(kwargs.items()):
+        if not value:
+            continue
+        if key in ("company", "company_name"):
+            params[key] = aliases.canonical(value, learned=False)
+        elif key in ("person", "person_name"):
+            params[key] = normalize_person_name(value)
+        elif key == "profile_url":
+            params[key] = normalize_profile_url(value)
+        else:
+            params[key] = _fold(value)
+    return params
+
+def make_cache_key(query_name: str, aliases: CompanyAliasTable, **kwargs) -> str:
+    """Stable cache key: readable slug plus a hash of the canonical parameters.
+
+    The slug keeps filenames recognizable; the hash keeps values that slugify the same
+    (AT&T vs ATT) in separate entries.
+    """
+    params = canonical_params(aliases, **kwargs)
+    if not params:
+        return query_name
+    slug = "_".join(re.sub(r'[\W_]+', '', v) for v in params.values())[:60]
+    digest = hashlib.sha1(json.dumps([query_name, params], sort_keys=True).encode("utf-8")).hexdigest()[:10]
+    return f"{query_name}_{slug}_{digest}" if slug else f"{query_name}_{digest}"
+
+def legacy_cache_key(query_name: str, **kwargs) -> str:
+    """The pre-canonicalization key: lowercased values with every non-word character stripped"""
+    parts = [query_name]
+    for key, value in sorted(kwargs.items()):
+        if value:
+            parts.append(re.sub(r'[\W_]+', '', str(value).lower()))
+    return "_".join(parts)
+
+def compare_hit_rates(lookups: List[Tuple[str, dict]], aliases: CompanyAliasTable) -> dict:
+    """Replay cache lookups and report the hit rate under legacy and canonical keys.
+
+    Each lookup is a (query_name, params) pair; the first lookup of a key is a miss and
+    every repeat is a hit, as with a cache that never expires.
+    """
+    report = {"lookups": len(lookups)}
+    for label, key_fn in (("legacy", lambda q, p: legacy_cache_key(q, **p)),
+                          ("canonical", lambda q, p: make_cache_key(q, aliases, **p))):
+        seen, hits = set(), 0
+        for query_name, params in lookups:
+            key = key_fn(query_name, params)
+            hits += key in seen
+            seen.add(key)
+        report[label] = {
+            "distinct_keys": len(seen),
+            "hits": hits,
+            "hit_rate": round(hits / len(lookups), 4) if lookups else 0.0
+        }
+    return report
+
+def read_cache_lookups(log_file: str) -> List[Tuple[str, dict]]:
+    """Read cache_lookup entries written by the server's structured logger"""
+    lookups = []
+    with open(log_file, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get("operation") == "cache_lookup" and entry.get("query_name"):
+                lookups.append((entry["query_name"], entry.get("params") or {}))
+    return lookups
+
+if __name__ == "__main__":
+    # Report cache hit rate before and after canonicalization for a server log file
+    if len(sys.argv) < 2:
+        print("Usage: python cache_keys.py <log file> [<log file> ...]")
+        sys.exit(1)
+    from cache_store import company_aliases
+    all_lookups = []
+    for log_file in sys.argv[1:]:
+        all_lookups.extend(read_cache_lookups(log_file))
+    print(json.dumps(compare_hit_rates(all_lookups, company_aliases), indent=2))
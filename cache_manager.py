@@ -0,0 +1,280 @@
+import os
+import re
+import json
+import time
+import asyncio
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+from atomic_files import write_json_atomic
+from cache_store import CACHE_DIR, CACHE_MAX_AGE_HOURS
+from batch_jobs import BATCH_FILE_PREFIX
+from logger_config import logger, LogCategory
+
+# Disk budget for the whole cache directory (results plus profile sub-cache)
+CACHE_MAX_MB = float(os.getenv("LINKEDIN_CACHE_MAX_MB", "500"))
+# "lru" evicts the least recently accessed entries first, "lfu" the least frequently accessed
+CACHE_EVICTION_POLICY = os.getenv("LINKEDIN_CACHE_EVICTION_POLICY", "lru").lower()
+# Error entries are only kept long enough for a client to read them
+ERROR_RETENTION_HOURS = float(os.getenv("LINKEDIN_CACHE_ERROR_RETENTION_HOURS", "1"))
+# A processing marker older than this belongs to a job that died
+PROCESSING_TIMEOUT_HOURS = float(os.getenv("LINKEDIN_PROCESSING_TIMEOUT_HOURS", "6"))
+# Completed results are dropped once they are this many times older than the freshness window
+STALE_RETENTION_FACTOR = float(os.getenv("LINKEDIN_CACHE_STALE_RETENTION_FACTOR", "4"))
+# Batch documents are kept this long after their last update
+BATCH_RETENTION_HOURS = float(os.getenv("LINKEDIN_BATCH_RETENTION_HOURS", "24"))
+# Seconds between background maintenance passes
+CACHE_MAINTENANCE_INTERVAL = float(os.getenv("LINKEDIN_CACHE_MAINTENANCE_INTERVAL", "600"))
+
+# Access statistics are kept this long after an entry's last lookup, even once its file is gone,
+# so the cache warmer still finds popular queries whose entries were compacted or evicted
+ACCESS_RETENTION_DAYS = float(os.getenv("LINKEDIN_CACHE_ACCESS_RETENTION_DAYS", "30"))
+
+ACCESS_STATS_FILE = "_access_stats.json"
+# Eviction stops once usage drops below this fraction of the budget
+LOW_WATERMARK = 0.9
+# Only this much of each file is read to find its status and timestamp
+HEAD_BYTES = 4096
+
+STATUS_PATTERN = re.compile(r'"status":\s*"(\w+)"')
+TIMESTAMP_PATTERN = re.compile(r'"timestamp":\s*"([^"]+)"')
+
+@dataclass
+class CacheEntry:
+    path: str
+    name: str
+    size: int
+    mtime: float
+    status: Optional[str]
+    timestamp: Optional[float]
+
+def query_type(name: str) -> str:
+    """Query name a cache file belongs to, e.g. company_people_search_acme_1a2b.json -> company_people_search"""
+    if name.startswith("profiles/"):
+        return "profile_mutuals"
+    for known in ("company_people_search", "role_search", "entire_network_crawl",
+                  "mutual_connections", "connections_through_person"):
+        if name.startswith(known):
+            return known
+    return name.split("_")[0]
+
+class CacheManager:
+    """Keeps CACHE_DIR within a disk budget and tracks per-entry access statistics"""
+
+    def __init__(self, cache_dir: str, max_bytes: int = None, policy: str = None):
+        self.cache_dir = cache_dir
+        self.max_bytes = int(CACHE_MAX_MB * 1024 * 1024) if max_bytes is None else max_bytes
+        self.policy = policy or CACHE_EVICTION_POLICY
+        self.stats_path = os.path.join(cache_dir, ACCESS_STATS_FILE)
+        self._lock = threading.Lock()
+        self.access: Dict[str, dict] = {}
+        self.query_stats: Dict[str, dict] = {}
+        self.last_maintenance: Optional[dict] = None
+        self._maintenance_listeners: List[Callable[[], None]] = []
+        # Processing markers written before this process started belong to jobs that died with it
+        self.started_at = time.time()
+        self._load_stats()
+
+    def _load_stats(self):
+        if os.path.exists(self.stats_path):
+            try:
+                with open(self.stats_path, 'r') as f:
+                    data = json.load(f)
+                self.access = data.get("access", {})
+                self.query_stats = data.get("query_stats", {})
+            except (OSError, ValueError) as e:
+                print(f"Could not load cache access stats: {e}")
+
+    def save_stats(self):
+        """Persist access statistics so eviction decisions survive restarts"""
+        with self._lock:
+            data = {"access": dict(self.access), "query_stats": dict(self.query_stats)}
+        write_json_atomic(self.stats_path, data)
+
+    def _entry_name(self, cache_filename: str) -> str:
+        return os.path.relpath(cache_filename, self.cache_dir).replace('\\', '/')
+
+    def record_lookup(self, query_params: dict, cache_filename: str, cache_hit: bool):
+        """Record an endpoint cache lookup (hit or miss) for eviction and hit-rate stats"""
+        name = query_params.get("query_name")
+        params = {k: v for k, v in query_params.items() if k != "query_name"}
+        logger.info(LogCategory.CACHE, "cache_lookup", query_name=name, params=params, cache_hit=cache_hit)
+        with self._lock:
+            counters = self.query_stats.setdefault(name, {"hits": 0, "misses": 0})
+            counters["hits" if cache_hit else "misses"] += 1
+            entry = self.access.setdefault(self._entry_name(cache_filename), {"count": 0})
+            entry["count"] += 1
+            entry["last_access"] = time.time()
+            entry["query_name"] = name
+            entry["params"] = params
+
+    def scan(self) -> List[CacheEntry]:
+        """List cache entries with their size and status, reading only the head of each file"""
+        entries = []
+        for directory, prefix in ((self.cache_dir, ""), (os.path.join(self.cache_dir, "profiles"), "profiles/")):
+            if not os.path.isdir(directory):
+                continue
+            with os.scandir(directory) as it:
+                for item in it:
+                    if not item.is_file() or not item.name.endswith(".json") or item.name.startswith("_"):
+                        continue
+                    stat = item.stat()
+                    status, timestamp = self._read_head(item.path)
+                    entries.append(CacheEntry(item.path, prefix + item.name, stat.st_size, stat.st_mtime,
+                                              status, timestamp or stat.st_mtime))
+        return entries
+
+    def scan_batches(self) -> List[CacheEntry]:
+        """List the /batch documents, which scan() skips with the other internal files; their timestamp is the last update"""
+        entries = []
+        if not os.path.isdir(self.cache_dir):
+            return entries
+        with os.scandir(self.cache_dir) as it:
+            for item in it:
+                if not item.is_file() or not item.name.startswith(BATCH_FILE_PREFIX) or not item.name.endswith(".json"):
+                    continue
+                stat = item.stat()
+                status, _ = self._read_head(item.path)
+                entries.append(CacheEntry(item.path, item.name, stat.st_size, stat.st_mtime, status, stat.st_mtime))
+        return entries
+
+    def _read_head(self, path: str):
+        try:
+            with open(path, 'r', encoding='utf-8', errors='replace') as f:
+                head = f.read(HEAD_BYTES)
+        except OSError:
+            return None, None
+        status = STATUS_PATTERN.search(head)
+        timestamp = TIMESTAMP_PATTERN.search(head)
+        parsed = None
+        if timestamp:
+            try:
+                parsed = datetime.fromisoformat(timestamp.group(1)).timestamp()
+            except ValueError:
+                parsed = None
+        return (status.group(1) if status else None), parsed
+
+    def _remove(self, entry: CacheEntry, reason: str) -> bool:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            return False
+        logger.info(LogCategory.CACHE, "cache_entry_removed", entry=entry.name, reason=reason, bytes=entry.size)
+        return True
+
+    def compact(self) -> dict:
+        """Drop old error entries, orphaned processing markers, long-stale results and old batch documents.
+
+        Background jobs don't survive a restart, so processing markers from before startup are orphaned.
+        """
+        now = time.time()
+        removed = {"error": 0, "orphaned_processing": 0, "stale": 0, "batch": 0}
+        for entry in self.scan():
+            age_hours = (now - entry.timestamp) / 3600
+            if entry.status == "error" and age_hours > ERROR_RETENTION_HOURS:
+                removed["error"] += self._remove(entry, "error")
+            elif entry.status == "processing" and (entry.timestamp < self.started_at or age_hours > PROCESSING_TIMEOUT_HOURS):
+                removed["orphaned_processing"] += self._remove(entry, "orphaned_processing")
+            elif age_hours > CACHE_MAX_AGE_HOURS * STALE_RETENTION_FACTOR:
+                removed["stale"] += self._remove(entry, "stale")
+        for entry in self.scan_batches():
+            if entry.status == "processing" and entry.timestamp < self.started_at:
+                removed["orphaned_processing"] += self._remove(entry, "orphaned_processing")
+            elif (now - entry.timestamp) / 3600 > BATCH_RETENTION_HOURS:
+                removed["batch"] += self._remove(entry, "batch")
+        return removed
+
+    def _eviction_key(self, entry: CacheEntry):
+        access = self.access.get(entry.name, {})
+        last_access = access.get("last_access", entry.mtime)
+        if self.policy == "lfu":
+            return (access.get("count", 0), last_access)
+        return (last_access, access.get("count", 0))
+
+    def evict(self) -> dict:
+        """Evict entries until the cache fits in LOW_WATERMARK of the budget"""
+        entries = self.scan()
+        total = sum(e.size for e in entries)
+        evicted, freed = 0, 0
+        if total > self.max_bytes:
+            target = self.max_bytes * LOW_WATERMARK
+            # Never evict a running job's marker
+            candidates = sorted((e for e in entries if e.status != "processing"), key=self._eviction_key)
+            for entry in candidates:
+                if total - freed <= target:
+                    break
+                if self._remove(entry, f"evicted_{self.policy}"):
+                    evicted += 1
+                    freed += entry.size
+        return {"evicted": evicted, "freed_bytes": freed, "bytes_before": total}
+
+    def prune_access(self, retention_days: float = ACCESS_RETENTION_DAYS) -> int:
+        """Drop access statistics not looked up for retention_days"""
+        cutoff = time.time() - retention_days * 86400
+        with self._lock:
+            expired = [name for name, entry in self.access.items() if entry.get("last_access", 0) < cutoff]
+            for name in expired:
+                del self.access[name]
+        return len(expired)
+
+    def add_maintenance_listener(self, listener: Callable[[], None]):
+        """Call listener() after every maintenance pass, e.g. to expire indexes built from removed entries"""
+        self._maintenance_listeners.append(listener)
+
+    def maintain(self) -> dict:
+        """One compaction plus eviction pass; safe to run in a worker thread"""
+        start_time = time.time()
+        result = {"compacted": self.compact(), **self.evict()}
+        result["access_pruned"] = self.prune_access()
+        self.save_stats()
+        for listener in self._maintenance_listeners:
+            try:
+                listener()
+            except Exception as e:
+                logger.error(LogCategory.CACHE, "cache_maintenance_listener", error=e)
+        duration_ms = (time.time() - start_time) * 1000
+        logger.info(LogCategory.CACHE, "cache_maintenance", duration_ms=duration_ms, **result)
+        self.last_maintenance = {**result, "timestamp": datetime.now().isoformat(), "duration_ms": round(duration_ms, 2)}
+        return result
+
+    def stats(self) -> dict:
+        """Entries, bytes, status breakdown and hit rate per query type"""
+        entries = self.scan()
+        by_type: Dict[str, dict] = {}
+        for entry in entries:
+            bucket = by_type.setdefault(query_type(entry.name), {"entries": 0, "bytes": 0, "by_status": {}})
+            bucket["entries"] += 1
+            bucket["bytes"] += entry.size
+            status = entry.status or "unknown"
+            bucket["by_status"][status] = bucket["by_status"].get(status, 0) + 1
+        with self._lock:
+            for name, counters in self.query_stats.items():
+                bucket = by_type.setdefault(name, {"entries": 0, "bytes": 0, "by_status": {}})
+                lookups = counters["hits"] + counters["misses"]
+                bucket["hits"] = counters["hits"]
+                bucket["misses"] = counters["misses"]
+                bucket["hit_rate"] = round(counters["hits"] / lookups, 4) if lookups else 0.0
+        total = sum(e.size for e in entries)
+        return {
+            "entries": len(entries),
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "usage_percent": round(total / self.max_bytes * 100, 2) if self.max_bytes else None,
+            "policy": self.policy,
+            "by_query_type": by_type,
+            "last_maintenance": self.last_maintenance,
+            "timestamp": datetime.now().isoformat()
+        }
+
+    async def run_forever(self, interval: float = CACHE_MAINTENANCE_INTERVAL):
+        """Background maintenance loop; file scanning runs in a thread so requests are never blocked"""
+        while True:
+            try:
+                await asyncio.to_thread(self.maintain)
+            except Exception as e:
+                logger.error(LogCategory.CACHE, "cache_maintenance", error=e)
+            await asyncio.sleep(interval)
+
+# Create a global cache manager instance
+cache_manager = CacheManager(CACHE_DIR)
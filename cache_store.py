@@ -0,0 +1,135 @@
+import os
+import json
+import asyncio
+from datetime import datetime
+from typing import Callable, List, Optional
+from cache_keys import CompanyAliasTable, make_cache_key
+from atomic_files import write_json_atomic
+
+# Define the cache directory; it is created on first write, not at import
+CACHE_DIR = os.getenv("LINKEDIN_CACHE_DIR", "cache")
+
+# Cached datasets older than this are not used to answer other queries
+CACHE_MAX_AGE_HOURS = float(os.getenv("LINKEDIN_CACHE_MAX_AGE_HOURS", "168"))
+
+# Company alias table, learned from scraped results and persisted next to the cache
+company_aliases = CompanyAliasTable(os.path.join(CACHE_DIR, "_company_aliases.json"))
+
+# Bumped when the cache key format changes; files saved under older keys are moved once
+CACHE_KEY_VERSION = 2
+CACHE_KEY_VERSION_FILE = "_cache_keys.json"
+
+# Document fields holding each query's parameters, in the combinations the endpoints use
+QUERY_PARAM_FIELDS = {
+    "company_people_search": [("company",)],
+    "role_search": [("role", "company")],
+    "mutual_connections": [("profile_url",), ("person", "company")],
+    "connections_through_person": [("profile_url", "company_name"), ("person_name", "company_name")],
+}
+
+def get_cache_filename(query_name: str, **kwargs) -> str:
+    """Generate a cache filename from a query name and canonicalized parameters."""
+    filename = make_cache_key(query_name, company_aliases, **kwargs) + ".json"
+    # Always return a web-friendly path with forward slashes
+    return os.path.join(CACHE_DIR, filename).replace('\\', '/')
+
+def ensure_cache_dir():
+    """Create CACHE_DIR if it doesn't exist yet"""
+    os.makedirs(CACHE_DIR, exist_ok=True)
+
+# Callbacks run after every cache write, e.g. to update in-memory indexes
+_save_listeners: List[Callable[[str, dict], None]] = []
+
+def add_save_listener(listener: Callable[[str, dict], None]):
+    """Register a callback(filename, data) that runs after every save_to_cache"""
+    _save_listeners.append(listener)
+
+def save_to_cache(filename, data, notify: bool = True):
+    """Save data to cache file atomically: readers see the old document or the new one, never part of one.
+
+    notify=False skips the save listeners, for in-place updates that aren't a new job state.
+    """
+    write_json_atomic(filename, data, indent=2)
+    if not notify:
+        return
+    for listener in _save_listeners:
+        try:
+            listener(filename, data)
+        except Exception as e:
+            print(f"Cache save listener failed for {filename}: {e}")
+
+def load_from_cache(filename: str) -> dict:
+    """Load data from cache file"""
+    if os.path.exists(filename):
+        with open(filename, 'r') as f:
+            return json.load(f)
+    return None
+
+async def save_to_cache_async(filename, data, notify: bool = True):
+    """save_to_cache on a worker thread, so serializing and writing a large result doesn't stall the event loop"""
+    await asyncio.to_thread(save_to_cache, filename, data, notify)
+
+async def load_from_cache_async(filename: str) -> dict:
+    """load_from_cache on a worker thread"""
+    return await asyncio.to_thread(load_from_cache, filename)
+
+def data_age_seconds(data: dict) -> Optional[float]:
+    """Seconds since a cached document was written, or None if it has no timestamp"""
+    timestamp = (data or {}).get("timestamp")
+    if not timestamp:
+        return None
+    try:
+        return (datetime.now() - datetime.fromisoformat(timestamp)).total_seconds()
+    except ValueError:
+        return None
+
+def is_fresh(data: dict, max_age_hours: float = None) -> bool:
+    """Check that a cached document is complete and younger than the max age"""
+    if not data or data.get("status") != "complete":
+        return False
+    age = data_age_seconds(data)
+    if age is None:
+        return False
+    max_age_hours = CACHE_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+    return age <= max_age_hours * 3600
+
+def query_params_of(query_name: str, data: dict) -> Optional[dict]:
+    """The parameters a cached document was requested with, read back from its fields"""
+    for fields in QUERY_PARAM_FIELDS.get(query_name, []):
+        if all(data.get(field) for field in fields):
+            return {field: data[field] for field in fields}
+    return None
+
+def migrate_cache_keys(cache_dir: str = None) -> dict:
+    """Move completed results saved under an older key format (the pre-canonical keys, or keys
+    that applied learned company aliases) to their current key. Runs once per CACHE_KEY_VERSION;
+    a file whose current key is already taken is left for cache maintenance to expire."""
+    cache_dir = cache_dir or CACHE_DIR
+    version_path = os.path.join(cache_dir, CACHE_KEY_VERSION_FILE)
+    counts = {"moved": 0, "kept": 0}
+    if not os.path.isdir(cache_dir) or (load_from_cache(version_path) or {}).get("version") == CACHE_KEY_VERSION:
+        return counts
+    for name in sorted(os.listdir(cache_dir)):
+        query_name = next((q for q in QUERY_PARAM_FIELDS if name.startswith(q + "_")), None)
+        if not query_name or not name.endswith(".json"):
+            continue
+        path = os.path.join(cache_dir, name)
+        try:
+            data = load_from_cache(path)
+        except (OSError, ValueError):
+            continue
+        params = query_params_of(query_name, data or {}) if (data or {}).get("status") == "complete" else None
+        if params is None:
+            continue
+        target = make_cache_key(query_name, company_aliases, **params) + ".json"
+        if target == name:
+            continue
+        if os.path.exists(os.path.join(cache_dir, target)):
+            counts["kept"] += 1
+            continue
+        os.replace(path, os.path.join(cache_dir, target))
+        counts["moved"] += 1
+    write_json_atomic(version_path, {"version": CACHE_KEY_VERSION, "migrated_at": datetime.now().isoformat(), **counts})
+    if counts["moved"] or counts["kept"]:
+        print(f"Cache key migration: moved {counts['moved']} files to their current key, kept {counts['kept']} superseded ones")
+    return counts
@@ -0,0 +1,132 @@
+import os
+import time
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Awaitable, Callable, Dict, List, Optional
+from cache_store import CACHE_MAX_AGE_HOURS, get_cache_filename, load_from_cache, data_age_seconds
+from cache_manager import cache_manager, CacheManager
+from rate_limiter import rate_limiter, RateLimiter
+from logger_config import logger, LogCategory
+
+# Number of most popular company and role queries kept warm
+WARM_TOP_N = int(os.getenv("LINKEDIN_WARM_TOP_N", "20"))
+# Re-scrape once cached data has used up this fraction of the freshness window
+WARM_REFRESH_FRACTION = float(os.getenv("LINKEDIN_WARM_REFRESH_FRACTION", "0.75"))
+# No interactive lookups for this long means the server is idle
+WARM_IDLE_SECONDS = float(os.getenv("LINKEDIN_WARM_IDLE_SECONDS", "300"))
+# Upper bound on warming scrapes, on top of the browser_init rate limit
+WARM_MAX_JOBS_PER_HOUR = int(os.getenv("LINKEDIN_WARM_MAX_JOBS_PER_HOUR", "4"))
+# Seconds between warming checks
+WARM_INTERVAL = float(os.getenv("LINKEDIN_WARM_INTERVAL", "120"))
+# Popularity halves every this many days without a lookup
+WARM_HALF_LIFE_DAYS = 7.0
+
+WARMABLE_QUERIES = ("company_people_search", "role_search")
+
+@dataclass
+class WarmCandidate:
+    query_name: str
+    params: Dict[str, str]
+    score: float
+    data_age_seconds: Optional[float]
+
+class CacheWarmer:
+    """Re-scrapes the most frequently queried companies and roles while the server is idle"""
+
+    def __init__(self, manager: CacheManager = None, limiter: RateLimiter = None, top_n: int = WARM_TOP_N):
+        self.manager = manager or cache_manager
+        self.limiter = limiter or rate_limiter
+        self.top_n = top_n
+        self.warm_history: List[float] = []
+        self.last_warmed: Optional[dict] = None
+
+    def popularity(self) -> List[WarmCandidate]:
+        """Warmable queries ranked by access count, decayed by time since the last lookup"""
+        now = time.time()
+        candidates = []
+        with self.manager._lock:
+            access = {name: dict(entry) for name, entry in self.manager.access.items()}
+        for entry in access.values():
+            if entry.get("query_name") not in WARMABLE_QUERIES or not entry.get("params"):
+                continue
+            age_days = (now - entry.get("last_access", now)) / 86400
+            score = entry.get("count", 0) * 0.5 ** (age_days / WARM_HALF_LIFE_DAYS)
+            candidates.append(WarmCandidate(entry["query_name"], entry["params"], score, None))
+        candidates.sort(key=lambda c: c.score, reverse=True)
+        return candidates[:self.top_n]
+
+    def due(self) -> List[WarmCandidate]:
+        """Popular queries whose cached data is missing, failed or close to going stale"""
+        refresh_after = CACHE_MAX_AGE_HOURS * 3600 * WARM_REFRESH_FRACTION
+        due = []
+        for candidate in self.popularity():
+            data = load_from_cache(get_cache_filename(candidate.query_name, **candidate.params))
+            if data and data.get("status") == "processing":
+                continue
+            age = data_age_seconds(data) if data and data.get("status") == "complete" else None
+            if age is None or age >= refresh_after:
+                candidate.data_age_seconds = age
+                due.append(candidate)
+        return due
+
+    def is_idle(self) -> bool:
+        """No interactive cache lookups recently"""
+        with self.manager._lock:
+            last_lookup = max((e.get("last_access", 0) for e in self.manager.access.values()), default=0)
+        return time.time() - last_lookup >= WARM_IDLE_SECONDS
+
+    def has_budget(self) -> bool:
+        """Warming stays within its hourly cap and the shared browser_init rate limit"""
+        now = time.time()
+        self.warm_history = [t for t in self.warm_history if now - t < 3600]
+        return len(self.warm_history) < WARM_MAX_JOBS_PER_HOUR and self.limiter.check_rate_limit("browser_init")
+
+    async def warm_once(self, run_job: Callable[[str, dict], Awaitable[dict]],
+                        browser_idle: Callable[[], bool] = lambda: True) -> Optional[WarmCandidate]:
+        """Warm the most popular due query if the server is idle and there is budget; returns it"""
+        if not (self.is_idle() and browser_idle() and self.has_budget()):
+            return None
+        due = await asyncio.to_thread(self.due)
+        if not due:
+            return None
+        candidate = due[0]
+        self.limiter.record_request("browser_init")
+        self.warm_history.append(time.time())
+        start_time = time.time()
+        logger.info(LogCategory.CACHE, "cache_warm_start", query_name=candidate.query_name,
+                    params=candidate.params, score=round(candidate.score, 3), data_age_seconds=candidate.data_age_seconds)
+        try:
+            result = await run_job(candidate.query_name, candidate.params)
+            status = (result or {}).get("status", "unknown")
+        except Exception as e:
+            logger.error(LogCategory.CACHE, "cache_warm", error=e, query_name=candidate.query_name, params=candidate.params)
+            status = "error"
+        logger.info(LogCategory.CACHE, "cache_warm", query_name=candidate.query_name, params=candidate.params,
+                    duration_ms=(time.time() - start_time) * 1000, result_status=status)
+        self.last_warmed = {"query_name": candidate.query_name, "params": candidate.params,
+                            "status": status, "timestamp": datetime.now().isoformat()}
+        return candidate
+
+    async def run_forever(self, run_job: Callable[[str, dict], Awaitable[dict]],
+                          browser_idle: Callable[[], bool] = lambda: True, interval: float = WARM_INTERVAL):
+        """Background warming loop"""
+        while True:
+            try:
+                await self.warm_once(run_job, browser_idle)
+            except Exception as e:
+                logger.error(LogCategory.CACHE, "cache_warm_loop", error=e)
+            await asyncio.sleep(interval)
+
+    def status(self) -> dict:
+        """Current warming candidates and recent activity"""
+        return {
+            "top_queries": [{"query_name": c.query_name, "params": c.params, "score": round(c.score, 3)}
+                            for c in self.popularity()],
+            "warm_jobs_last_hour": len([t for t in self.warm_history if time.time() - t < 3600]),
+            "max_jobs_per_hour": WARM_MAX_JOBS_PER_HOUR,
+            "last_warmed": self.last_warmed
+        }
+
+# Create a global cache warmer instance
+cache_warmer = CacheWarmer()
@@ -1,4 +1,8 @@
 // LinkedIn Network Assistant Client
+
+// Token budget for results handed to the assistant; the server ranks and compacts them to fit
+const TOOL_OUTPUT_MAX_TOKENS = 4000;
+
 class LinkedInAssistant {
     constructor() {
         console.log("LinkedInAssistant constructor called");
@@ -319,10 +323,10 @@ class LinkedInAssistant {
                 return "server_processing";
             }
             
-            // For immediate results, submit them back
+            // For immediate results, submit them back (already compacted by the server)
             await this.submitToolOutputs(runId, [{
                 tool_call_id: toolCall.id,
-                output: result.status === 'complete' ? JSON.stringify(result.results) : JSON.stringify(result.error)
+                output: result.status === 'complete' ? JSON.stringify(result) : JSON.stringify(result.error)
             }]);
             return "server_complete";
             
@@ -357,10 +361,16 @@ class LinkedInAssistant {
                 endpoint = 'http://localhost:8001/who_does_person_know_at_company?company_name=' + encodeURIComponent(args.company_name) + '&' + (args.profile_url ? 'profile_url=' + encodeURIComponent(args.profile_url) : 'person_name=' + encodeURIComponent(args.person_name));
                 requestBody = null;
                 method = 'GET';
+            } else if (functionName === 'get_more_results') {
+                endpoint = `http://localhost:8001/job_status/${args.job_id}?cursor=` + encodeURIComponent(args.cursor);
+                requestBody = null;
+                method = 'GET';
             } else {
                 console.error(`Unknown function: ${functionName}`);
                 throw new Error(`Unknown function: ${functionName}`);
             }
+            // Cached and finished results come back ranked and compacted to the token budget
+            endpoint += `&max_tokens=${TOOL_OUTPUT_MAX_TOKENS}`;
 
             console.log(`Fetching from endpoint: ${method} ${endpoint}`);
             const response = await fetch(endpoint, {
@@ -383,8 +393,8 @@ class LinkedInAssistant {
                     userMsgId: userMsgId
                 };
                
-                // Start polling but don't wait for it
-                this.pollJobStatus(result.job_id, requestId, asyncContext);
+                // Follow the job's event stream (or poll) but don't wait for it
+                this.watchJob(result.job_id, requestId, asyncContext);
             }
 
             // For immediate results, return them
@@ -729,72 +739,141 @@ class LinkedInAssistant {
         }
     }
 
+    describeProgress(progress) {
+        // One line for a job's progress record: what it is doing and roughly how long is left
+        let text;
+        if (progress.phase === 'search') {
+            text = `searching page ${progress.pages.done + 1}${progress.pages.max ? ` of up to ${progress.pages.max}` : ''}`;
+        } else if (progress.phase === 'profiles' && progress.profiles.total) {
+            text = `${progress.profiles.done} of ${progress.profiles.total} profiles`;
+        } else {
+            text = 'starting';
+        }
+        if (progress.eta_seconds > 0) {
+            const minutes = Math.round(progress.eta_seconds / 60);
+            text += minutes >= 1 ? `, about ${minutes} min left` : ', less than a minute left';
+        }
+        return `Processing... ${text}.`;
+    }
+
+    pollWait(progress) {
+        // Seconds the server may hold the next long-poll: it answers at once when the status
+        // changes, so the ETA only shortens the hold for a job about to finish (fresher progress)
+        if (!progress || !(progress.eta_seconds >= 0)) {
+            return 25;
+        }
+        return Math.min(Math.max(Math.ceil(progress.eta_seconds) + 2, 5), 25);
+    }
+
+    updateAsyncProgress(requestId, text) {
+        document.querySelectorAll(`.async-indicator[data-request-id="${requestId}"]`).forEach(indicator => {
+            indicator.title = text;
+        });
+    }
+
+    watchJob(jobId, requestId, asyncContext) {
+        // Server-Sent Events push progress and results as they are scraped; polling is the fallback
+        if (typeof EventSource === 'undefined') {
+            return this.pollJobStatus(jobId, requestId, asyncContext);
+        }
+        return new Promise((resolve, reject) => {
+            const source = new EventSource(`http://localhost:8001/jobs/${jobId}/events`);
+            let finished = false;
+            let peopleFound = 0;
+            const settle = (outcome) => {
+                finished = true;
+                source.close();
+                outcome.then(resolve, reject);
+            };
+
+            source.addEventListener('people', (event) => {
+                peopleFound += JSON.parse(event.data).people.length;
+                this.updateAsyncProgress(requestId, `Processing... ${peopleFound} people found so far.`);
+            });
+            source.addEventListener('progress', (event) => {
+                const progress = JSON.parse(event.data);
+                if (progress.pages) {
+                    this.updateAsyncProgress(requestId, this.describeProgress(progress));
+                }
+            });
+            source.addEventListener('status', (event) => {
+                const data = JSON.parse(event.data);
+                if (data.status === 'complete' || data.status === 'error') {
+                    settle(this.finishJob(data, requestId, asyncContext));
+                }
+            });
+            source.onerror = () => {
+                if (finished) return;
+                console.warn(`Event stream for job ${jobId} unavailable, falling back to polling`);
+                settle(this.pollJobStatus(jobId, requestId, asyncContext));
+            };
+        });
+    }
+
+    async finishJob(data, requestId, asyncContext) {
+        // Hand a finished job's results (or error) back to the assistant run that asked for it
+        if (!asyncContext) {
+            return data;
+        }
+        const isComplete = data.status === 'complete';
+        try {
+            await this.submitToolOutputs(asyncContext.run_id, [{
+                tool_call_id: asyncContext.tool_call_id,
+                output: JSON.stringify(isComplete ? await this.compactResult(asyncContext.job_id, data) : data.error)
+            }]);
+
+            // Poll for the run completion to get the assistant's response
+            const runResult = await this.pollRun(asyncContext.run_id, asyncContext.userMsgId, asyncContext.originalContent, false);
+
+            // Store the result with the context for when user clicks notification
+            const resultContext = {
+                ...asyncContext,
+                assistantResponse: runResult
+            };
+            if (!isComplete) {
+                resultContext.error = data.error;
+            }
+            // Only update UI after we have the assistant's response
+            this.updateAsyncIndicator(requestId, isComplete ? 'complete' : 'error', resultContext);
+        } catch (error) {
+            console.error(`Error processing ${isComplete ? 'complete' : 'failed'} job:`, error);
+            this.updateAsyncIndicator(requestId, 'error', { error: error.message });
+            throw error;
+        }
+        return data;
+    }
+
+    async compactResult(jobId, data) {
+        // The finished job's top results compacted to the token budget, with a handle for more
+        try {
+            const response = await fetch(`http://localhost:8001/job_status/${jobId}?max_tokens=${TOOL_OUTPUT_MAX_TOKENS}`);
+            if (response.ok) {
+                return await response.json();
+            }
+        } catch (error) {
+            console.warn(`Could not compact results of job ${jobId}:`, error);
+        }
+        return data.results;
+    }
+
     async pollJobStatus(jobId, requestId, asyncContext) {
         let retries = 0;
-        const maxRetries = 360; // 30 minutes with 5-second intervals
+        let wait = 25;
+        const maxRetries = 360; // back-to-back long-polls of up to 25 s each
         
         while (retries < maxRetries) {
             try {
-                const response = await fetch(`http://localhost:8001/job_status/${jobId}`);
+                // The server holds the request until the job's status changes (or the wait passes)
+                const response = await fetch(`http://localhost:8001/job_status/${jobId}?wait=${wait}`);
                 const data = await response.json();
                 
-                if (data.status === 'complete') {
-                    if (asyncContext) {
-                        try {
-                            // Submit results back to assistant
-                            await this.submitToolOutputs(asyncContext.run_id, [{
-                                tool_call_id: asyncContext.tool_call_id,
-                                output: JSON.stringify(data.results)
-                            }]);
-                            
-                            // Poll for the run completion
-                            const runResult = await this.pollRun(asyncContext.run_id, asyncContext.userMsgId, asyncContext.originalContent, false);
-                            
-                            // Store the result with the context for when user clicks notification
-                            const resultContext = {
-                                ...asyncContext,
-                                assistantResponse: runResult
-                            };
-
-                            // Only update UI after we have the assistant's response
-                            this.updateAsyncIndicator(requestId, 'complete', resultContext);
-                            
-                        } catch (error) {
-                            console.error('Error processing complete job:', error);
-                            this.updateAsyncIndicator(requestId, 'error', { error: error.message });
-                            throw error;
-                        }
-                    }
-                    return data;
-                } else if (data.status === 'error') {
-                    if (asyncContext) {
-                        try {
-                            // Submit error to assistant
-                            await this.submitToolOutputs(asyncContext.run_id, [{
-                                tool_call_id: asyncContext.tool_call_id,
-                                output: JSON.stringify(data.error)
-                            }]);
-                            
-                            // Poll for the run completion to get assistant's error handling response
-                            const runResult = await this.pollRun(asyncContext.run_id, asyncContext.userMsgId, asyncContext.originalContent, false);
-                            
-                            // Store the error result with context
-                            const resultContext = {
-                                ...asyncContext,
-                                assistantResponse: runResult,
-                                error: data.error
-                            };
-                            // Only update UI after we have the assistant's response
-                            this.updateAsyncIndicator(requestId, 'error', resultContext);
-                        } catch (error) {
-                            console.error('Error processing job error:', error);
-                            this.updateAsyncIndicator(requestId, 'error', { error: error.message });
-                            throw error;
-                        }
-                    }
-                    return data;
+                if (data.status === 'complete' || data.status === 'error') {
+                    return await this.finishJob(data, requestId, asyncContext);
                 } else if (data.status === 'processing') {
-                    await new Promise(resolve => setTimeout(resolve, 5000));
+                    if (data.progress) {
+                        this.updateAsyncProgress(requestId, this.describeProgress(data.progress));
+                    }
+                    wait = this.pollWait(data.progress);
                     retries++;
                 } else {
                     throw new Error(`Unknown status: ${data.status}`);
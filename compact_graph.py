@@ -0,0 +1,340 @@
+import sys
+import json
+import time
+import threading
+import tracemalloc
+from array import array
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Dict, List, Optional
+from cache_keys import normalize_profile_url
+from cache_store import company_aliases
+from network_graph import NetworkGraph, ME, GRAPH_RETENTION_HOURS, apply_mutuals, apply_result, load_cache_dir
+if TYPE_CHECKING:
+    import numpy as np
+
+# Per-person string attributes, each stored as a column of string table ids
+PERSON_COLUMNS = ("url", "name", "role", "location", "company")
+
+class StringTable:
+    """Frozen interned strings: one UTF-8 blob plus offsets, so each distinct string costs its bytes only"""
+
+    def __init__(self, offsets: "np.ndarray", blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    @classmethod
+    def from_strings(cls, strings: List[str]) -> "StringTable":
+        import numpy as np
+        encoded = [s.encode("utf-8") for s in strings]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return cls(offsets, b"".join(encoded))
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i: int) -> str:
+        return bytes(self.blob[self.offsets[i]:self.offsets[i + 1]]).decode("utf-8")
+
+    @property
+    def nbytes(self) -> int:
+        return self.offsets.nbytes + len(self.blob)
+
+def unix_time(timestamp: Optional[str]) -> float:
+    """Unix seconds for an ISO timestamp; 0 when missing or unreadable"""
+    try:
+        return datetime.fromisoformat(timestamp).timestamp() if timestamp else 0.0
+    except ValueError:
+        return 0.0
+
+class CompactGraph:
+    """Read-only network graph in compact form.
+
+    People are dense integer ids (0 is me) with columnar attributes referencing an
+    interned string table; adjacency is CSR (indptr/indices). A URL lookup is a binary
+    search over url_order, so no per-person Python objects are kept. fetched_at holds when
+    each person's full mutual list was fetched (unix seconds, 0 for never).
+    """
+
+    def __init__(self, strings: StringTable, columns: Dict[str, "np.ndarray"], levels: "np.ndarray",
+                 indptr: "np.ndarray", indices: "np.ndarray", url_order: "np.ndarray", fetched_at: "np.ndarray" = None):
+        import numpy as np
+        self.strings = strings
+        self.columns = columns
+        self.levels = levels
+        self.indptr = indptr
+        self.indices = indices
+        self.url_order = url_order
+        self.fetched_at = np.zeros(len(levels)) if fetched_at is None else fetched_at
+        # Set when loaded from a snapshot
+        self.built_at: Optional[str] = None
+
+    @property
+    def person_count(self) -> int:
+        return len(self.levels)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.indices) // 2
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [*self.columns.values(), self.levels, self.indptr, self.indices, self.url_order, self.fetched_at]
+        return self.strings.nbytes + sum(a.nbytes for a in arrays)
+
+    def url(self, pid: int) -> str:
+        return self.strings[self.columns["url"][pid]]
+
+    def id_for(self, profile_url: str) -> Optional[int]:
+        """Person id for a profile URL (any variant), or None"""
+        key = ME if profile_url == ME else normalize_profile_url(profile_url)
+        lo, hi = 0, len(self.url_order)
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.url(int(self.url_order[mid])) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(self.url_order) and self.url(int(self.url_order[lo])) == key:
+            return int(self.url_order[lo])
+        return None
+
+    def neighbour_ids(self, pid: int) -> "np.ndarray":
+        return self.indices[self.indptr[pid]:self.indptr[pid + 1]]
+
+    def person(self, pid: int) -> dict:
+        record = {column: self.strings[self.columns[column][pid]] for column in PERSON_COLUMNS}
+        record["profile_url"] = record.pop("url")
+        record["connection_level"] = int(self.levels[pid]) or None
+        return record
+
+    def get_person(self, profile_url: str) -> Optional[dict]:
+        pid = self.id_for(profile_url)
+        return None if pid is None else self.person(pid)
+
+    def neighbours(self, profile_url: str) -> List[str]:
+        pid = self.id_for(profile_url)
+        return [] if pid is None else [self.url(int(n)) for n in self.neighbour_ids(pid)]
+
+    def mutuals_fetched_at(self, profile_url: str) -> Optional[str]:
+        pid = self.id_for(profile_url)
+        if pid is None or not self.fetched_at[pid]:
+            return None
+        return datetime.fromtimestamp(float(self.fetched_at[pid])).isoformat()
+
+    def introducers_for(self, profile_url: str) -> Optional[List[dict]]:
+        """Same contract as NetworkGraph.introducers_for, answered from the arrays"""
+        pid = self.id_for(profile_url)
+        if pid is None or pid == 0 or not self.fetched_at[pid]:
+            return None
+        neighbours = self.neighbour_ids(pid)
+        first_degree = neighbours[(neighbours != 0) & (self.levels[neighbours] == 1)]
+        if len(first_degree) == 0 and 0 not in neighbours:
+            return None
+        introducers = []
+        for n in first_degree.tolist():
+            person = self.person(n)
+            person.pop("company")
+            introducers.append(person)
+        return introducers
+
+    def stats(self) -> dict:
+        return {"people": self.person_count - 1, "edges": self.edge_count,
+                "first_degree": len(self.neighbour_ids(0)), "bytes": self.nbytes}
+
+class CompactGraphBuilder:
+    """Accumulates people and edges into flat arrays, then freezes them into a CompactGraph.
+
+    Shares NetworkGraph's result parsing, so it can be fed cached results directly
+    without building the dict form first. Edge records are only appended, so links older
+    than their person's latest full mutual list (or the retention window) are dropped in build().
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._strings: List[str] = [""]
+        self._string_ids: Dict[str, int] = {"": 0}
+        self._ids: Dict[str, int] = {ME: 0}
+        self._columns = {column: array("I", [0]) for column in PERSON_COLUMNS}
+        self._columns["url"][0] = self._intern(ME)
+        self._levels = array("b", [0])
+        self._src = array("i")
+        self._dst = array("i")
+        self._seen = array("d")
+        self._fetched: Dict[int, float] = {}
+        self._cutoff = 0.0
+        self.loaded_files = 0
+        self.ready = False
+
+    def _intern(self, value: str) -> int:
+        sid = self._string_ids.get(value)
+        if sid is None:
+            sid = self._string_ids[value] = len(self._strings)
+            self._strings.append(value)
+        return sid
+
+    def add_person(self, person: dict, connection_level: Optional[int] = None, company: Optional[str] = None,
+                   seen_at: Optional[str] = None) -> Optional[str]:
+        key = normalize_profile_url(person.get("profile_url"))
+        if not key:
+            return None
+        pid = self._ids.get(key)
+        if pid is None:
+            pid = self._ids[key] = len(self._levels)
+            for column in PERSON_COLUMNS:
+                self._columns[column].append(0)
+            self._columns["url"][pid] = self._intern(key)
+            self._levels.append(0)
+        for column in ("name", "role", "location"):
+            if person.get(column):
+                self._columns[column][pid] = self._intern(person[column])
+        if company:
+            self._columns["company"][pid] = self._intern(company_aliases.canonical(company))
+        level = connection_level or person.get("connection_level")
+        if level and (self._levels[pid] == 0 or level < self._levels[pid]):
+            self._levels[pid] = level
+        if self._levels[pid] == 1:
+            self._link(ME, key)
+        return key
+
+    def add_mutuals(self, target: dict, mutual_connections: List[dict], target_level: Optional[int] = 2,
+                    company: Optional[str] = None, seen_at: Optional[str] = None) -> Optional[str]:
+        return apply_mutuals(self, target, mutual_connections, target_level, company, seen_at)
+
+    def add_result(self, data: dict, query_name: str):
+        apply_result(self, data, query_name)
+
+    def load_from_cache_dir(self, cache_dir: str) -> int:
+        return load_cache_dir(self, cache_dir)
+
+    def _link(self, a: str, b: str, seen_at: Optional[str] = None):
+        if a and b and a != b:
+            self._src.append(self._ids[a])
+            self._dst.append(self._ids[b])
+            self._seen.append(unix_time(seen_at))
+
+    def _begin_mutuals(self, key: str, fetched_at: Optional[str]) -> bool:
+        pid = self._ids[key]
+        previous, fetched = self._fetched.get(pid), unix_time(fetched_at)
+        if previous and (not fetched or fetched < previous):
+            return False
+        if fetched:
+            self._fetched[pid] = fetched
+        return True
+
+    def _is_current(self, key: str, seen_at: Optional[str]) -> bool:
+        fetched = self._fetched.get(self._ids[key])
+        return not fetched or unix_time(seen_at) >= fetched
+
+    def expire(self, max_age_hours: float = None):
+        """Leave links and mutual lists older than the retention window out of the build"""
+        max_age_hours = GRAPH_RETENTION_HOURS if max_age_hours is None else max_age_hours
+        self._cutoff = (datetime.now() - timedelta(hours=max_age_hours)).timestamp()
+
+    def stats(self) -> dict:
+        return {"people": len(self._levels) - 1, "edge_records": len(self._src)}
+
+    def build(self) -> CompactGraph:
+        """Symmetrize and dedupe the edge list, then lay it out as CSR"""
+        import numpy as np
+        n = len(self._levels)
+        src = np.frombuffer(self._src, dtype=np.int32).astype(np.int64)
+        dst = np.frombuffer(self._dst, dtype=np.int32).astype(np.int64)
+        seen = np.frombuffer(self._seen, dtype=np.float64)
+        levels = np.array(self._levels, dtype=np.int8)
+        fetched = np.zeros(n)
+        if self._fetched:
+            fetched[list(self._fetched)] = list(self._fetched.values())
+        fetched[fetched < self._cutoff] = 0.0
+        # A link to a 1st degree contact is superseded when the other end's mutual list is newer
+        superseded = lambda a, b: (seen < fetched[a]) & (b != 0) & (levels[b] == 1)
+        keep = ~(superseded(src, dst) | superseded(dst, src)) & ((seen == 0) | (seen >= self._cutoff))
+        src, dst = src[keep], dst[keep]
+        # Both directions, packed into one sortable key per edge; unique() sorts and dedupes at once
+        keys = np.unique(np.concatenate((src << 32 | dst, dst << 32 | src)))
+        rows = (keys >> 32).astype(np.int32)
+        indices = (keys & 0xFFFFFFFF).astype(np.int32)
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=n), out=indptr[1:])
+        columns = {column: np.array(self._columns[column], dtype=np.uint32) for column in PERSON_COLUMNS}
+        url_ids = list(self._ids.items())
+        url_ids.sort()
+        url_order = np.array([pid for _, pid in url_ids], dtype=np.int32)
+        return CompactGraph(StringTable.from_strings(self._strings), columns, levels, indptr, indices,
+                            url_order, fetched)
+
+def from_network_graph(graph: NetworkGraph) -> CompactGraph:
+    """Convert the live dict-of-sets graph into compact form"""
+    builder = CompactGraphBuilder()
+    with graph._lock:
+        for key, node in graph.people.items():
+            company = sorted(node["companies"])[0] if node["companies"] else None
+            builder.add_person(node, node["connection_level"], company)
+            builder._begin_mutuals(key, node["mutuals_fetched_at"])
+        for key, neighbours in graph.adjacency.items():
+            for other in neighbours:
+                if key < other:
+                    builder._link(key, other, graph.edge_seen_at.get((key, other)))
+    return builder.build()
+
+def from_cache_dir(cache_dir: str) -> CompactGraph:
+    """Build the compact graph straight from cached results, without the dict form"""
+    builder = CompactGraphBuilder()
+    builder.load_from_cache_dir(cache_dir)
+    return builder.build()
+
+def synthetic_crawl(edge_count: int, mutuals_per_person: int = 50, first_degree: int = 2000) -> dict:
+    """An entire_network_crawl result with about edge_count mutual links, parsed the way the cache is"""
+    firsts = [{"name": f"First Person {i}", "profile_url": f"https://www.linkedin.com/in/first-{i}",
+               "role": f"Engineer at Company {i % 300}", "location": "Seattle, Washington", "connection_level": 1}
+              for i in range(first_degree)]
+    seconds = []
+    for j in range(edge_count // mutuals_per_person):
+        seconds.append({"name": f"Second Person {j}", "profile_url": f"https://www.linkedin.com/in/second-{j}",
+                        "role": f"Manager at Company {j % 500}", "location": "San Francisco Bay Area",
+                        "connection_level": 2,
+                        "mutual_connections": [firsts[(j * 7 + k) % first_degree] for k in range(mutuals_per_person)]})
+    document = {"status": "complete", "timestamp": "2026-01-01T00:00:00", "results": firsts + seconds}
+    # Round trip through JSON so every mutual is its own dict with its own strings, as after json.load
+    return json.loads(json.dumps(document))
+
+def measure(build) -> tuple:
+    """(result, bytes allocated and still held) for a builder function"""
+    tracemalloc.start()
+    try:
+        result = build()
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return result, current
+
+def memory_benchmark(edge_count: int = 1_000_000) -> dict:
+    """Memory held by the parsed cache result, the dict-of-sets graph and the compact graph"""
+    start_time = time.time()
+    document, document_bytes = measure(lambda: synthetic_crawl(edge_count))
+    graph, graph_bytes = measure(lambda: _network_graph_from(document))
+    compact, compact_bytes = measure(lambda: _compact_from(document))
+    return {
+        "edges": compact.edge_count,
+        "people": compact.person_count - 1,
+        "parsed_result_mb": round(document_bytes / 2**20, 1),
+        "network_graph_mb": round(graph_bytes / 2**20, 1),
+        "compact_graph_mb": round(compact_bytes / 2**20, 1),
+        "compact_arrays_mb": round(compact.nbytes / 2**20, 1),
+        "seconds": round(time.time() - start_time, 1)
+    }
+
+def _network_graph_from(document: dict) -> NetworkGraph:
+    graph = NetworkGraph()
+    graph.add_result(document, "entire_network_crawl")
+    return graph
+
+def _compact_from(document: dict) -> CompactGraph:
+    builder = CompactGraphBuilder()
+    builder.add_result(document, "entire_network_crawl")
+    return builder.build()
+
+if __name__ == "__main__":
+    # Compare memory of the dict forms and the compact form: python compact_graph.py [edge count]
+    edges = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    print(json.dumps(memory_benchmark(edges), indent=2))
@@ -0,0 +1,185 @@
+import os
+import sys
+import json
+import time
+import hashlib
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from atomic_files import replace_atomically, write_json_atomic
+from cache_keys import headline_company, normalize_profile_url
+from cache_store import CACHE_DIR, company_aliases
+from logger_config import logger, LogCategory
+
+DIGEST_PATH = os.path.join(CACHE_DIR, "_crawl_digest.json")
+CHANGE_LOG_PATH = os.path.join(CACHE_DIR, "_crawl_changes.jsonl")
+CHANGE_TYPES = ("join", "leave", "role_change", "level_change", "new_mutual_links")
+# Changes kept in the log; the oldest are dropped when a crawl adds more
+CRAWL_CHANGES_MAX_ENTRIES = int(os.getenv("LINKEDIN_CRAWL_CHANGES_MAX_ENTRIES", "50000"))
+
+# Digest entry fields: one small list per person instead of the full crawl record
+NAME, COMPANY, ROLE, LEVEL, FINGERPRINT, MUTUALS = range(6)
+
+def url_hash(profile_url: str) -> int:
+    """64-bit hash of a canonical profile URL"""
+    return int.from_bytes(hashlib.blake2b(profile_url.encode("utf-8"), digest_size=8).digest(), "big")
+
+def fingerprint(role: str, level, mutual_hashes: List[int]) -> str:
+    """Hash of everything the diff compares, so unchanged people are skipped with one string compare"""
+    h = hashlib.blake2b(f"{role}\x1f{level}".encode("utf-8"), digest_size=8)
+    for mutual in mutual_hashes:
+        h.update(mutual.to_bytes(8, "big"))
+    return h.hexdigest()
+
+def company_of(role: str) -> Optional[str]:
+    employer = headline_company(role)
+    return company_aliases.canonical(employer) if employer else None
+
+def digest_people(people: Iterable[dict]) -> Tuple[Dict[str, list], Dict[int, dict]]:
+    """Digest a stream of crawl records, keyed by canonical profile URL.
+
+    Returns the digest and the mutuals seen (hash -> name and URL), which the diff needs
+    to describe new links. Duplicate records of one person are merged.
+    """
+    digest: Dict[str, list] = {}
+    mutual_people: Dict[int, dict] = {}
+    for person in people:
+        key = normalize_profile_url(person.get("profile_url"))
+        if not key:
+            continue
+        mutuals = set()
+        for mutual in person.get("mutual_connections") or []:
+            mutual_key = normalize_profile_url(mutual.get("profile_url"))
+            if mutual_key:
+                mutual_hash = url_hash(mutual_key)
+                mutuals.add(mutual_hash)
+                mutual_people.setdefault(mutual_hash, {"name": mutual.get("name"), "profile_url": mutual_key})
+        entry = digest.get(key)
+        if entry is None:
+            role = person.get("role") or ""
+            digest[key] = [person.get("name"), company_of(role), role, person.get("connection_level"), None, sorted(mutuals)]
+        else:
+            entry[MUTUALS] = sorted(mutuals.union(entry[MUTUALS]))
+    for entry in digest.values():
+        entry[FINGERPRINT] = fingerprint(entry[ROLE], entry[LEVEL], entry[MUTUALS])
+    return digest, mutual_people
+
+def diff_digests(previous: Dict[str, list], current: Dict[str, list], mutual_people: Dict[int, dict],
+                 detected_at: str) -> List[dict]:
+    """Change records between two crawl digests"""
+    changes = []
+
+    def change(change_type: str, key: str, entry: list, **fields):
+        changes.append({"type": change_type, "profile_url": key, "name": entry[NAME], "company": entry[COMPANY],
+                        **fields, "detected_at": detected_at})
+
+    for key, entry in current.items():
+        old = previous.get(key)
+        if old is None:
+            change("join", key, entry, role=entry[ROLE], connection_level=entry[LEVEL])
+            continue
+        if old[FINGERPRINT] == entry[FINGERPRINT]:
+            continue
+        if old[ROLE] != entry[ROLE]:
+            change("role_change", key, entry, role=entry[ROLE], previous_role=old[ROLE],
+                   previous_company=old[COMPANY], company_changed=old[COMPANY] != entry[COMPANY])
+        if old[LEVEL] != entry[LEVEL]:
+            change("level_change", key, entry, connection_level=entry[LEVEL], previous_connection_level=old[LEVEL])
+        added = set(entry[MUTUALS]).difference(old[MUTUALS])
+        if added:
+            change("new_mutual_links", key, entry,
+                   mutuals=[mutual_people.get(h, {"name": None, "profile_url": None}) for h in sorted(added)])
+    for key, old in previous.items():
+        if key not in current:
+            change("leave", key, old, role=old[ROLE], connection_level=old[LEVEL])
+    return changes
+
+class CrawlChangeLog:
+    """Diffs each completed network crawl against the digest of the previous one and keeps a change log.
+
+    Only a digest of the previous crawl is kept (name, company, role, level, a fingerprint and
+    hashed mutual URLs per person), so the old crawl is never reloaded to compare against.
+    The log keeps the newest max_entries changes, which bounds its size and every query's scan.
+    """
+
+    def __init__(self, digest_path: str = DIGEST_PATH, log_path: str = CHANGE_LOG_PATH,
+                 max_entries: int = CRAWL_CHANGES_MAX_ENTRIES):
+        self.digest_path = digest_path
+        self.log_path = log_path
+        self.max_entries = max_entries
+
+    def load_digest(self) -> Optional[dict]:
+        if os.path.exists(self.digest_path):
+            with open(self.digest_path, 'r') as f:
+                return json.load(f)
+        return None
+
+    def record(self, crawl: dict) -> List[dict]:
+        """Diff a completed crawl against the previous one, append the changes, and keep its digest"""
+        if not crawl or crawl.get("status") != "complete":
+            return []
+        start_time = time.time()
+        previous = self.load_digest()
+        current, mutual_people = digest_people(crawl.get("results", []))
+        changes = []
+        if previous is not None:
+            changes = diff_digests(previous["people"], current, mutual_people,
+                                   crawl.get("timestamp") or datetime.now().isoformat())
+            if changes:
+                self._append(changes)
+        write_json_atomic(self.digest_path, {"timestamp": crawl.get("timestamp"), "people": current})
+        logger.info(LogCategory.CACHE, "crawl_diff", duration_ms=(time.time() - start_time) * 1000,
+                    people=len(current), changes=len(changes), baseline=previous is None)
+        return changes
+
+    def _append(self, changes: List[dict]):
+        """Add changes to the log, rewriting it without the oldest ones once it is over max_entries"""
+        lines = [json.dumps(c) + "\n" for c in changes]
+        kept = []
+        if os.path.exists(self.log_path):
+            with open(self.log_path, 'r') as f:
+                kept = f.readlines()
+        if len(kept) + len(lines) <= self.max_entries:
+            with open(self.log_path, 'a') as f:
+                f.writelines(lines)
+            return
+        kept = (kept + lines)[-self.max_entries:] if self.max_entries > 0 else []
+        replace_atomically(self.log_path, lambda f: f.writelines(kept))
+
+    def query(self, company: Optional[str] = None, change_types: Optional[Iterable[str]] = None,
+              since: Optional[str] = None, limit: int = 100) -> List[dict]:
+        """Newest changes first, optionally for one company (current or previous employer)"""
+        if not os.path.exists(self.log_path):
+            return []
+        company = company_aliases.canonical(company) if company else None
+        change_types = set(change_types) if change_types else None
+        matches = []
+        with open(self.log_path, 'r') as f:
+            for line in f:
+                change = json.loads(line)
+                if change_types and change["type"] not in change_types:
+                    continue
+                if since and change["detected_at"] < since:
+                    continue
+                if company and company not in (change.get("company"), change.get("previous_company")):
+                    continue
+                matches.append(change)
+        matches.reverse()
+        return matches[:limit]
+
+# Create a global crawl change log instance
+crawl_changes = CrawlChangeLog()
+
+if __name__ == "__main__":
+    # Compare two saved crawls: python crawl_diff.py old.json new.json [company]
+    if len(sys.argv) < 3:
+        print("Usage: python crawl_diff.py <old crawl.json> <new crawl.json> [company]")
+        sys.exit(1)
+    with open(sys.argv[1], 'r') as f:
+        old_digest, _ = digest_people(json.load(f).get("results", []))
+    with open(sys.argv[2], 'r') as f:
+        new_crawl = json.load(f)
+    new_digest, mutuals = digest_people(new_crawl.get("results", []))
+    del new_crawl
+    for c in diff_digests(old_digest, new_digest, mutuals, datetime.now().isoformat()):
+        if len(sys.argv) < 4 or company_aliases.canonical(sys.argv[3]) in (c.get("company"), c.get("previous_company")):
+            print(json.dumps(c))
@@ -0,0 +1,82 @@
+import os
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+from role_classifier import classify_role, introducer_flags, title_part
+if TYPE_CHECKING:
+    import numpy as np
+
+# Where the user is based; people nearby are easier to meet (empty disables the feature)
+RANK_HOME_LOCATION = os.getenv("LINKEDIN_HOME_LOCATION", "")
+# Responses carry at most this many ranked results; the cache keeps the full sorted list
+RANKED_RESULTS_LIMIT = int(os.getenv("LINKEDIN_RANKED_RESULTS_LIMIT", "50"))
+
+FEATURES = ("mutuals", "hiring", "seniority", "location", "level")
+DEFAULT_WEIGHTS = {"mutuals": 0.35, "hiring": 0.2, "seniority": 0.15, "location": 0.1, "level": 0.2}
+# Feature value of each connection level; index 0 is unknown
+LEVEL_SCORES = (0.3, 1.0, 0.6, 0.2)
+
+def feature_matrix(people: List[dict], location: str = "",
+                   degree_of: Optional[Callable[[str], int]] = None) -> "np.ndarray":
+    """n x len(FEATURES) matrix of 0..1 features, one row per person"""
+    import numpy as np
+    n = len(people)
+    location = location.lower().split(",")[0].strip()
+    # One pass over the people extracts raw columns; titles and locations repeat a lot
+    # within one search, so their keyword and location flags are computed once per distinct string
+    role_flags: Dict[str, tuple] = {}
+    location_flags: Dict[str, bool] = {}
+    counts, flags, nearby, levels = [], [], [], []
+    for p in people:
+        mutual_connections = p.get("mutual_connections")
+        if isinstance(mutual_connections, list):
+            counts.append(len(mutual_connections))
+        else:
+            counts.append(degree_of(p.get("profile_url")) if degree_of else 0)
+        if p.get("role_class"):
+            flags.append(introducer_flags(p["role_class"]))
+        else:
+            # Only the title half counts: a "Software Engineer at Talentful" is not a recruiter.
+            # The cheap split keys the cache; title_part of it is the headline's title
+            title = (p.get("role") or "").split(" at ", 1)[0].split("@", 1)[0].split("|", 1)[0]
+            found = role_flags.get(title)
+            if found is None:
+                found = role_flags[title] = introducer_flags(classify_role(title_part(title)))
+            flags.append(found)
+        if location:
+            place = p.get("location") or ""
+            near = location_flags.get(place)
+            if near is None:
+                near = location_flags[place] = location in place.lower()
+            nearby.append(near)
+        levels.append(p.get("connection_level") or 0)
+    mutuals = np.log1p(np.array(counts, dtype=np.float32))
+    if mutuals.max(initial=0) > 0:
+        mutuals /= mutuals.max()
+    hiring, seniority = np.array(flags, dtype=np.float32).reshape(n, 2).T
+    nearby = np.array(nearby, dtype=np.float32) if location else np.zeros(n, dtype=np.float32)
+    level = np.array(LEVEL_SCORES, dtype=np.float32)[np.clip(np.array(levels, dtype=np.int64), 0, len(LEVEL_SCORES) - 1)]
+    return np.column_stack((mutuals, hiring, seniority, nearby, level))
+
+def rank_people(people: List[dict], location: str = None, degree_of: Optional[Callable[[str], int]] = None,
+                weights: Optional[Dict[str, float]] = None) -> List[dict]:
+    """Copies of the people sorted by how promising they are as introducers, each with a rank_score.
+
+    Features are mutual count (log scaled), recruiter/hiring and seniority keywords in the
+    headline, location match and connection level; the score is their weighted sum.
+    """
+    import numpy as np
+    if not people:
+        return []
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    weight_vector = np.array([weights[name] for name in FEATURES], dtype=np.float32)
+    scores = feature_matrix(people, RANK_HOME_LOCATION if location is None else location, degree_of) @ weight_vector
+    # Stable sort keeps the scrape order among equal scores
+    order = np.argsort(-scores, kind="stable")
+    return [{**people[i], "rank_score": score}
+            for i, score in zip(order.tolist(), np.round(scores[order], 4).tolist())]
+
+def truncate_ranked(data: dict, limit: int = RANKED_RESULTS_LIMIT) -> dict:
+    """Response view of a stored result with only the top ranked results"""
+    results = data.get("results") if data else None
+    if not isinstance(results, list) or limit <= 0 or len(results) <= limit:
+        return data
+    return {**data, "results": results[:limit], "total_results": len(results), "truncated": True}
@@ -0,0 +1,172 @@
+import os
+import json
+import asyncio
+import inspect
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+
+# Seconds between keep-alive messages on an idle event stream
+JOB_EVENTS_KEEPALIVE_SECONDS = float(os.getenv("LINKEDIN_JOB_EVENTS_KEEPALIVE_SECONDS", "15"))
+# Longest a /job_status long-poll may hold a request
+JOB_STATUS_MAX_WAIT_SECONDS = float(os.getenv("LINKEDIN_JOB_STATUS_MAX_WAIT_SECONDS", "60"))
+# People per incremental "people" event
+JOB_EVENTS_BATCH_SIZE = int(os.getenv("LINKEDIN_JOB_EVENTS_BATCH_SIZE", "10"))
+TERMINAL_STATUSES = ("complete", "error")
+
+# The job (cache file) the running background task is producing results for
+current_job: ContextVar[Optional[str]] = ContextVar("current_job", default=None)
+
+class JobEventBus:
+    """In-process publish/subscribe of job events, keyed by job id (the job's cache file).
+
+    Events are dicts {"id", "event", "data"}: "status" when the job's cache entry is
+    written, "progress" per search page and profile, "people" for each batch of new
+    results. Events of a running job are kept so a late subscriber sees them all; they
+    are dropped once the job reaches a terminal status.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._history: Dict[str, List[dict]] = {}
+        self._next_id = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def bind(self, job_id: str):
+        """Attribute events published from the current task to a job, and announce that it started"""
+        current_job.set(job_id)
+        self.publish(job_id, "progress", {"phase": "started"})
+
+    def publish(self, job_id: str, event: str, data: dict):
+        """Send an event to a job's subscribers; safe to call from any thread"""
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if self._loop is not None and running is not self._loop and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._deliver, job_id, event, data)
+        else:
+            self._deliver(job_id, event, data)
+
+    def publish_current(self, event: str, data: dict):
+        """Publish for the job bound to the current task, if any"""
+        job_id = current_job.get()
+        if job_id:
+            self.publish(job_id, event, data)
+
+    def _deliver(self, job_id: str, event: str, data: dict):
+        with self._lock:
+            self._next_id += 1
+            record = {"id": self._next_id, "event": event, "data": data}
+            status = data.get("status") if event == "status" else None
+            if status == "processing":
+                # A new run of the job starts over
+                self._history[job_id] = [record]
+            elif status in TERMINAL_STATUSES:
+                self._history.pop(job_id, None)
+            else:
+                self._history.setdefault(job_id, []).append(record)
+            subscribers = list(self._subscribers.get(job_id, ()))
+        for queue in subscribers:
+            queue.put_nowait(record)
+
+    def on_cache_save(self, filename: str, data: dict):
+        """cache_store save listener: every cache write is a status event for that job"""
+        if isinstance(data, dict) and data.get("status"):
+            self.publish(filename, "status", data)
+
+    def history(self, job_id: str) -> List[dict]:
+        with self._lock:
+            return list(self._history.get(job_id, ()))
+
+    @contextmanager
+    def _subscription(self, job_id: str):
+        """A queue receiving the job's events from now on, plus the events it already had"""
+        self._loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            self._subscribers.setdefault(job_id, set()).add(queue)
+            replay = list(self._history.get(job_id, ()))
+        try:
+            yield queue, replay
+        finally:
+            with self._lock:
+                subscribers = self._subscribers.get(job_id)
+                if subscribers is not None:
+                    subscribers.discard(queue)
+                    if not subscribers:
+                        del self._subscribers[job_id]
+
+    async def subscribe(self, job_id: str, load_current: Callable,
+                        after_id: int = 0) -> AsyncIterator[Optional[dict]]:
+        """Events for a job until it reaches a terminal status.
+
+        load_current reads the job's cache entry (plain or async); it is called once subscribed,
+        so no event falls between the two. A job that is already finished yields just its entry.
+        None is yielded when the stream has been idle for the keep-alive interval.
+        """
+        with self._subscription(job_id) as (queue, replay):
+            replay = [r for r in replay if r["id"] > after_id]
+            current = await self._load(load_current)
+            if current and current.get("status") in TERMINAL_STATUSES:
+                yield {"id": 0, "event": "status", "data": current}
+                return
+            if not replay and current:
+                yield {"id": 0, "event": "status", "data": current}
+            for record in replay:
+                yield record
+            while True:
+                try:
+                    record = await asyncio.wait_for(queue.get(), JOB_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if record["id"] <= after_id:
+                    continue
+                yield record
+                if record["event"] == "status" and record["data"].get("status") in TERMINAL_STATUSES:
+                    return
+
+    async def wait_for_status_change(self, job_id: str, load_current: Callable,
+                                     timeout: float) -> Optional[dict]:
+        """Long-poll: the job's cache entry as soon as its status changes, or as it is at the timeout.
+
+        Woken by the save listener, so the cache file is read only at the start and on timeout.
+        """
+        with self._subscription(job_id) as (queue, _):
+            current = await self._load(load_current)
+            if not current or current.get("status") in TERMINAL_STATUSES:
+                return current
+            deadline = asyncio.get_running_loop().time() + timeout
+            while True:
+                remaining = deadline - asyncio.get_running_loop().time()
+                if remaining <= 0:
+                    break
+                try:
+                    record = await asyncio.wait_for(queue.get(), remaining)
+                except asyncio.TimeoutError:
+                    break
+                if record["event"] == "status" and record["data"].get("status") != current.get("status"):
+                    return record["data"]
+        return await self._load(load_current)
+
+    @staticmethod
+    async def _load(load_current: Callable) -> Optional[dict]:
+        current = load_current()
+        return await current if inspect.isawaitable(current) else current
+
+    def subscriber_count(self, job_id: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(job_id, ()))
+
+def sse_message(record: Optional[dict], data: Optional[dict] = None) -> str:
+    """Server-Sent Events wire format for a record; a comment line for keep-alives"""
+    if record is None:
+        return ": keep-alive\n\n"
+    payload = json.dumps(record["data"] if data is None else data)
+    return f"id: {record['id']}\nevent: {record['event']}\ndata: {payload}\n\n"
+
+# Create a global job event bus instance
+job_events = JobEventBus()
@@ -0,0 +1,240 @@
+import os
+import json
+import time
+from datetime import datetime
+from typing import Dict, Iterable, Optional
+from atomic_files import write_json_atomic
+from cache_store import CACHE_DIR, load_from_cache_async, save_to_cache_async
+from job_events import job_events, current_job, JOB_EVENTS_BATCH_SIZE
+
+# Seconds between progress writes into a running job's cache entry
+JOB_PROGRESS_WRITE_INTERVAL = float(os.getenv("LINKEDIN_JOB_PROGRESS_WRITE_INTERVAL", "5"))
+# A job's own timings replace the historical ones once it has timed this many pages of a kind
+JOB_PROGRESS_MIN_SAMPLES = 3
+# Weight of the latest finished job in the historical averages
+JOB_TIMINGS_SMOOTHING = 0.2
+JOB_TIMINGS_PATH = os.path.join(CACHE_DIR, "_job_timings.json")
+
+# Assumed until a job has finished: seconds per search result page and per 2nd degree
+# profile (its mutual connection pages included), pages per search and people per page
+DEFAULT_TIMINGS = {
+    "seconds_per_page": {"search": 4.0, "profile": 8.0},
+    "search_pages": 3.0,
+    "people_per_page": 10.0,
+    "jobs": 0
+}
+
+# Networks whose people each need a profile visit for their mutual connections
+MUTUAL_NETWORKS = ("S",)
+
+class JobProgress:
+    """Structured progress of one running job"""
+
+    def __init__(self, job_id: str, searches: Iterable[str] = (), profiles: int = 0):
+        self.job_id = job_id
+        self.planned_searches = list(searches)
+        self.searches_done = 0
+        self.network: Optional[str] = None
+        self.phase = "started"
+        self.search_pages = 0
+        self.search_pages_max: Optional[int] = None
+        self.people_found = 0
+        self.profiles_done = 0
+        self.profiles_total = profiles
+        self.mutual_pages = 0
+        self.started = time.monotonic()
+        self.mark = self.started
+        # kind -> [pages timed, seconds]
+        self.timed: Dict[str, list] = {"search": [0, 0.0], "profile": [0, 0.0]}
+        self.total_search_pages = 0
+        self.total_people = 0
+        self.record: Optional[dict] = None
+        self.last_write = 0.0
+
+    def seconds_per_page(self, kind: str, history: dict) -> float:
+        pages, seconds = self.timed[kind]
+        if pages >= JOB_PROGRESS_MIN_SAMPLES:
+            return seconds / pages
+        return history["seconds_per_page"][kind]
+
+    def eta_seconds(self, history: dict) -> float:
+        """Seconds of work left: the current search and its profiles, then the searches still planned"""
+        search_seconds = self.seconds_per_page("search", history)
+        profile_seconds = self.seconds_per_page("profile", history)
+        expected_pages = history["search_pages"]
+        remaining = 0.0
+        if self.phase == "search":
+            pages_left = max(expected_pages - self.search_pages, 1)
+            if self.search_pages_max:
+                pages_left = min(pages_left, self.search_pages_max - self.search_pages)
+            remaining += pages_left * search_seconds
+            if self.network in MUTUAL_NETWORKS:
+                remaining += (self.people_found + pages_left * history["people_per_page"]) * profile_seconds
+        elif self.phase == "profiles" and self.network in MUTUAL_NETWORKS:
+            remaining += (self.profiles_total - self.profiles_done) * profile_seconds
+        elif self.network is None:
+            remaining += (self.profiles_total - self.profiles_done) * profile_seconds
+        for network in self.planned_searches[self.searches_done + (self.phase in ("search", "profiles")):]:
+            remaining += expected_pages * search_seconds
+            if network in MUTUAL_NETWORKS:
+                remaining += expected_pages * history["people_per_page"] * profile_seconds
+        return remaining
+
+    def snapshot(self, history: dict) -> dict:
+        elapsed = time.monotonic() - self.started
+        minutes = elapsed / 60 if elapsed > 0 else None
+        pages = self.total_search_pages + self.mutual_pages
+        return {
+            "phase": self.phase,
+            "network": self.network,
+            "searches": {"done": self.searches_done, "total": len(self.planned_searches)},
+            "pages": {"done": self.search_pages, "max": self.search_pages_max},
+            "people_found": self.people_found,
+            "profiles": {"done": self.profiles_done, "total": self.profiles_total},
+            "mutual_pages": self.mutual_pages,
+            "elapsed_seconds": round(elapsed, 1),
+            "throughput": {
+                "pages_per_minute": round(pages / minutes, 2) if minutes else None,
+                "profiles_per_minute": round(self.profiles_done / minutes, 2) if minutes else None
+            },
+            "eta_seconds": round(self.eta_seconds(history)),
+            "updated_at": datetime.now().isoformat()
+        }
+
+class JobProgressTracker:
+    """Progress of running jobs, fed by the scraping loops and written into each job's cache entry.
+
+    The loops report through the job bound to the current task (job_events.bind), so jobs that
+    weren't started here are ignored. Progress goes into the "processing" record as "progress"
+    at most every JOB_PROGRESS_WRITE_INTERVAL seconds (and at phase changes), and out as
+    "progress" events. Finished jobs fold their per-page timings into the history the ETA uses.
+    """
+
+    def __init__(self, timings_path: str = JOB_TIMINGS_PATH, write_interval: float = JOB_PROGRESS_WRITE_INTERVAL):
+        self.timings_path = timings_path
+        self.write_interval = write_interval
+        self._jobs: Dict[str, JobProgress] = {}
+        self._history: Optional[dict] = None
+
+    def history(self) -> dict:
+        if self._history is None:
+            self._history = json.loads(json.dumps(DEFAULT_TIMINGS))
+            try:
+                with open(self.timings_path, 'r') as f:
+                    self._history.update(json.load(f))
+            except (OSError, ValueError):
+                pass
+        return self._history
+
+    def start(self, job_id: str, searches: Iterable[str] = (), profiles: int = 0):
+        """Begin tracking a job: the searches (networks) it will run and any single profiles it will fetch"""
+        self._jobs[job_id] = JobProgress(job_id, searches, profiles)
+
+    def _current(self) -> Optional[JobProgress]:
+        job_id = current_job.get()
+        return self._jobs.get(job_id) if job_id else None
+
+    def snapshot(self, job_id: str) -> Optional[dict]:
+        job = self._jobs.get(job_id)
+        return job.snapshot(self.history()) if job else None
+
+    async def begin_search(self, network: str, max_pages: Optional[int] = None):
+        job = self._current()
+        if job is None:
+            return
+        if job.phase in ("search", "profiles"):
+            job.searches_done += 1
+        if job.searches_done >= len(job.planned_searches):
+            job.planned_searches.append(network)
+        job.network, job.phase = network, "search"
+        job.search_pages, job.search_pages_max, job.people_found = 0, max_pages, 0
+        job.profiles_done = job.profiles_total = 0
+        job.mark = time.monotonic()
+        await self._update(job, force=True)
+
+    async def page_done(self, kind: str, seconds: float, found: int):
+        """A result page was read: a search page, or a page of someone's mutual connections"""
+        job = self._current()
+        if job is None:
+            return
+        if kind == "mutual":
+            job.mutual_pages += 1
+            await self._update(job, publish=False)
+            return
+        job.timed["search"][0] += 1
+        job.timed["search"][1] += seconds
+        if found:
+            job.search_pages += 1
+            job.total_search_pages += 1
+            job.people_found += found
+            job.total_people += found
+        await self._update(job)
+
+    async def search_done(self, people: int):
+        """Search pages are exhausted; each of the people found is processed next"""
+        job = self._current()
+        if job is None:
+            return
+        job.phase = "profiles"
+        job.profiles_done, job.profiles_total = 0, people
+        job.mark = time.monotonic()
+        await self._update(job, force=True)
+
+    async def profile_done(self, timed: bool = True):
+        """A person was processed; timed when it took a profile visit (mutual connections)"""
+        job = self._current()
+        if job is None:
+            return
+        now = time.monotonic()
+        if timed:
+            job.timed["profile"][0] += 1
+            job.timed["profile"][1] += now - job.mark
+        job.mark = now
+        job.profiles_done += 1
+        done = job.profiles_done % JOB_EVENTS_BATCH_SIZE == 0 or job.profiles_done >= job.profiles_total
+        await self._update(job, publish=done)
+
+    async def _update(self, job: JobProgress, force: bool = False, publish: bool = True):
+        snapshot = job.snapshot(self.history())
+        if publish:
+            job_events.publish(job.job_id, "progress", snapshot)
+        now = time.monotonic()
+        if not force and now - job.last_write < self.write_interval:
+            return
+        job.last_write = now
+        if job.record is None:
+            job.record = await load_from_cache_async(job.job_id) or {}
+        if job.record.get("status") != "processing":
+            return
+        # Not a new job state, so the save listeners (and the event stream's status events) stay quiet
+        await save_to_cache_async(job.job_id, {**job.record, "progress": snapshot}, notify=False)
+
+    def on_cache_save(self, filename: str, data: dict):
+        """cache_store save listener: a job that reached a terminal status stops being tracked;
+        a complete one adds its timings to the history"""
+        if not isinstance(data, dict) or data.get("status") not in ("complete", "error"):
+            return
+        job = self._jobs.pop(filename, None)
+        if job is None or data.get("status") != "complete":
+            return
+        self.record_timings(job)
+
+    def record_timings(self, job: JobProgress):
+        history = self.history()
+        weight = max(JOB_TIMINGS_SMOOTHING, 1 / (history["jobs"] + 1))
+        blend = lambda old, new: round(old * (1 - weight) + new * weight, 3)
+        for kind, (pages, seconds) in job.timed.items():
+            if pages:
+                history["seconds_per_page"][kind] = blend(history["seconds_per_page"][kind], seconds / pages)
+        searches = job.searches_done + (job.phase in ("search", "profiles"))
+        if searches and job.total_search_pages:
+            history["search_pages"] = blend(history["search_pages"], job.total_search_pages / searches)
+            history["people_per_page"] = blend(history["people_per_page"], job.total_people / job.total_search_pages)
+        history["jobs"] += 1
+        try:
+            write_json_atomic(self.timings_path, history, indent=2)
+        except OSError as e:
+            print(f"Could not save job timings: {e}")
+
+# Create a global job progress tracker instance
+job_progress = JobProgressTracker()
@@ -2,20 +2,41 @@ import sys
 import asyncio
 import json
 import os
+import time
 from datetime import datetime
 import uuid
+import dataclasses
 import re
 import urllib.parse
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import List, Optional
 from dotenv import load_dotenv
-from openai import OpenAI
-from assistant_manager import get_assistant, create_assistant
+from assistant_manager import assistant_resolver
 
 # Load environment variables from .env file
 load_dotenv()
 
-# Define and create the cache directory
-CACHE_DIR = os.getenv("LINKEDIN_CACHE_DIR", "cache")
-os.makedirs(CACHE_DIR, exist_ok=True)
+from cache_store import CACHE_DIR, ensure_cache_dir, get_cache_filename, save_to_cache_async, load_from_cache, load_from_cache_async, data_age_seconds, company_aliases, add_save_listener, migrate_cache_keys
+from query_planner import query_planner
+from profile_cache import mutual_connections_cache
+from cache_manager import cache_manager
+from cache_warmer import cache_warmer
+from network_graph import network_graph
+from path_search import find_intro_paths
+from people_index import people_index
+from name_index import name_index
+from introducer_ranking import rank_people, truncate_ranked
+from cache_keys import normalize_profile_url
+from network_snapshot import snapshot_store
+from role_classifier import classify_role
+from network_analytics import analytics_store
+from crawl_diff import crawl_changes, CHANGE_TYPES
+from job_events import job_events, sse_message, JOB_EVENTS_BATCH_SIZE, JOB_STATUS_MAX_WAIT_SECONDS, TERMINAL_STATUSES
+from batch_jobs import BatchJob, parse_batch_queries, BATCH_MAX_WAIT_SECONDS
+from result_pages import ResultView, parsed_results, content_etag, etag_matches
+from browser_pool import browser_pool, BROWSER_PREWARM_ENABLED
+from job_progress import job_progress
 
 # Check for command line arguments FIRST, before any other imports
 if len(sys.argv) > 1 and sys.argv[1] == "--install-browsers":
@@ -66,24 +87,17 @@ if sys.platform == 'win32':
     else:
         asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
 
-from fastapi import FastAPI, Query, BackgroundTasks, HTTPException
-from playwright.async_api import async_playwright
+from fastapi import FastAPI, Query, Body, Depends, BackgroundTasks, HTTPException, Request, WebSocket, WebSocketDisconnect
 import uvicorn
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse, ORJSONResponse, Response
 
-app = FastAPI()
+# orjson serializes large results several times faster than the standard json module
+app = FastAPI(default_response_class=ORJSONResponse)
 
-# Initialize OpenAI client
-openai_api_key = os.getenv("OPENAI_API_KEY")
-if not openai_api_key:
-    raise ValueError("OPENAI_API_KEY environment variable not set.")
-client = OpenAI(api_key=openai_api_key)
-
-# Get or create the assistant
-ASSISTANT_ID = get_assistant(client)
-if not ASSISTANT_ID:
-    ASSISTANT_ID = create_assistant(client)
+# Longest /get_assistant_config waits for the assistant ID that is resolved in the background at startup
+ASSISTANT_RESOLVE_TIMEOUT_SECONDS = float(os.getenv("LINKEDIN_ASSISTANT_RESOLVE_TIMEOUT_SECONDS", "30"))
 
 # Global store for job statuses is now REMOVED. We use the filesystem cache.
 # jobs = {}
@@ -97,8 +111,54 @@ app.add_middleware(
     allow_headers=["*"],  # Allows all headers
 )
 
+# Compress large bodies; event streams are left alone so events arrive as they happen
+app.add_middleware(GZipMiddleware, minimum_size=1024, compresslevel=5)
+
 # Global semaphore to limit concurrent browser sessions
-browser_semaphore = asyncio.Semaphore(3)
+BROWSER_SLOTS = 3
+browser_semaphore = asyncio.Semaphore(BROWSER_SLOTS)
+
+# Set while a batch runs its jobs one after another in a single browser slot and session
+batch_session: ContextVar = ContextVar("batch_session", default=None)
+
+@asynccontextmanager
+async def browser_slot():
+    """Hold a browser slot for one job; jobs run by a batch use the batch's slot"""
+    if batch_session.get() is not None:
+        yield
+        return
+    async with browser_semaphore:
+        yield
+
+class BatchBrowser:
+    """A batch's browser (or playwright) handle as one of its jobs sees it: only the batch closes it"""
+
+    def __init__(self, target):
+        self._target = target
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    async def close(self):
+        pass
+
+    async def stop(self):
+        pass
+
+# Keep the in-memory network graph up to date as jobs finish
+add_save_listener(network_graph.on_cache_saved)
+cache_manager.add_maintenance_listener(network_graph.expire)
+network_graph.add_person_listener(people_index.index_person)
+network_graph.add_person_listener(name_index.index_person)
+network_graph.add_person_removed_listener(people_index.remove_person)
+network_graph.add_person_removed_listener(name_index.remove_person)
+# Push job status changes to event stream subscribers
+add_save_listener(job_events.on_cache_save)
+# Stop tracking progress of finished jobs and learn from their timings
+add_save_listener(job_progress.on_cache_save)
+
+# Predictive cache warming launches scrapes on its own, so it is opt-in
+CACHE_WARMING_ENABLED = os.getenv("LINKEDIN_CACHE_WARMING", "0") == "1"
 
 async def install_browsers():
     """Install Playwright browsers"""
@@ -134,30 +194,6 @@ async def install_browsers():
         print(f"❌ Error installing browsers: {e}")
         return False
 
-def get_cache_filename(query_name: str, **kwargs) -> str:
-    """Generate a cache filename from a query name and parameters."""
-    filename_parts = [query_name]
-    for key, value in sorted(kwargs.items()):
-        if value: # Only add parts that have a value
-            sanitized_value = re.sub(r'[\W_]+', '', str(value).lower())
-            filename_parts.append(sanitized_value)
-    
-    filename = "_".join(filename_parts) + ".json"
-    # Always return a web-friendly path with forward slashes
-    return os.path.join(CACHE_DIR, filename).replace('\\', '/')
-
-def save_to_cache(filename, data):
-    """Save data to cache file"""
-    with open(filename, 'w') as f:
-        json.dump(data, f, indent=2)
-
-def load_from_cache(filename: str) -> dict:
-    """Load data from cache file"""
-    if os.path.exists(filename):
-        with open(filename, 'r') as f:
-            return json.load(f)
-    return None
-
 def get_processing_message(**kwargs) -> dict:
     """Get the processing message for a search"""
     job_id = get_cache_filename(**kwargs)
@@ -171,13 +207,105 @@ def get_processing_message(**kwargs) -> dict:
         "job_id": job_id
     }
 
-def mark_as_processing(**kwargs):
+async def mark_as_processing(**kwargs):
     """Mark a query as being processed by creating a cache file."""
     cache_filename = get_cache_filename(**kwargs)
     processing_data = { "status": "processing", "timestamp": datetime.now().isoformat() }
     # Add all original parameters to the processing file for context
     processing_data.update(kwargs)
-    save_to_cache(cache_filename, processing_data)
+    await save_to_cache_async(cache_filename, processing_data)
+
+def with_cache_plan(cached_data: dict, cache_filename: str, view: ResultView = None) -> dict:
+    """Report an exact cache hit as the plan used, including how old the data is."""
+    age = data_age_seconds(cached_data)
+    plan = {
+        "strategy": "cache",
+        "sources": [{"cache_file": cache_filename, "timestamp": cached_data.get("timestamp")}],
+        "data_age_seconds": round(age, 1) if age is not None else None
+    }
+    if "plan" in cached_data:
+        plan["derived_from"] = cached_data["plan"]
+    return conditional_response(cache_filename, view, lambda: view_of({**cached_data, "plan": plan}, view, cache_filename))
+
+def result_view(request: Request, fields: str = Query(None, description="Comma-separated person fields to return, e.g. name,profile_url,role"),
+                limit: int = Query(None, description="Results per page"),
+                cursor: str = Query(None, description="next_cursor from the previous page"),
+                include_mutuals: bool = Query(True, description="false replaces mutual lists with mutual_count"),
+                max_tokens: int = Query(None, ge=1, description="Compact the results to fit this many tokens, e.g. for an assistant tool output")) -> ResultView:
+    """Paging and projection parameters shared by /job_status and the cache-hit responses"""
+    return ResultView.from_params(fields, limit, cursor, include_mutuals, request.headers.get("if-none-match"),
+                                  f"{request.url.path}?{request.url.query}", max_tokens)
+
+def view_of(data: dict, view: ResultView = None, job_id: str = None) -> dict:
+    """The requested page and fields of a stored result (the top ranked results by default)"""
+    if view is None:
+        return truncate_ranked(data)
+    try:
+        return view.apply(data, job_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def etag_headers(cache_filename: str, view: ResultView) -> Optional[dict]:
+    etag = content_etag(cache_filename, view.variant)
+    # The GZip middleware compresses by Accept-Encoding, so caches must key on it too
+    return {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"} if etag else None
+
+def not_modified(cache_filename: str, view: ResultView = None) -> Optional[Response]:
+    """304 if the client already has this response for the cache file's current version, else None.
+
+    Checked from the file's stat before it is read, so a revalidation costs no parsing.
+    """
+    if view is None or not view.if_none_match:
+        return None
+    headers = etag_headers(cache_filename, view)
+    if headers and etag_matches(view.if_none_match, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+    return None
+
+def conditional_response(cache_filename: str, view: ResultView, build):
+    """Response tagged with an ETag from the cache file's version, or 304 if the client already has it.
+
+    The tag is computed before the body is built, so a 304 costs no reading or serialization.
+    Endpoints run it on a worker thread, which keeps reading and serializing off the event loop.
+    Direct calls (view is None, e.g. from /batch) get the plain result.
+    """
+    if view is None:
+        return build()
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        return unchanged
+    return ORJSONResponse(build(), headers=etag_headers(cache_filename, view))
+
+async def save_planned_result(cache_filename: str, plan, view: ResultView = None, **fields):
+    """Save a result answered entirely from cached datasets under its own cache key,
+    and respond with the requested view of it, as a cache hit would."""
+    # Keep the timestamp of the oldest source so freshness checks stay honest
+    timestamps = [s["timestamp"] for s in plan.sources if s.get("timestamp")]
+    result = {
+        **fields,
+        "status": "complete",
+        "timestamp": min(timestamps) if timestamps else datetime.now().isoformat(),
+        "results": rank_results(plan.results),
+        "plan": plan.describe()
+    }
+    await save_to_cache_async(cache_filename, result)
+    return await asyncio.to_thread(conditional_response, cache_filename, view,
+                                   lambda: view_of(result, view, cache_filename))
+
+def processing_reply(query_params: dict, plan, view: ResultView = None) -> dict:
+    """Processing message with the plan, plus the local index matches trimmed to the requested view"""
+    reply = {**get_processing_message(**query_params), "plan": plan.describe()}
+    if plan.local_matches:
+        # A cursor or token budget applies to the job's result; the local matches are only a first look
+        local_view = dataclasses.replace(view, cursor=None) if view else None
+        local = view_of({"results": plan.local_matches}, local_view)
+        reply["local_results"] = local["results"]
+        reply["local_results_total"] = len(plan.local_matches)
+    return reply
+
+def rank_results(people):
+    """Rank scraped or planned people as introducers; people without mutual lists use their graph degree"""
+    return rank_people(people, degree_of=lambda url: len(network_graph.neighbours(normalize_profile_url(url))))
 
 async def extract_people_from_page(page):
     """Helper function to extract people information from a LinkedIn page using consistent DOM structure"""
@@ -237,6 +365,10 @@ async def extract_people_from_page(page):
 
 async def get_mutual_connections_for_profile(page, profile_url):
     """Shared function to get mutual connections for a profile"""
+    cached_mutuals = await mutual_connections_cache.get_async(profile_url)
+    if cached_mutuals is not None:
+        print(f"\nUsing cached mutual connections for: {profile_url}")
+        return cached_mutuals
     try:
         print(f"\nFetching mutual connections for: {profile_url}")
         await page.goto(profile_url)
@@ -259,11 +391,13 @@ async def get_mutual_connections_for_profile(page, profile_url):
                     await page.wait_for_timeout(2000)  # Wait for page to load
                     
                     # Extract mutual connections using the common extraction function
-                    mutual_connections = await navigate_all_pages(page, extract_people_from_page)
+                    mutual_connections = await navigate_all_pages(page, extract_people_from_page, kind="mutual")
                     print("mutual_connections", mutual_connections)
+                    await mutual_connections_cache.put_async(profile_url, mutual_connections)
                     return mutual_connections
             else:
                 print("Could not find mutual connections link")
+                await mutual_connections_cache.put_async(profile_url, [])
                 return []
                 
         except Exception as e:
@@ -276,8 +410,9 @@ async def get_mutual_connections_for_profile(page, profile_url):
 
 
 
-async def navigate_all_pages(page, extraction_function, max_pages=None):
-    """Navigate through all pages by incrementing the &page= param in the URL and extract data."""
+async def navigate_all_pages(page, extraction_function, max_pages=None, kind="search"):
+    """Navigate through all pages by incrementing the &page= param in the URL and extract data.
+    kind ("search" or "mutual") is how each page counts in the job's progress."""
     import re
     all_results = []
     current_page = 1
@@ -291,10 +426,12 @@ async def navigate_all_pages(page, extraction_function, max_pages=None):
     while True:
         paged_url = f"{url}{sep}page={current_page}"
         print(f"Navigating to: {paged_url}")
+        page_started = time.monotonic()
         await page.goto(paged_url)
         await page.wait_for_timeout(2000)
         page_results = await extraction_function(page)
         print(f"Page {current_page} results: {len(page_results)}")
+        await job_progress.page_done(kind, time.monotonic() - page_started, len(page_results))
         if not page_results:
             print("No more results, stopping.")
             break
@@ -323,29 +460,60 @@ async def search_and_process_connections(page, network_type: str, company: str =
     query_string = urlencode(params)
     search_url = f"{base_url}{query_string}"
     print(f"\nNavigating to search: {search_url}")
+    await job_progress.begin_search(network_type, max_pages=10)
     await page.goto(search_url)
     # Use pagination-aware extraction
     all_people = await navigate_all_pages(page, extract_people_from_page, max_pages=10)
+    await job_progress.search_done(len(all_people))
     processed_people = []
+    streamed = 0
     for person in all_people:
         person['connection_level'] = 1 if network_type == 'F' else 2 if network_type == 'S' else 3
+        person['role_class'] = dict(classify_role(person.get('role')))
         print(f"\nProcessing: {person['name']} ({person.get('role', 'N/A')})")
         if network_type == 'S' and person.get('profile_url'):
             print(f"Fetching mutual connections for {person['name']}...")
             person['mutual_connections'] = await get_mutual_connections_for_profile(page, person['profile_url'])
             print(f"Found {len(person.get('mutual_connections', []))} mutual connections")
         processed_people.append(person)
+        # Stream results to event subscribers in small batches as they are ready
+        if len(processed_people) - streamed >= JOB_EVENTS_BATCH_SIZE or len(processed_people) == len(all_people):
+            job_events.publish_current("people", {"network": network_type, "people": processed_people[streamed:]})
+            streamed = len(processed_people)
+        await job_progress.profile_done(timed=network_type == 'S' and bool(person.get('profile_url')))
     print(f"\nProcessed {len(processed_people)} {network_type}-degree connections across all pages.")
     return processed_people
 
 async def initialize_browser():
-    """Shared function to initialize browser and handle LinkedIn login"""
+    """Shared function to initialize browser and handle LinkedIn login.
+    Inside a batch, the first job launches the browser and later jobs reuse its logged-in page."""
+    session = batch_session.get()
+    if session is None:
+        return await acquire_browser()
+    if "browser" not in session:
+        session["browser"], session["page"], session["playwright"] = await acquire_browser()
+    if not session["browser"]:
+        return None, None, None
+    return BatchBrowser(session["browser"]), session["page"], BatchBrowser(session["playwright"])
+
+async def acquire_browser():
+    """A page of the pre-warmed browser when it is ready, otherwise a newly launched and logged-in browser"""
+    leased = await browser_pool.acquire()
+    if leased is None:
+        return await launch_browser()
+    return leased, leased.page, BatchBrowser(browser_pool.playwright)
+
+async def launch_browser():
+    """Launch a browser and log in to LinkedIn"""
     print("Launching browser...")
     try:
         # Set persistent browser location for PyInstaller compatibility
         persistent_browser_path = os.path.join(os.path.expanduser("~"), ".playwright-browsers")
         os.environ["PLAYWRIGHT_BROWSERS_PATH"] = persistent_browser_path
         
+        # Playwright is imported on first launch, so importing the server stays cheap
+        from playwright.async_api import async_playwright
+
         # For PyInstaller executables, we need to handle the playwright installation differently
         p = await async_playwright().start()
         
@@ -446,8 +614,10 @@ async def initialize_browser():
 
 async def process_company_connections(company: str, cache_filename: str):
     """Background task to process company connections"""
-    async with browser_semaphore:
+    async with browser_slot():
         print(f"Browser slot acquired for company: {company}. Starting processing.")
+        job_events.bind(cache_filename)
+        job_progress.start(cache_filename, searches=("F", "S"))
         try:
             # No need to check cache here, the endpoint does it.
             print(f"Starting background processing for company: {company} (Cache File: {cache_filename})")
@@ -462,7 +632,7 @@ async def process_company_connections(company: str, cache_filename: str):
                         "timestamp": datetime.now().isoformat(),
                         "error": "Failed to initialize browser or login to LinkedIn"
                     }
-                    save_to_cache(cache_filename, error_result)
+                    await save_to_cache_async(cache_filename, error_result)
                     return error_result
                 
                 try:
@@ -474,6 +644,9 @@ async def process_company_connections(company: str, cache_filename: str):
                     
                     # Combine all results
                     people = first_degree + second_degree
+
+                    # Learn renamed/aliased companies (e.g. Facebook -> Meta) from the headlines
+                    await asyncio.to_thread(company_aliases.learn, company, people)
                     
                     print("\nClosing browser...")
                     await browser.close()
@@ -487,9 +660,9 @@ async def process_company_connections(company: str, cache_filename: str):
                         "company": company,
                         "status": "complete",
                         "timestamp": datetime.now().isoformat(),
-                        "results": people
+                        "results": rank_results(people)
                     }
-                    save_to_cache(cache_filename, result)
+                    await save_to_cache_async(cache_filename, result)
                     return result
                     
                 finally:
@@ -506,15 +679,17 @@ async def process_company_connections(company: str, cache_filename: str):
                     "timestamp": datetime.now().isoformat(),
                     "error": str(e)
                 }
-                save_to_cache(cache_filename, error_result)
+                await save_to_cache_async(cache_filename, error_result)
                 raise e
         finally:
             print(f"Browser slot released for company: {company}.")
 
 async def process_entire_network(cache_filename: str):
     """Background task to crawl all 1st and 2nd degree connections and their mutual connections."""
-    async with browser_semaphore:
+    async with browser_slot():
         print(f"Browser slot acquired for entire network crawl. Starting processing.")
+        job_events.bind(cache_filename)
+        job_progress.start(cache_filename, searches=("F", "S"))
         try:
             browser = None
             p = None
@@ -526,7 +701,7 @@ async def process_entire_network(cache_filename: str):
                         "timestamp": datetime.now().isoformat(),
                         "error": "Failed to initialize browser or login to LinkedIn"
                     }
-                    save_to_cache(cache_filename, error_result)
+                    await save_to_cache_async(cache_filename, error_result)
                     return error_result
                 try:
                     # Search for 1st degree connections
@@ -544,9 +719,14 @@ async def process_entire_network(cache_filename: str):
                     result = {
                         "status": "complete",
                         "timestamp": datetime.now().isoformat(),
-                        "results": people
+                        "results": rank_results(people)
                     }
-                    save_to_cache(cache_filename, result)
+                    # Diff against the previous crawl before its cache entry is replaced
+                    await asyncio.to_thread(record_crawl_changes, result)
+                    await save_to_cache_async(cache_filename, result)
+                    # The crawl is now in the graph; persist it so the next startup is instant
+                    await asyncio.to_thread(save_network_snapshot)
+                    await asyncio.to_thread(run_network_analytics, result)
                     return result
                 finally:
                     if browser:
@@ -559,71 +739,340 @@ async def process_entire_network(cache_filename: str):
                     "timestamp": datetime.now().isoformat(),
                     "error": str(e)
                 }
-                save_to_cache(cache_filename, error_result)
+                await save_to_cache_async(cache_filename, error_result)
                 raise e
         finally:
             print(f"Browser slot released for entire network crawl.")
 
+@app.on_event("startup")
+async def start_background_tasks():
+    """Load the network graph and run cache maintenance (and optional warming) for the life of the server"""
+    ensure_cache_dir()
+    if not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is not set: scraping endpoints work, the assistant is unavailable")
+    assistant_resolver.start()
+    if BROWSER_PREWARM_ENABLED:
+        asyncio.create_task(browser_pool.warm(launch_browser))
+    # The mapped snapshot answers graph queries while the full graph loads from the cache directory
+    snapshot_store.load()
+    asyncio.create_task(asyncio.to_thread(load_network_graph))
+    asyncio.create_task(cache_manager.run_forever())
+    if CACHE_WARMING_ENABLED:
+        asyncio.create_task(cache_warmer.run_forever(run_warming_job, browser_is_idle))
+
+@app.on_event("shutdown")
+async def stop_browser_pool():
+    """Close the pre-warmed browser"""
+    await browser_pool.close()
+
+def load_network_graph():
+    """Move files saved under older cache keys, then build the network graph from the cache directory;
+    write a first snapshot if there is none"""
+    migrate_cache_keys()
+    network_graph.load_from_cache_dir(CACHE_DIR)
+    if snapshot_store.graph is None and network_graph.people:
+        save_network_snapshot()
+
+def save_network_snapshot():
+    try:
+        snapshot_store.save(network_graph)
+    except OSError as e:
+        print(f"Could not write network snapshot: {e}")
+
+def run_network_analytics(crawl: dict = None):
+    """Recompute the reach, bridge and cluster tables served by /network_analytics"""
+    try:
+        analytics_store.run(crawl)
+    except OSError as e:
+        print(f"Could not write network analytics: {e}")
+
+def record_crawl_changes(crawl: dict):
+    try:
+        crawl_changes.record(crawl)
+    except (OSError, ValueError) as e:
+        print(f"Could not record network changes: {e}")
+
+def browser_is_idle() -> bool:
+    """True when no browser job holds a slot"""
+    return browser_semaphore._value == BROWSER_SLOTS
+
+async def run_warming_job(query_name: str, params: dict) -> dict:
+    """Re-scrape a popular query without disturbing its current cache entry.
+
+    The job writes to a side file and saves its result over the entry only when it completes, so
+    interactive queries keep getting the previous result meanwhile and a failed warm-up
+    doesn't overwrite good data with an error.
+    """
+    cache_filename = get_cache_filename(query_name, **params)
+    warming_filename = cache_filename + ".warming"
+    try:
+        if query_name == "company_people_search":
+            result = await process_company_connections(params["company"], warming_filename)
+        elif query_name == "role_search":
+            result = await process_role_search(params["role"], params["company"], warming_filename)
+        else:
+            raise ValueError(f"Query {query_name} can't be warmed")
+        if result and result.get("status") == "complete":
+            # Saved under the real name (not renamed over it) so the save listeners hear about this entry
+            await save_to_cache_async(cache_filename, result)
+        return result
+    finally:
+        await asyncio.to_thread(remove_file_if_exists, warming_filename)
+
+def remove_file_if_exists(path: str):
+    if os.path.exists(path):
+        os.remove(path)
+
+@app.post("/batch")
+async def create_batch(background_tasks: BackgroundTasks, queries: List[dict] = Body(..., embed=True)):
+    """Run many queries in one call, e.g. {"queries": [{"query": "who_do_i_know_at_company", "company": "Acme"},
+    {"query": "who_works_as_role_at_company", "role": "recruiter", "company": "Globex"}]}.
+    Cached and locally answerable items are returned at once; the rest are scraped one after
+    another in a single browser session. Duplicates and queries already running elsewhere are
+    awaited rather than scraped again. Follow per-item completion on /jobs/{batch_id}/events
+    ("item" events) or poll /job_status/{batch_id}."""
+    try:
+        batch = BatchJob(parse_batch_queries(queries))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    scrape_tasks = []
+    batch_jobs = set()
+    for item in batch.items:
+        tasks = BackgroundTasks()
+        try:
+            response = await BATCH_ENDPOINTS[item["query"]](background_tasks=tasks, view=None, **item["params"])
+        except HTTPException as e:
+            batch.update(item["index"], "error", error=e.detail, publish=False)
+            continue
+        job_id = response.get("job_id")
+        if response.get("status") == "complete":
+            plan = response.get("plan")
+            source = plan.get("strategy", "cache") if isinstance(plan, dict) else "cache"
+            batch.update(item["index"], "complete", source=source, result=response, publish=False)
+        elif tasks.tasks and job_id not in batch_jobs:
+            batch.update(item["index"], "queued", job_id=job_id, source="scrape", publish=False)
+            scrape_tasks.append((item["index"], tasks.tasks))
+        else:
+            # Another request (or an earlier item of this batch) is already producing this result
+            batch.update(item["index"], "waiting", job_id=job_id, source="shared", publish=False)
+        batch_jobs.add(job_id)
+    await asyncio.to_thread(batch.save)
+    if not batch.is_done:
+        background_tasks.add_task(process_batch, batch, scrape_tasks)
+    return {**batch.document(), "message": f"{len(batch.items) - len(scrape_tasks)} of {len(batch.items)} "
+                                           f"queries answered or already running; scraping {len(scrape_tasks)}."}
+
+async def process_batch(batch: BatchJob, scrape_tasks: list):
+    """Scrape a batch's queued items in one browser slot and session, then collect the items it waited on"""
+    session = {}
+    token = batch_session.set(session)
+    try:
+        if scrape_tasks:
+            async with browser_semaphore:
+                print(f"Browser slot acquired for batch {batch.batch_id} ({len(scrape_tasks)} queries).")
+                try:
+                    for index, tasks in scrape_tasks:
+                        for task in tasks:
+                            try:
+                                await task()
+                            except Exception as e:
+                                # The job saved its own error state; carry on with the rest of the batch
+                                print(f"Batch query {index} failed: {e}")
+                        await finish_batch_item(batch, index)
+                finally:
+                    if session.get("browser"):
+                        await session["browser"].close()
+                    if session.get("playwright"):
+                        await session["playwright"].stop()
+                    print(f"Browser slot released for batch {batch.batch_id}.")
+        await asyncio.gather(*(wait_for_batch_item(batch, item["index"]) for item in batch.items_with_status("waiting")))
+    finally:
+        batch_session.reset(token)
+        for item in batch.items_with_status("queued") + batch.items_with_status("waiting"):
+            batch.update(item["index"], "error", error="Batch stopped before this query finished")
+        await asyncio.to_thread(batch.save)
+
+async def finish_batch_item(batch: BatchJob, index: int):
+    """Copy a finished job's result (or error) into its batch item"""
+    data = await load_from_cache_async(batch.items[index]["job_id"]) or {}
+    if data.get("status") == "complete":
+        batch.update(index, "complete", result=truncate_ranked(data))
+    else:
+        batch.update(index, "error", error=data.get("error", "Job did not complete"))
+    await asyncio.to_thread(batch.save)
+
+async def wait_for_batch_item(batch: BatchJob, index: int):
+    job_id = batch.items[index]["job_id"]
+    deadline = time.time() + BATCH_MAX_WAIT_SECONDS
+    data = await load_from_cache_async(job_id)
+    while data and data.get("status") not in TERMINAL_STATUSES and time.time() < deadline:
+        data = await job_events.wait_for_status_change(job_id, lambda: load_from_cache_async(job_id),
+                                                       min(JOB_STATUS_MAX_WAIT_SECONDS, deadline - time.time()))
+    await finish_batch_item(batch, index)
+
+@app.get("/cache_stats")
+async def get_cache_stats():
+    """Cache size, entry counts, hit rate per query type and warming activity"""
+    stats = await asyncio.to_thread(cache_manager.stats)
+    stats["warming"] = {"enabled": CACHE_WARMING_ENABLED, **cache_warmer.status()}
+    stats["network_snapshot"] = snapshot_store.stats()
+    return stats
+
+@app.get("/health")
+async def health():
+    """Readiness: 503 while the browser is being pre-warmed, so the first query doesn't wait for a launch"""
+    browser = browser_pool.status()
+    ready = browser["state"] != "warming"
+    body = {
+        "status": "ready" if ready else "warming",
+        "browser": browser,
+        "browser_slots_free": browser_semaphore._value,
+        "assistant": assistant_resolver.status()
+    }
+    return ORJSONResponse(body, status_code=200 if ready else 503)
+
 @app.get("/get_assistant_config")
 async def get_assistant_config():
-    return {"assistant_id": ASSISTANT_ID, "openai_api_key": openai_api_key}
+    assistant_id = await assistant_resolver.wait(ASSISTANT_RESOLVE_TIMEOUT_SECONDS)
+    if not assistant_id:
+        raise HTTPException(status_code=503, detail=assistant_resolver.error or "Assistant is still being resolved")
+    return {"assistant_id": assistant_id, "openai_api_key": os.getenv("OPENAI_API_KEY")}
 
 @app.get("/who_do_i_know_at_company")
-async def browse_public_linkedin(company: str, background_tasks: BackgroundTasks):
+async def browse_public_linkedin(company: str, background_tasks: BackgroundTasks, view: ResultView = Depends(result_view)):
     """Get people at a company from LinkedIn"""
     query_params = {"query_name": "company_people_search", "company": company}
     cache_filename = get_cache_filename(**query_params)
-    cached_data = load_from_cache(cache_filename)
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        cache_manager.record_lookup(query_params, cache_filename, True)
+        return unchanged
+    cached_data = await load_from_cache_async(cache_filename)
+    cache_manager.record_lookup(query_params, cache_filename, bool(cached_data) and cached_data.get('status') == 'complete')
     if cached_data:
         if cached_data.get('status') == 'complete':
-            return cached_data
+            return await asyncio.to_thread(with_cache_plan, cached_data, cache_filename, view)
         elif cached_data.get('status') == 'processing':
             return get_processing_message(**query_params)
-    
-    mark_as_processing(**query_params)
+
+    # Try to answer from a fresh network crawl before launching a browser
+    plan = await asyncio.to_thread(query_planner.plan_company_search, company)
+    if plan.is_complete:
+        return await save_planned_result(cache_filename, plan, view, company=company)
+
+    await mark_as_processing(**query_params)
     background_tasks.add_task(process_company_connections, company, cache_filename)
-    return get_processing_message(**query_params)
+    return processing_reply(query_params, plan, view)
 
 @app.get("/who_works_as_role_at_company")
-async def search_linkedin_role(role: str, company: str, background_tasks: BackgroundTasks):
+async def search_linkedin_role(role: str, company: str, background_tasks: BackgroundTasks, view: ResultView = Depends(result_view)):
     """Search for people with a specific role at a company"""
     query_params = {"query_name": "role_search", "role": role, "company": company}
     cache_filename = get_cache_filename(**query_params)
-    cached_data = load_from_cache(cache_filename)
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        cache_manager.record_lookup(query_params, cache_filename, True)
+        return unchanged
+    cached_data = await load_from_cache_async(cache_filename)
+    cache_manager.record_lookup(query_params, cache_filename, bool(cached_data) and cached_data.get('status') == 'complete')
     if cached_data:
         if cached_data.get('status') == 'complete':
-            return cached_data
+            return await asyncio.to_thread(with_cache_plan, cached_data, cache_filename, view)
         elif cached_data.get('status') == 'processing':
             return get_processing_message(**query_params)
-    
-    mark_as_processing(**query_params)
-    background_tasks.add_task(process_role_search, role, company, cache_filename)
-    return get_processing_message(**query_params)
+
+    # Cached company or crawl data covers 1st and 2nd degree; scrape only what is missing
+    plan = await asyncio.to_thread(query_planner.plan_role_search, role, company)
+    if plan.is_complete:
+        return await save_planned_result(cache_filename, plan, view, role=role, company=company)
+
+    await mark_as_processing(**query_params)
+    if plan.strategy == "scrape":
+        background_tasks.add_task(process_role_search, role, company, cache_filename)
+    else:
+        background_tasks.add_task(process_role_search, role, company, cache_filename,
+                                  networks=plan.missing_networks, known_people=plan.results, plan=plan.describe())
+    return processing_reply(query_params, plan, view)
 
 @app.get("/job_status/{job_id:path}")
-async def get_job_status(job_id: str):
-    """Get the status of a background job from its cache file"""
+async def get_job_status(job_id: str, wait: float = 0, view: ResultView = Depends(result_view)):
+    """Get the status of a background job from its cache file.
+    With wait=N (seconds), a processing job's request is held until its status changes
+    or N seconds pass, so clients learn of completion at once without polling.
+    fields, limit, cursor and include_mutuals page through and trim large results;
+    max_tokens compacts them to a token budget, with job_id and next_cursor to fetch more."""
+    if not os.path.exists(job_id):
+        raise HTTPException(status_code=404, detail="Job not found")
+    if wait > 0:
+        data = await job_events.wait_for_status_change(job_id, lambda: load_from_cache_async(job_id),
+                                                       min(wait, JOB_STATUS_MAX_WAIT_SECONDS))
+        return await asyncio.to_thread(conditional_response, job_id, view, lambda: view_of(data, view, job_id))
+    return await asyncio.to_thread(conditional_response, job_id, view,
+                                   lambda: view_of(parsed_results.load(job_id), view, job_id))
+
+def job_event_data(record: dict):
+    """Finished jobs are sent the way /job_status returns them"""
+    if record and record["event"] == "status" and record["data"].get("status") == "complete":
+        return truncate_ranked(record["data"])
+    return None
+
+@app.get("/jobs/{job_id:path}/events")
+async def stream_job_events(job_id: str, request: Request):
+    """Server-Sent Events for a background job: "status" on every status change (the final one
+    carries the results), "progress" per search page and profile, and "people" for each batch
+    of results as they are scraped. The stream ends when the job completes or fails."""
     if not os.path.exists(job_id):
         raise HTTPException(status_code=404, detail="Job not found")
-    return load_from_cache(job_id)
+    after_id = int(request.headers.get("last-event-id") or 0)
+
+    async def stream():
+        async for record in job_events.subscribe(job_id, lambda: load_from_cache_async(job_id), after_id):
+            yield sse_message(record, job_event_data(record))
+
+    return StreamingResponse(stream(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+@app.websocket("/jobs/{job_id:path}/ws")
+async def job_events_socket(websocket: WebSocket, job_id: str):
+    """The same job events over a WebSocket, one JSON message {"id", "event", "data"} each"""
+    await websocket.accept()
+    if not os.path.exists(job_id):
+        await websocket.close(code=4404, reason="Job not found")
+        return
+    try:
+        async for record in job_events.subscribe(job_id, lambda: load_from_cache_async(job_id)):
+            if record is None:
+                await websocket.send_json({"event": "keep-alive"})
+                continue
+            data = job_event_data(record)
+            await websocket.send_json({**record, "data": record["data"] if data is None else data})
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
 
 @app.get("/crawl_my_entire_network")
-async def crawl_my_entire_network(background_tasks: BackgroundTasks):
+async def crawl_my_entire_network(background_tasks: BackgroundTasks, view: ResultView = Depends(result_view)):
     """Crawl all 1st and 2nd degree connections and their mutual connections."""
     query_params = {"query_name": "entire_network_crawl"}
     cache_filename = get_cache_filename(**query_params)
-    cached_data = load_from_cache(cache_filename)
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        cache_manager.record_lookup(query_params, cache_filename, True)
+        return unchanged
+    cached_data = await load_from_cache_async(cache_filename)
+    cache_manager.record_lookup(query_params, cache_filename, bool(cached_data) and cached_data.get('status') == 'complete')
     if cached_data:
         if cached_data.get('status') == 'complete':
-            return cached_data
+            return await asyncio.to_thread(with_cache_plan, cached_data, cache_filename, view)
         elif cached_data.get('status') == 'processing':
             return get_processing_message(**query_params)
-    mark_as_processing(**query_params)
+    await mark_as_processing(**query_params)
     background_tasks.add_task(process_entire_network, cache_filename)
     return get_processing_message(**query_params)
 
 @app.get("/who_can_introduce_me_to_person")
-async def find_mutual_connections(background_tasks: BackgroundTasks, profile_url: str = None, person: str = None, company: str = None):
+async def find_mutual_connections(background_tasks: BackgroundTasks, profile_url: str = None, person: str = None, company: str = None,
+                                  view: ResultView = Depends(result_view)):
     """Search for mutual connections with a person.
     Either provide:
     1. profile_url - direct link to person's LinkedIn profile, OR
@@ -646,19 +1095,111 @@ async def find_mutual_connections(background_tasks: BackgroundTasks, profile_url
     }
     
     cache_filename = get_cache_filename(**query_params)
-    cached_data = load_from_cache(cache_filename)
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        cache_manager.record_lookup(query_params, cache_filename, True)
+        return unchanged
+    cached_data = await load_from_cache_async(cache_filename)
+    cache_manager.record_lookup(query_params, cache_filename, bool(cached_data) and cached_data.get('status') == 'complete')
     if cached_data:
         if cached_data.get('status') == 'complete':
-            return cached_data
+            return await asyncio.to_thread(with_cache_plan, cached_data, cache_filename, view)
         elif cached_data.get('status') == 'processing':
             return get_processing_message(**query_params)
 
-    mark_as_processing(**query_params)
+    # 2nd degree people in fresh company or crawl results already carry their mutuals
+    plan = await asyncio.to_thread(query_planner.plan_mutual_connections, profile_url=profile_url, person=person, company=company)
+    if plan.is_complete:
+        extra = {}
+        target_url = resolve_graph_person(profile_url, person, company) if plan.strategy == "graph_index" else None
+        if target_url:
+            # Longer chains through the local graph, for when no direct introducer works out
+            extra["intro_paths"] = find_intro_paths(network_graph, target_url, target_company=company)
+        return await save_planned_result(cache_filename, plan, view,
+                                   profile_url=profile_url if profile_url else None,
+                                   person=person if not profile_url else None,
+                                   company=company if not profile_url else None,
+                                   **extra)
+
+    await mark_as_processing(**query_params)
     background_tasks.add_task(process_mutual_connections, person if not profile_url else None, company if not profile_url else None, cache_filename, profile_url)
-    return get_processing_message(**query_params)
+    return processing_reply(query_params, plan, view)
+
+def resolve_graph_person(profile_url: str = None, person: str = None, company: str = None):
+    """Profile URL of a person in the network graph, from a URL or an unambiguous name and company"""
+    if profile_url:
+        return profile_url if network_graph.get_person(profile_url) else None
+    keys = network_graph.find_people(person, company) if person else []
+    return keys[0] if len(keys) == 1 else None
+
+@app.get("/intro_paths")
+async def get_intro_paths(profile_url: str = None, person: str = None, company: str = None, k: int = 5):
+    """Top-K ranked introduction chains to a person, computed from the local network graph only"""
+    if not profile_url and not person:
+        raise HTTPException(status_code=400, detail="Must provide either 'profile_url' OR 'person' (and optionally 'company')")
+    target_url = resolve_graph_person(profile_url, person, company)
+    if not target_url:
+        raise HTTPException(status_code=404, detail="Person not found in the local network graph")
+    paths = await asyncio.to_thread(find_intro_paths, network_graph, target_url, max(1, min(k, 20)), company)
+    return {"status": "complete", "profile_url": target_url, "results": paths,
+            "graph": network_graph.stats(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/search_people")
+async def search_people(company: str = None, title: str = None, location: str = None,
+                        connection_level: int = None, limit: int = 50, seniority: str = None,
+                        function: str = None, recruiter: bool = False, hiring_manager: bool = False):
+    """Search everyone seen in cached results without touching LinkedIn.
+    Each text field takes a boolean query: words are ANDed, 'OR' separates alternatives,
+    '-word' excludes and 'word*' matches a prefix, e.g. title='product manager OR tpm -intern'.
+    seniority and function take classifier labels (e.g. 'director OR vp'); recruiter and
+    hiring_manager filter on the role classification flags."""
+    if not (company or title or location or seniority or function or recruiter or hiring_manager):
+        raise HTTPException(status_code=400, detail="Provide at least one search field")
+    start_time = time.time()
+    result = people_index.search(company=company, title=title, location=location,
+                                 connection_levels=[connection_level] if connection_level else None,
+                                 limit=max(1, min(limit, 500)), seniority=seniority, function=function,
+                                 recruiter=recruiter, hiring_manager=hiring_manager)
+    return {"status": "complete", **result, "query_ms": round((time.time() - start_time) * 1000, 3),
+            "index": people_index.stats(), "timestamp": datetime.now().isoformat()}
+
+@app.get("/network_analytics")
+async def get_network_analytics(limit: int = 20):
+    """Precomputed tables from the last network crawl: best bridges among my 1st degree
+    contacts (with their reach into each company) and clusters of companies reached
+    through the same contacts. Recomputed after each crawl or with `python network_analytics.py`."""
+    tables = await asyncio.to_thread(analytics_store.tables)
+    if tables is None:
+        raise HTTPException(status_code=404, detail="No network analytics yet; run /crawl_my_entire_network first")
+    limit = max(1, min(limit, 500))
+    summary = {key: value for key, value in tables.items() if key not in ("contacts", "company_reach", "clusters")}
+    return {"status": "complete", **summary, "contacts": tables["contacts"][:limit],
+            "clusters": tables["clusters"][:limit], "total_contacts": len(tables["contacts"])}
+
+@app.get("/network_analytics/company_reach")
+async def get_company_reach(company: str):
+    """My 1st degree contacts who know the most 2nd degree people at a company, from the precomputed table"""
+    results = await asyncio.to_thread(analytics_store.company_reach, company)
+    if results is None:
+        raise HTTPException(status_code=404, detail="No network analytics yet; run /crawl_my_entire_network first")
+    return {"status": "complete", "company": company_aliases.canonical(company), "results": results,
+            "built_at": analytics_store.tables()["built_at"]}
+
+@app.get("/network_changes")
+async def get_network_changes(company: str = None, change_type: str = None, since: str = None, limit: int = 100):
+    """Joins, leaves, role changes and new mutual links found by comparing consecutive network crawls,
+    newest first. company matches a person's current or previous employer; change_type is a
+    comma-separated list of: join, leave, role_change, level_change, new_mutual_links."""
+    change_types = [t.strip() for t in change_type.split(",")] if change_type else None
+    if change_types and not set(change_types) <= set(CHANGE_TYPES):
+        raise HTTPException(status_code=400, detail=f"change_type must be among: {', '.join(CHANGE_TYPES)}")
+    results = await asyncio.to_thread(crawl_changes.query, company, change_types, since, max(1, min(limit, 1000)))
+    return {"status": "complete", "company": company_aliases.canonical(company) if company else None,
+            "results": results, "timestamp": datetime.now().isoformat()}
 
 @app.get("/who_does_person_know_at_company")
-async def find_connections_at_company_for_person(background_tasks: BackgroundTasks, profile_url: str = None, person_name: str = None, company_name: str = None):
+async def find_connections_at_company_for_person(background_tasks: BackgroundTasks, profile_url: str = None, person_name: str = None, company_name: str = None,
+                                                 view: ResultView = Depends(result_view)):
     """Find who a specific person knows at a company.
     Either provide:
     1. profile_url - direct link to person's LinkedIn profile, OR
@@ -682,21 +1223,28 @@ async def find_connections_at_company_for_person(background_tasks: BackgroundTas
     }
 
     cache_filename = get_cache_filename(**query_params)
-    cached_data = load_from_cache(cache_filename)
+    unchanged = not_modified(cache_filename, view)
+    if unchanged:
+        cache_manager.record_lookup(query_params, cache_filename, True)
+        return unchanged
+    cached_data = await load_from_cache_async(cache_filename)
+    cache_manager.record_lookup(query_params, cache_filename, bool(cached_data) and cached_data.get('status') == 'complete')
     if cached_data:
         if cached_data.get('status') == 'complete':
-            return cached_data
+            return await asyncio.to_thread(conditional_response, cache_filename, view, lambda: view_of(cached_data, view, cache_filename))
         elif cached_data.get('status') == 'processing':
             return get_processing_message(**query_params)
 
-    mark_as_processing(**query_params)
+    await mark_as_processing(**query_params)
     background_tasks.add_task(process_find_connections_at_company_for_person, person_name if not profile_url else None, company_name, cache_filename, profile_url)
     return get_processing_message(**query_params)
 
 async def process_mutual_connections(person: str, company: str, cache_filename: str, profile_url: str = None):
     """Background task to process mutual connections"""
-    async with browser_semaphore:
+    async with browser_slot():
         print(f"Browser slot acquired for mutual connections with '{profile_url if profile_url else person} at {company}'. Starting processing.")
+        job_events.bind(cache_filename)
+        job_progress.start(cache_filename, profiles=1)
         try:
             # No need to check cache here
             print(f"Starting mutual connections processing for {profile_url if profile_url else person} at {company} (Cache File: {cache_filename})")
@@ -713,12 +1261,18 @@ async def process_mutual_connections(person: str, company: str, cache_filename:
                         "timestamp": datetime.now().isoformat(),
                         "error": "Failed to initialize browser or login to LinkedIn"
                     }
-                    with open(cache_filename, 'w') as f:
-                        json.dump(error_result, f, indent=2)
+                    await save_to_cache_async(cache_filename, error_result)
                     return error_result
 
                 try:
                     navigate_to_url = profile_url
+                    name_resolution = None
+                    if not navigate_to_url:
+                        # A confident local name match saves the LinkedIn keyword search
+                        name_resolution = name_index.resolve(person, company=company)
+                        navigate_to_url = name_resolution.profile_url
+                        if navigate_to_url:
+                            print(f"Resolved {person} at {company} locally to {navigate_to_url} (confidence {name_resolution.confidence})")
                     # Search for the person at the company or use provided URL
                     if not navigate_to_url:
                         search_url = f"https://www.linkedin.com/search/results/people/?keywords={person}&origin=GLOBAL_SEARCH_HEADER&company={company}"
@@ -748,6 +1302,7 @@ async def process_mutual_connections(person: str, company: str, cache_filename:
 
                     # Get mutual connections using the shared function
                     mutual_connections = await get_mutual_connections_for_profile(page, navigate_to_url)
+                    await job_progress.profile_done(timed=False)
 
                     print("\nClosing browser...")
                     await browser.close()
@@ -760,12 +1315,14 @@ async def process_mutual_connections(person: str, company: str, cache_filename:
                         "profile_url": profile_url if profile_url else None,
                         "person": person if not profile_url else None,
                         "company": company if not profile_url else None,
+                        "target_profile_url": navigate_to_url,
                         "status": "complete",
                         "timestamp": datetime.now().isoformat(),
-                        "results": mutual_connections
+                        "results": rank_results(mutual_connections)
                     }
-                    with open(cache_filename, 'w') as f:
-                        json.dump(result, f, indent=2)
+                    if name_resolution:
+                        result["name_resolution"] = name_resolution.describe()
+                    await save_to_cache_async(cache_filename, result)
                     
                     return result
 
@@ -790,8 +1347,7 @@ async def process_mutual_connections(person: str, company: str, cache_filename:
                 "timestamp": datetime.now().isoformat(),
                 "error": str(e)
             }
-            with open(cache_filename, 'w') as f:
-                json.dump(error_result, f, indent=2)
+            await save_to_cache_async(cache_filename, error_result)
             if browser:
                 await browser.close()
             if p:
@@ -802,8 +1358,10 @@ async def process_mutual_connections(person: str, company: str, cache_filename:
 
 async def process_find_connections_at_company_for_person(person_name: str, company_name: str, cache_filename: str, profile_url: str = None):
     """Background task to find connections of a person at a company."""
-    async with browser_semaphore:
+    async with browser_slot():
         print(f"Browser slot acquired for finding connections at '{company_name}' for '{profile_url if profile_url else person_name}'.")
+        job_events.bind(cache_filename)
+        job_progress.start(cache_filename, searches=("company",))
         try:
             browser = None
             p = None
@@ -818,14 +1376,20 @@ async def process_find_connections_at_company_for_person(person_name: str, compa
                         "timestamp": datetime.now().isoformat(),
                         "error": "Failed to initialize browser or login to LinkedIn"
                     }
-                    with open(cache_filename, 'w') as f:
-                        json.dump(error_result, f, indent=2)
+                    await save_to_cache_async(cache_filename, error_result)
                     return error_result
 
                 try:
                     navigate_to_url = profile_url
+                    name_resolution = None
+                    if not navigate_to_url:
+                        # Only 1st degree connections' networks are visible, so only they can match
+                        name_resolution = name_index.resolve(person_name, connection_levels=(1,))
+                        navigate_to_url = name_resolution.profile_url
+                        if navigate_to_url:
+                            print(f"Resolved {person_name} locally to {navigate_to_url} (confidence {name_resolution.confidence})")
                     # Navigate to profile or search for person
-                    if not profile_url:
+                    if not navigate_to_url:
                         search_url = f'https://www.linkedin.com/search/results/people/?keywords={person_name}&origin=GLOBAL_SEARCH_HEADER&network=%5B"F"%5D'
                         await page.goto(search_url)
                         
@@ -859,12 +1423,14 @@ async def process_find_connections_at_company_for_person(person_name: str, compa
                         "profile_url": profile_url if profile_url else None,
                         "person_name": person_name if not profile_url else None,
                         "company_name": company_name,
+                        "target_profile_url": navigate_to_url,
                         "status": "complete",
                         "timestamp": datetime.now().isoformat(),
-                        "results": connections
+                        "results": rank_results(connections)
                     }
-                    with open(cache_filename, 'w') as f:
-                        json.dump(result, f, indent=2)
+                    if name_resolution:
+                        result["name_resolution"] = name_resolution.describe()
+                    await save_to_cache_async(cache_filename, result)
                     return result
 
                 except Exception as e:
@@ -887,8 +1453,7 @@ async def process_find_connections_at_company_for_person(person_name: str, compa
                 "timestamp": datetime.now().isoformat(),
                 "error": str(e)
             }
-            with open(cache_filename, 'w') as f:
-                json.dump(error_result, f, indent=2)
+            await save_to_cache_async(cache_filename, error_result)
             if browser:
                 await browser.close()
             if p:
@@ -897,10 +1462,16 @@ async def process_find_connections_at_company_for_person(person_name: str, compa
         finally:
             print(f"Browser slot released for finding connections at '{company_name}' for '{profile_url if profile_url else person_name}'.")
 
-async def process_role_search(role: str, company: str, cache_filename: str):
-    """Background task to process role search"""
-    async with browser_semaphore:
+async def process_role_search(role: str, company: str, cache_filename: str, networks=("F", "S", "T"), known_people=None, plan=None):
+    """Background task to process role search.
+
+    When the query planner already answered part of the search from cached data,
+    known_people holds those results and networks lists only the networks left to scrape.
+    """
+    async with browser_slot():
         print(f"Browser slot acquired for role '{role}'. Starting processing.")
+        job_events.bind(cache_filename)
+        job_progress.start(cache_filename, searches=networks)
         try:
             # No need to check cache here
             print(f"Starting background processing for role '{role}' at company: {company} (Cache File: {cache_filename})")
@@ -912,11 +1483,9 @@ async def process_role_search(role: str, company: str, cache_filename: str):
                     raise Exception("Failed to initialize browser or login to LinkedIn")
                 
                 # Search for 1st, 2nd, and 3rd degree connections matching the role
-                first_degree = await search_and_process_connections(page, 'F', company=company, role=role)
-                second_degree = await search_and_process_connections(page, 'S', company=company, role=role)
-                third_degree = await search_and_process_connections(page, 'T', company=company, role=role)
-                
-                people = first_degree + second_degree + third_degree
+                people = list(known_people or [])
+                for network_type in networks:
+                    people += await search_and_process_connections(page, network_type, company=company, role=role)
 
                 # if no people are found, return an error
                 if len(people) == 0:
@@ -930,14 +1499,16 @@ async def process_role_search(role: str, company: str, cache_filename: str):
                     "company": company,
                     "status": "complete",
                     "timestamp": datetime.now().isoformat(),
-                    "results": people
+                    "results": rank_results(people)
                 }
-                save_to_cache(cache_filename, result)
+                if plan:
+                    result["plan"] = plan
+                await save_to_cache_async(cache_filename, result)
                 return result
                     
             except Exception as e:
                 error_result = { "role": role, "company": company, "status": "error", "timestamp": datetime.now().isoformat(), "error": str(e) }
-                save_to_cache(cache_filename, error_result)
+                await save_to_cache_async(cache_filename, error_result)
                 raise e
             finally:
                 if browser: await browser.close()
@@ -981,6 +1552,7 @@ async def connections_at_company_for_person(page, company_name):
         await page.wait_for_selector('.search-results-container', timeout=30000)
         
         print("Extracting people from final results page...")
+        await job_progress.begin_search("company")
         people = await navigate_all_pages(page, extract_people_from_page)
         return people
 
@@ -988,6 +1560,14 @@ async def connections_at_company_for_person(page, company_name):
         print(f"An error occurred in find_connections_at_company_for_person: {e}")
         return None, str(e)
 
+# Batch query name -> the endpoint that answers it
+BATCH_ENDPOINTS = {
+    "who_do_i_know_at_company": browse_public_linkedin,
+    "who_works_as_role_at_company": search_linkedin_role,
+    "who_can_introduce_me_to_person": find_mutual_connections,
+    "who_does_person_know_at_company": find_connections_at_company_for_person,
+}
+
 if __name__ == "__main__":
     # Normal server startup (browser installation check is handled at the top)
     uvicorn.run(app, host="127.0.0.1", port=8001)
@@ -0,0 +1,182 @@
+import os
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+from cache_keys import headline_company, normalize_person_name
+from cache_store import company_aliases
+from logger_config import logger, LogCategory
+
+# A local match is used instead of a LinkedIn search only at or above this confidence...
+NAME_MATCH_MIN_CONFIDENCE = float(os.getenv("LINKEDIN_NAME_MATCH_MIN_CONFIDENCE", "0.85"))
+# ...and only when the runner-up is at least this far behind
+NAME_MATCH_MARGIN = float(os.getenv("LINKEDIN_NAME_MATCH_MARGIN", "0.15"))
+# Candidates must share at least this fraction of the query's trigrams (or a phonetic key)
+MIN_TRIGRAM_OVERLAP = 0.3
+
+SOUNDEX_CODES = {c: str(d) for d, letters in enumerate(["aeiouyhw", "bfpv", "cgjkqsxz", "dt", "l", "mn", "r"])
+                 for c in letters}
+
+def soundex(word: str) -> str:
+    """Classic four character Soundex code, e.g. Robert and Rupert -> r163"""
+    letters = [c for c in word.lower() if c.isalpha()]
+    if not letters:
+        return ""
+    code, previous = letters[0], SOUNDEX_CODES.get(letters[0], "")
+    for c in letters[1:]:
+        digit = SOUNDEX_CODES.get(c, "")
+        if digit and digit != "0" and digit != previous:
+            code += digit
+        if c not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+def trigrams(name: str) -> Set[str]:
+    padded = f"  {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def phonetic_keys(name: str) -> Set[str]:
+    """Soundex of each name token with the first letter replaced by its code, so Catherine and Katherine agree"""
+    keys = set()
+    for token in name.split():
+        code = soundex(token)
+        if code:
+            keys.add(SOUNDEX_CODES.get(code[0], code[0]) + code[1:])
+    return keys
+
+def name_similarity(query: str, candidate: str) -> float:
+    """0..1 similarity of two normalized names: trigram overlap blended with phonetic token agreement"""
+    if query == candidate:
+        return 1.0
+    q_grams, c_grams = trigrams(query), trigrams(candidate)
+    dice = 2 * len(q_grams & c_grams) / (len(q_grams) + len(c_grams)) if q_grams and c_grams else 0.0
+    q_keys, c_keys = phonetic_keys(query), phonetic_keys(candidate)
+    phonetic = len(q_keys & c_keys) / len(q_keys | c_keys) if q_keys and c_keys else 0.0
+    return round(0.7 * dice + 0.3 * phonetic, 4)
+
+@dataclass
+class NameResolution:
+    """Outcome of resolving a name locally; profile_url is set only for a confident, unambiguous match"""
+    query: str
+    matches: List[dict] = field(default_factory=list)
+    profile_url: Optional[str] = None
+    confidence: float = 0.0
+
+    @property
+    def reason(self) -> str:
+        if self.profile_url:
+            return "resolved"
+        if not self.matches or self.matches[0]["confidence"] < NAME_MATCH_MIN_CONFIDENCE:
+            return "no_confident_match"
+        return "ambiguous"
+
+    def describe(self) -> dict:
+        return {"source": "name_index", "query": self.query, "result": self.reason,
+                "profile_url": self.profile_url, "confidence": self.confidence, "candidates": self.matches[:5]}
+
+class NameIndex:
+    """Trigram and Soundex index over the names of every known person, scoped by company and degree"""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.people: Dict[str, dict] = {}
+        self._names: Dict[str, str] = {}
+        self.gram_postings: Dict[str, Set[str]] = {}
+        self.phonetic_postings: Dict[str, Set[str]] = {}
+
+    def _keys_for(self, name: str):
+        return ([(self.gram_postings, g) for g in trigrams(name)]
+                + [(self.phonetic_postings, k) for k in phonetic_keys(name)])
+
+    def index_person(self, person: dict):
+        """Add or re-index a person by normalized display name"""
+        key = person.get("profile_url")
+        name = normalize_person_name(person.get("name"))
+        if not key:
+            return
+        with self._lock:
+            self.people[key] = person
+            old_name = self._names.get(key)
+            if old_name == name:
+                return
+            if old_name:
+                for postings, term in self._keys_for(old_name):
+                    postings.get(term, set()).discard(key)
+            if name:
+                for postings, term in self._keys_for(name):
+                    postings.setdefault(term, set()).add(key)
+                self._names[key] = name
+            else:
+                self._names.pop(key, None)
+
+    def index_people(self, people: Iterable[dict]):
+        for person in people:
+            self.index_person(person)
+
+    def remove_person(self, key: str):
+        """Drop a person and their trigram and Soundex postings"""
+        with self._lock:
+            self.people.pop(key, None)
+            name = self._names.pop(key, None)
+            if not name:
+                return
+            for postings, term in self._keys_for(name):
+                posting = postings.get(term)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del postings[term]
+
+    def _in_scope(self, person: dict, company: Optional[str], connection_levels) -> bool:
+        if connection_levels and person.get("connection_level") not in connection_levels:
+            return False
+        if company:
+            canonical = company_aliases.canonical(company)
+            employer = headline_company(person.get("role"))
+            if canonical not in person.get("companies", ()) and not (employer and company_aliases.canonical(employer) == canonical):
+                return False
+        return True
+
+    def candidates(self, name: str, company: Optional[str] = None,
+                   connection_levels: Optional[Iterable[int]] = None) -> List[dict]:
+        """In-scope people whose names resemble the query, best first, with confidence scores"""
+        query = normalize_person_name(name)
+        if not query:
+            return []
+        levels = set(connection_levels) if connection_levels else None
+        grams = trigrams(query)
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for gram in grams:
+                for key in self.gram_postings.get(gram, ()):
+                    counts[key] = counts.get(key, 0) + 1
+            keys = {k for k, n in counts.items() if n >= MIN_TRIGRAM_OVERLAP * len(grams)}
+            for phonetic in phonetic_keys(query):
+                keys |= self.phonetic_postings.get(phonetic, set())
+            matches = []
+            for key in keys:
+                person = self.people[key]
+                if not self._in_scope(person, company, levels):
+                    continue
+                matches.append({"name": person.get("name"), "profile_url": key, "role": person.get("role"),
+                                "connection_level": person.get("connection_level"),
+                                "confidence": name_similarity(query, self._names.get(key, ""))})
+        matches.sort(key=lambda m: (-m["confidence"], m["connection_level"] or 9))
+        return matches
+
+    def resolve(self, name: str, company: Optional[str] = None,
+                connection_levels: Optional[Iterable[int]] = None) -> NameResolution:
+        """Resolve a name to one profile URL when the best local match is confident and clearly ahead"""
+        matches = self.candidates(name, company, connection_levels)
+        resolution = NameResolution(query=name, matches=matches)
+        if matches:
+            best = matches[0]["confidence"]
+            runner_up = matches[1]["confidence"] if len(matches) > 1 else 0.0
+            resolution.confidence = best
+            if best >= NAME_MATCH_MIN_CONFIDENCE and best - runner_up >= NAME_MATCH_MARGIN:
+                resolution.profile_url = matches[0]["profile_url"]
+        logger.info(LogCategory.CACHE, "name_resolution", query=name, company=company, result=resolution.reason,
+                    confidence=resolution.confidence, candidates=len(matches), cache_hit=bool(resolution.profile_url))
+        return resolution
+
+# Create a global name index instance
+name_index = NameIndex()
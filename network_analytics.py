@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+from atomic_files import write_json_atomic
+from cache_keys import headline_company
+from cache_store import CACHE_DIR, get_cache_filename, load_from_cache, company_aliases
+from compact_graph import CompactGraph, CompactGraphBuilder
+from logger_config import logger, LogCategory
+if TYPE_CHECKING:
+    import numpy as np
+    from scipy import sparse
+
+ANALYTICS_PATH = os.path.join(CACHE_DIR, "_network_analytics.json")
+# Contacts listed per company, and companies listed per contact
+ANALYTICS_TOP_N = int(os.getenv("LINKEDIN_ANALYTICS_TOP_N", "10"))
+# Companies whose introducer profiles have at least this cosine similarity join the same cluster
+CLUSTER_SIMILARITY = float(os.getenv("LINKEDIN_ANALYTICS_CLUSTER_SIMILARITY", "0.5"))
+PAGERANK_DAMPING = 0.85
+PAGERANK_ITERATIONS = 100
+PAGERANK_TOLERANCE = 1e-8
+
+def adjacency_matrix(graph: CompactGraph) -> "sparse.csr_matrix":
+    """The CSR adjacency of a compact graph as a SciPy matrix; no copy of the index arrays"""
+    import numpy as np
+    from scipy import sparse
+    n = graph.person_count
+    data = np.ones(len(graph.indices), dtype=np.float32)
+    return sparse.csr_matrix((data, graph.indices, graph.indptr), shape=(n, n))
+
+def company_matrix(graph: CompactGraph) -> Tuple["sparse.csr_matrix", List[str]]:
+    """People x companies membership, from the stored company or the headline's employer.
+
+    Each distinct company and headline string is resolved once; people are mapped to their
+    column with array indexing. Columns are in order of each company's first member.
+    """
+    import numpy as np
+    from scipy import sparse
+    names: Dict[str, int] = {}
+    label = lambda name: names.setdefault(name, len(names)) if name else -1
+    pids = np.arange(1, graph.person_count)
+    company_ids, inverse = np.unique(np.asarray(graph.columns["company"][1:]), return_inverse=True)
+    labels = np.array([label(graph.strings[int(i)]) for i in company_ids], dtype=np.int64)[inverse]
+    missing = labels < 0
+    if missing.any():
+        role_ids, inverse = np.unique(np.asarray(graph.columns["role"][1:])[missing], return_inverse=True)
+        employers = [headline_company(graph.strings[int(i)]) for i in role_ids]
+        labels[missing] = np.array([label(company_aliases.canonical(e)) if e else -1 for e in employers],
+                                   dtype=np.int64)[inverse]
+    known = labels >= 0
+    rows, labels = pids[known], labels[known]
+    used, first, inverse = np.unique(labels, return_index=True, return_inverse=True)
+    order = np.argsort(first, kind="stable")
+    column_of = np.empty(len(used), dtype=np.int64)
+    column_of[order] = np.arange(len(used))
+    label_names = list(names)
+    matrix = sparse.csr_matrix((np.ones(len(rows), dtype=np.float32), (rows, column_of[inverse])),
+                               shape=(graph.person_count, len(used)))
+    return matrix, [label_names[i] for i in used[order].tolist()]
+
+def pagerank(adjacency: "sparse.csr_matrix") -> "np.ndarray":
+    """PageRank by power iteration with sparse matrix-vector products"""
+    import numpy as np
+    n = adjacency.shape[0]
+    out_degree = np.asarray(adjacency.sum(axis=1)).ravel()
+    inverse_degree = np.divide(1.0, out_degree, out=np.zeros(n), where=out_degree > 0)
+    transition = adjacency.T.tocsr()
+    rank = np.full(n, 1.0 / n)
+    for _ in range(PAGERANK_ITERATIONS):
+        dangling = rank[out_degree == 0].sum()
+        updated = PAGERANK_DAMPING * (transition @ (rank * inverse_degree) + dangling / n) + (1 - PAGERANK_DAMPING) / n
+        converged = np.abs(updated - rank).sum() < PAGERANK_TOLERANCE
+        rank = updated
+        if converged:
+            break
+    return rank
+
+def top_entries(row: "sparse.csr_matrix", labels, limit: int) -> List[tuple]:
+    """(label, value) pairs of the largest entries of a one-row sparse matrix"""
+    import numpy as np
+    order = np.argsort(-row.data, kind="stable")[:limit]
+    return [(labels[row.indices[i]], int(row.data[i])) for i in order]
+
+def compute_analytics(graph: CompactGraph, target_companies: Optional[Iterable[str]] = None,
+                      top_n: int = ANALYTICS_TOP_N) -> dict:
+    """Reach, bridge and centrality tables for every 1st degree contact, plus company clusters.
+
+    With F = 1st degree contacts and S = 2nd degree people:
+    reach = A[F, S] @ C[S] counts each contact's 2nd degree people per company;
+    bridge = A[F, S] @ (1 / introducers(S)) credits each contact with its share of every
+    2nd degree person it can introduce, so sole introducers score highest.
+    """
+    import numpy as np
+    start_time = time.time()
+    adjacency = adjacency_matrix(graph)
+    companies, company_names = company_matrix(graph)
+    first = np.flatnonzero(np.asarray(graph.levels) == 1)
+    second = np.flatnonzero(np.asarray(graph.levels) == 2)
+    first_to_second = adjacency[first][:, second]
+
+    reach = (first_to_second @ companies[second]).tocsr()
+    introducers = np.asarray(first_to_second.sum(axis=0)).ravel()
+    share = np.divide(1.0, introducers, out=np.zeros(len(second)), where=introducers > 0)
+    bridge = first_to_second @ share
+    exclusive = first_to_second @ (introducers == 1).astype(np.float32)
+    second_degree_reach = np.asarray(first_to_second.sum(axis=1)).ravel()
+    rank = pagerank(adjacency)
+
+    first_people = [graph.person(pid) for pid in first.tolist()]
+    contacts = []
+    for row, pid in enumerate(first.tolist()):
+        person = first_people[row]
+        contacts.append({
+            "profile_url": person["profile_url"], "name": person["name"], "role": person["role"],
+            "second_degree_reach": int(second_degree_reach[row]),
+            "bridge_score": round(float(bridge[row]), 4),
+            "exclusive_reach": int(exclusive[row]),
+            "pagerank": round(float(rank[pid]) * graph.person_count, 4),
+            "top_companies": [{"company": c, "people": v} for c, v in top_entries(reach[row], company_names, top_n)]
+        })
+    contacts.sort(key=lambda c: c["bridge_score"], reverse=True)
+
+    # Company -> best introducers, from the transposed reach matrix
+    by_company = reach.T.tocsr()
+    targets = {company_aliases.canonical(c) for c in target_companies} if target_companies else None
+    company_reach = {}
+    for col, company in enumerate(company_names):
+        if targets is not None and company not in targets:
+            continue
+        row = by_company[col]
+        if row.nnz == 0:
+            continue
+        company_reach[company] = [
+            {"profile_url": first_people[i]["profile_url"], "name": first_people[i]["name"], "people": int(v)}
+            for i, v in ((row.indices[j], row.data[j]) for j in np.argsort(-row.data, kind="stable")[:top_n])
+        ]
+
+    clusters = company_clusters(reach, company_names)
+    duration_ms = (time.time() - start_time) * 1000
+    return {
+        "built_at": datetime.now().isoformat(),
+        "duration_ms": round(duration_ms, 1),
+        "people": graph.person_count - 1,
+        "edges": graph.edge_count,
+        "first_degree": len(first),
+        "second_degree": len(second),
+        "companies": len(company_names),
+        "contacts": contacts,
+        "company_reach": company_reach,
+        "clusters": clusters
+    }
+
+def company_clusters(reach: "sparse.csr_matrix", company_names: List[str]) -> List[dict]:
+    """Groups of companies reached through the same contacts (cosine similarity of reach columns)"""
+    import numpy as np
+    from scipy import sparse
+    from scipy.sparse.csgraph import connected_components
+    if not company_names:
+        return []
+    norms = np.sqrt(np.asarray(reach.multiply(reach).sum(axis=0)).ravel())
+    scale = sparse.diags(np.divide(1.0, norms, out=np.zeros(len(norms)), where=norms > 0))
+    normalized = reach @ scale
+    similarity = (normalized.T @ normalized).tocsr()
+    similarity.data[similarity.data < CLUSTER_SIMILARITY] = 0
+    similarity.eliminate_zeros()
+    count, labels = connected_components(similarity, directed=False)
+    people = np.asarray(reach.sum(axis=0)).ravel()
+    clusters = []
+    for label in range(count):
+        members = np.flatnonzero(labels == label)
+        if len(members) < 2:
+            continue
+        members = members[np.argsort(-people[members], kind="stable")]
+        clusters.append({"companies": [company_names[i] for i in members.tolist()],
+                         "people": int(people[members].sum())})
+    clusters.sort(key=lambda c: c["people"], reverse=True)
+    return clusters
+
+def graph_from_crawl(crawl: dict) -> CompactGraph:
+    """Compact graph of an entire_network_crawl result"""
+    builder = CompactGraphBuilder()
+    builder.add_result(crawl, "entire_network_crawl")
+    return builder.build()
+
+class AnalyticsStore:
+    """Precomputed analytics tables, written by the batch job and served by the endpoints"""
+
+    def __init__(self, path: str = ANALYTICS_PATH):
+        self.path = path
+        self._tables: Optional[dict] = None
+        self._mtime = None
+
+    def run(self, crawl: Optional[dict] = None, target_companies: Optional[Iterable[str]] = None) -> Optional[dict]:
+        """Compute the tables from the cached (or given) network crawl and store them"""
+        crawl = crawl or load_from_cache(get_cache_filename("entire_network_crawl"))
+        if not crawl or crawl.get("status") != "complete":
+            return None
+        tables = compute_analytics(graph_from_crawl(crawl), target_companies)
+        tables["source_timestamp"] = crawl.get("timestamp")
+        write_json_atomic(self.path, tables)
+        self._tables, self._mtime = tables, os.path.getmtime(self.path)
+        logger.info(LogCategory.CACHE, "network_analytics", duration_ms=tables["duration_ms"],
+                    people=tables["people"], edges=tables["edges"], companies=tables["companies"],
+                    clusters=len(tables["clusters"]))
+        return tables
+
+    def tables(self) -> Optional[dict]:
+        """Stored tables, reloaded only when the file changes"""
+        if not os.path.exists(self.path):
+            return None
+        mtime = os.path.getmtime(self.path)
+        if self._tables is None or mtime != self._mtime:
+            with open(self.path, 'r') as f:
+                self._tables = json.load(f)
+            self._mtime = mtime
+        return self._tables
+
+    def company_reach(self, company: str) -> Optional[List[dict]]:
+        tables = self.tables()
+        if tables is None:
+            return None
+        return tables["company_reach"].get(company_aliases.canonical(company), [])
+
+# Create a global analytics store instance
+analytics_store = AnalyticsStore()
+
+if __name__ == "__main__":
+    # Batch job: python network_analytics.py [crawl cache file] [--companies acme,globex]
+    args = sys.argv[1:]
+    companies = None
+    if "--companies" in args:
+        i = args.index("--companies")
+        companies = [c.strip() for c in args[i + 1].split(",") if c.strip()]
+        del args[i:i + 2]
+    crawl = None
+    if args:
+        with open(args[0], 'r') as f:
+            crawl = json.load(f)
+    result = analytics_store.run(crawl, companies)
+    if result is None:
+        print("No completed entire_network_crawl found; run /crawl_my_entire_network first.")
+        sys.exit(1)
+    print(json.dumps({key: result[key] for key in ("people", "edges", "first_degree", "second_degree", "companies",
+                                                   "duration_ms")}, indent=2))
+    print(f"{len(result['clusters'])} company clusters; tables written to {analytics_store.path}")
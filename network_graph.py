@@ -0,0 +1,280 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from cache_keys import headline_company, normalize_profile_url, normalize_person_name
+from cache_store import CACHE_MAX_AGE_HOURS, company_aliases
+from cache_manager import query_type, STALE_RETENTION_FACTOR
+from role_classifier import classify_role
+from logger_config import logger, LogCategory
+
+# Node key for the user themself
+ME = "me"
+# People and links not seen in a result for this long are dropped (as the cache files behind them are)
+GRAPH_RETENTION_HOURS = float(os.getenv("LINKEDIN_GRAPH_RETENTION_HOURS", str(CACHE_MAX_AGE_HOURS * STALE_RETENTION_FACTOR)))
+
+def edge_key(a: str, b: str) -> Tuple[str, str]:
+    return (a, b) if a < b else (b, a)
+
+# Result parsing shared by NetworkGraph and compact_graph.CompactGraphBuilder; index is either of them
+
+def apply_mutuals(index, target: dict, mutual_connections: List[dict], target_level: Optional[int] = 2,
+                  company: Optional[str] = None, seen_at: Optional[str] = None) -> Optional[str]:
+    """Link a person to the full list of mutual connections they share with me in index"""
+    with index._lock:
+        target_key = index.add_person(target, target_level, company, seen_at)
+        if not target_key or not index._begin_mutuals(target_key, seen_at):
+            return target_key
+        for mutual in mutual_connections or []:
+            index._link(target_key, index.add_person(mutual, 1, seen_at=seen_at), seen_at)
+        return target_key
+
+def apply_result(index, data: dict, query_name: str):
+    """Incorporate one completed cache document into index"""
+    if not data or data.get("status") != "complete":
+        return
+    results = data.get("results") or []
+    if not isinstance(results, list):
+        return
+    seen_at = data.get("timestamp")
+    with index._lock:
+        if query_name in ("company_people_search", "role_search", "entire_network_crawl"):
+            company = data.get("company")
+            for person in results:
+                if "mutual_connections" in person:
+                    apply_mutuals(index, person, person["mutual_connections"], person.get("connection_level"),
+                                  company, seen_at)
+                else:
+                    index.add_person(person, company=company, seen_at=seen_at)
+        elif query_name == "mutual_connections":
+            target_url = data.get("target_profile_url") or data.get("profile_url")
+            if target_url:
+                target = {"profile_url": target_url, "name": data.get("person") or ""}
+                apply_mutuals(index, target, results, company=data.get("company"), seen_at=seen_at)
+        elif query_name == "connections_through_person":
+            # The person is my 1st degree contact; their connections at the company are within reach
+            source_url = data.get("target_profile_url") or data.get("profile_url")
+            source_key = index.add_person({"profile_url": source_url, "name": data.get("person_name") or ""}, 1,
+                                          seen_at=seen_at)
+            for person in results:
+                if isinstance(person, dict):
+                    person_key = index.add_person(person, company=data.get("company_name"), seen_at=seen_at)
+                    # Incidental to the person's mutuals, so never overrides a newer full list
+                    if person_key and index._is_current(person_key, seen_at):
+                        index._link(source_key, person_key, seen_at)
+        elif query_name == "profile_mutuals":
+            apply_mutuals(index, {"profile_url": data.get("profile_url")}, data.get("mutual_connections"), seen_at=seen_at)
+
+def load_cache_dir(index, cache_dir: str) -> int:
+    """Feed every completed result and profile entry in the cache to index, then expire it"""
+    start_time = time.time()
+    loaded = 0
+    for directory, forced_type in ((cache_dir, None), (os.path.join(cache_dir, "profiles"), "profile_mutuals")):
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json") or name.startswith("_"):
+                continue
+            try:
+                with open(os.path.join(directory, name), 'r') as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if forced_type:
+                data = {**data, "status": "complete"}
+            apply_result(index, data, forced_type or query_type(name))
+            loaded += 1
+    index.loaded_files = loaded
+    index.expire()
+    index.ready = True
+    logger.info(LogCategory.CACHE, "network_graph_load", duration_ms=(time.time() - start_time) * 1000,
+                files=loaded, **index.stats())
+    return loaded
+
+class NetworkGraph:
+    """In-memory adjacency index of the network described by scraped results.
+
+    Nodes are canonical profile URLs. Edges connect me to 1st degree contacts and
+    1st degree contacts to the 2nd degree people they share with me (their mutuals).
+
+    A person's introducers are only known once their full mutual connection list was
+    fetched (mutuals_fetched_at); a newer list replaces the links from older ones, and
+    links other results imply are only kept when they are newer than the list. Nodes and
+    edges carry the timestamp of the latest result that contained them, for expire().
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.people: Dict[str, dict] = {}
+        self.adjacency: Dict[str, Set[str]] = {ME: set()}
+        self.edge_seen_at: Dict[Tuple[str, str], str] = {}
+        self.loaded_files = 0
+        # False until the startup load from the cache directory has finished
+        self.ready = False
+        self._person_listeners: List[Callable[[dict], None]] = []
+        self._person_removed_listeners: List[Callable[[str], None]] = []
+
+    @property
+    def edge_count(self) -> int:
+        return sum(len(n) for n in self.adjacency.values()) // 2
+
+    def add_person_listener(self, listener: Callable[[dict], None]):
+        """Call listener(node) whenever a person node is added or updated"""
+        self._person_listeners.append(listener)
+
+    def add_person_removed_listener(self, listener: Callable[[str], None]):
+        """Call listener(key) whenever a person node is removed, e.g. by expire()"""
+        self._person_removed_listeners.append(listener)
+
+    def add_person(self, person: dict, connection_level: Optional[int] = None, company: Optional[str] = None,
+                   seen_at: Optional[str] = None) -> Optional[str]:
+        """Add or update a person node; returns its key, or None if it has no profile URL"""
+        key = normalize_profile_url(person.get("profile_url"))
+        if not key:
+            return None
+        with self._lock:
+            node = self.people.get(key)
+            if node is None:
+                node = {"profile_url": key, "name": "", "role": "", "location": "",
+                        "connection_level": None, "companies": set(), "seen_at": None,
+                        "mutuals_fetched_at": None}
+                self.people[key] = node
+                self.adjacency[key] = set()
+            for field in ("name", "role", "location"):
+                if person.get(field):
+                    node[field] = person[field]
+            if person.get("role") or "role_class" not in node:
+                node["role_class"] = classify_role(node["role"])
+            level = connection_level or person.get("connection_level")
+            if level and (node["connection_level"] is None or level < node["connection_level"]):
+                node["connection_level"] = level
+            if company:
+                node["companies"].add(company_aliases.canonical(company))
+            if seen_at and (node["seen_at"] is None or seen_at > node["seen_at"]):
+                node["seen_at"] = seen_at
+            if node["connection_level"] == 1:
+                self._link(ME, key)
+            for listener in self._person_listeners:
+                listener(node)
+        return key
+
+    def _link(self, a: str, b: str, seen_at: Optional[str] = None):
+        if a and b and a != b:
+            self.adjacency[a].add(b)
+            self.adjacency[b].add(a)
+            if seen_at:
+                key = edge_key(a, b)
+                if seen_at > self.edge_seen_at.get(key, ""):
+                    self.edge_seen_at[key] = seen_at
+
+    def _unlink(self, a: str, b: str):
+        self.adjacency[a].discard(b)
+        self.adjacency[b].discard(a)
+        self.edge_seen_at.pop(edge_key(a, b), None)
+
+    def _begin_mutuals(self, key: str, fetched_at: Optional[str]) -> bool:
+        """Record a full mutual connection list for a person; False if a newer one was already applied"""
+        node = self.people[key]
+        previous = node["mutuals_fetched_at"]
+        if previous and (not fetched_at or fetched_at < previous):
+            return False
+        if fetched_at:
+            for other in list(self.adjacency[key]):
+                if other != ME and self.people[other]["connection_level"] == 1 \
+                        and self.edge_seen_at.get(edge_key(key, other), "") < fetched_at:
+                    self._unlink(key, other)
+            node["mutuals_fetched_at"] = fetched_at
+        return True
+
+    def _is_current(self, key: str, seen_at: Optional[str]) -> bool:
+        """Whether a link seen at seen_at is newer than the person's full mutual list"""
+        fetched_at = self.people[key]["mutuals_fetched_at"]
+        return not fetched_at or bool(seen_at) and seen_at >= fetched_at
+
+    def add_mutuals(self, target: dict, mutual_connections: List[dict], target_level: Optional[int] = 2,
+                    company: Optional[str] = None, seen_at: Optional[str] = None) -> Optional[str]:
+        """Link a person to the full list of mutual connections (my 1st degree contacts) they share with me"""
+        return apply_mutuals(self, target, mutual_connections, target_level, company, seen_at)
+
+    def add_result(self, data: dict, query_name: str):
+        """Incorporate one completed cache document into the index"""
+        apply_result(self, data, query_name)
+
+    def on_cache_saved(self, filename: str, data: dict):
+        """save_to_cache listener: update the index as jobs finish"""
+        self.add_result(data, query_type(os.path.basename(filename)))
+
+    def load_from_cache_dir(self, cache_dir: str) -> int:
+        """Build the index from every completed result and profile entry in the cache"""
+        return load_cache_dir(self, cache_dir)
+
+    def get_person(self, profile_url: str) -> Optional[dict]:
+        """Public view of a person node"""
+        node = self.people.get(normalize_profile_url(profile_url))
+        if node is None:
+            return None
+        return {**node, "companies": sorted(node["companies"])}
+
+    def neighbours(self, key: str) -> Set[str]:
+        return self.adjacency.get(key, set())
+
+    def mutuals_fetched_at(self, profile_url: str) -> Optional[str]:
+        """When the person's full mutual connection list was fetched, or None"""
+        node = self.people.get(normalize_profile_url(profile_url))
+        return node["mutuals_fetched_at"] if node else None
+
+    def introducers_for(self, profile_url: str) -> Optional[List[dict]]:
+        """My 1st degree contacts who know the target, or None unless the target's full mutual list was fetched"""
+        key = normalize_profile_url(profile_url)
+        with self._lock:
+            if key not in self.people or not self.people[key]["mutuals_fetched_at"]:
+                return None
+            introducers = [self.people[k] for k in self.adjacency[key]
+                           if k != ME and self.people[k]["connection_level"] == 1]
+            if not introducers and ME not in self.adjacency[key]:
+                return None
+            return [{"name": p["name"], "profile_url": p["profile_url"], "role": p["role"],
+                     "location": p["location"], "connection_level": 1} for p in introducers]
+
+    def find_people(self, name: str, company: Optional[str] = None) -> List[str]:
+        """Keys of people with this (normalized) name, optionally at a company"""
+        target = normalize_person_name(name)
+        canonical_company = company_aliases.canonical(company) if company else None
+        with self._lock:
+            return [k for k, p in self.people.items()
+                    if normalize_person_name(p["name"]) == target
+                    and (canonical_company is None or canonical_company in p["companies"]
+                         or company_aliases.canonical(headline_company(p["role"]) or "") == canonical_company)]
+
+    def expire(self, max_age_hours: float = None) -> dict:
+        """Drop links and people last seen longer ago than the retention window, and forget old mutual lists"""
+        max_age_hours = GRAPH_RETENTION_HOURS if max_age_hours is None else max_age_hours
+        cutoff = (datetime.now() - timedelta(hours=max_age_hours)).isoformat()
+        with self._lock:
+            stale_edges = [edge for edge, seen_at in self.edge_seen_at.items() if seen_at < cutoff]
+            for a, b in stale_edges:
+                self._unlink(a, b)
+            stale_people = [key for key, node in self.people.items() if node["seen_at"] and node["seen_at"] < cutoff]
+            for key in stale_people:
+                for other in list(self.adjacency[key]):
+                    self._unlink(key, other)
+                del self.adjacency[key]
+                del self.people[key]
+                for listener in self._person_removed_listeners:
+                    listener(key)
+            for node in self.people.values():
+                if node["mutuals_fetched_at"] and node["mutuals_fetched_at"] < cutoff:
+                    node["mutuals_fetched_at"] = None
+        if stale_edges or stale_people:
+            logger.info(LogCategory.CACHE, "network_graph_expire", expired_people=len(stale_people),
+                        expired_edges=len(stale_edges), **self.stats())
+        return {"people": len(stale_people), "edges": len(stale_edges)}
+
+    def stats(self) -> dict:
+        return {"people": len(self.people), "edges": self.edge_count,
+                "first_degree": len(self.adjacency[ME])}
+
+# Create a global network graph instance
+network_graph = NetworkGraph()
@@ -0,0 +1,168 @@
+import os
+import re
+import mmap
+import time
+import struct
+from datetime import datetime
+from functools import lru_cache
+from typing import List, Optional
+from cache_store import CACHE_DIR
+from atomic_files import replace_atomically
+from compact_graph import CompactGraph, StringTable, PERSON_COLUMNS, from_network_graph
+from logger_config import logger, LogCategory
+
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, "_network_snapshot.bin")
+SNAPSHOT_MAGIC = b"LNSNAP02"
+# magic, string count, string blob bytes, person count, adjacency entries, build time (unix seconds)
+HEADER = struct.Struct("<8sqqqqd")
+@lru_cache(maxsize=1)
+def person_record():
+    """Fixed-width person record: string table ids for each column, the connection level and
+    when the person's full mutual list was fetched (a numpy dtype, so numpy loads on first use)"""
+    import numpy as np
+    return np.dtype([(column, "<u4") for column in PERSON_COLUMNS] + [("level", "i1"), ("_pad", "V3"),
+                                                                      ("fetched_at", "<f8")])
+ALIGNMENT = 8
+
+def _aligned(offset: int) -> int:
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+def _layout(string_count: int, blob_bytes: int, person_count: int, index_count: int) -> dict:
+    """Byte offset of every section; each section starts 8-byte aligned"""
+    sections = [("string_offsets", (string_count + 1) * 8), ("blob", blob_bytes),
+                ("people", person_count * person_record().itemsize), ("indptr", (person_count + 1) * 8),
+                ("indices", index_count * 4), ("url_order", person_count * 4)]
+    layout, offset = {}, _aligned(HEADER.size)
+    for name, size in sections:
+        layout[name] = (offset, size)
+        offset = _aligned(offset + size)
+    layout["end"] = (offset, 0)
+    return layout
+
+def write_snapshot(graph: CompactGraph, path: str = SNAPSHOT_PATH) -> int:
+    """Write the compact graph as one binary file (atomically); returns its size in bytes"""
+    import numpy as np
+    people = np.zeros(graph.person_count, dtype=person_record())
+    for column in PERSON_COLUMNS:
+        people[column] = graph.columns[column]
+    people["level"] = graph.levels
+    people["fetched_at"] = graph.fetched_at
+    blob = bytes(graph.strings.blob)
+    layout = _layout(len(graph.strings), len(blob), graph.person_count, len(graph.indices))
+    sections = {"string_offsets": graph.strings.offsets.astype("<i8").tobytes(), "blob": blob,
+                "people": people.tobytes(), "indptr": graph.indptr.astype("<i8").tobytes(),
+                "indices": graph.indices.astype("<i4").tobytes(), "url_order": graph.url_order.astype("<i4").tobytes()}
+
+    def write(f):
+        f.write(HEADER.pack(SNAPSHOT_MAGIC, len(graph.strings), len(blob), graph.person_count,
+                            len(graph.indices), time.time()))
+        for name, data in sections.items():
+            f.seek(layout[name][0])
+            f.write(data)
+        f.truncate(layout["end"][0])
+
+    replace_atomically(path, write, binary=True)
+    return layout["end"][0]
+
+def load_snapshot(path: str = SNAPSHOT_PATH) -> Optional[CompactGraph]:
+    """Map a snapshot into memory; arrays are views of the file, so nothing is parsed or copied"""
+    if not os.path.exists(path):
+        return None
+    import numpy as np
+    with open(path, "rb") as f:
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    if len(mapped) < HEADER.size:
+        return None
+    magic, string_count, blob_bytes, person_count, index_count, built_at = HEADER.unpack_from(mapped, 0)
+    if magic != SNAPSHOT_MAGIC:
+        return None
+    layout = _layout(string_count, blob_bytes, person_count, index_count)
+    if len(mapped) < layout["end"][0]:
+        return None
+
+    def section(name, dtype, count):
+        return np.frombuffer(mapped, dtype=dtype, count=count, offset=layout[name][0])
+
+    blob_offset, blob_size = layout["blob"]
+    strings = StringTable(section("string_offsets", "<i8", string_count + 1),
+                          memoryview(mapped)[blob_offset:blob_offset + blob_size])
+    people = section("people", person_record(), person_count)
+    graph = CompactGraph(strings, {column: people[column] for column in PERSON_COLUMNS}, people["level"],
+                         section("indptr", "<i8", person_count + 1), section("indices", "<i4", index_count),
+                         section("url_order", "<i4", person_count), people["fetched_at"])
+    graph.built_at = datetime.fromtimestamp(built_at).isoformat()
+    return graph
+
+class SnapshotStore:
+    """The server's current snapshot: loaded at startup, rewritten after crawls.
+
+    Each save writes a new versioned file (_network_snapshot.<version>.bin) rather than replacing
+    the mapped one, which Windows doesn't allow; older versions are removed once nothing maps them.
+    """
+
+    def __init__(self, path: str = SNAPSHOT_PATH):
+        self.path = path
+        self.loaded_path: Optional[str] = None
+        self.graph: Optional[CompactGraph] = None
+
+    def versions(self) -> List[str]:
+        """Versioned snapshot files, oldest first"""
+        directory, name = os.path.split(self.path)
+        stem, ext = os.path.splitext(name)
+        pattern = re.compile(rf"{re.escape(stem)}\.(\d+){re.escape(ext)}$")
+        try:
+            names = os.listdir(directory or ".")
+        except OSError:
+            return []
+        found = [(int(m.group(1)), n) for n in names for m in [pattern.match(n)] if m]
+        return [os.path.join(directory, n) for _, n in sorted(found)]
+
+    def load(self) -> Optional[CompactGraph]:
+        """Map the newest snapshot (an unversioned file at path counts as the oldest)"""
+        start_time = time.time()
+        candidates = self.versions()
+        path = candidates[-1] if candidates else self.path
+        try:
+            self.graph = load_snapshot(path)
+        except (OSError, ValueError) as e:
+            print(f"Could not load network snapshot: {e}")
+            self.graph = None
+        self.loaded_path = path if self.graph is not None else None
+        if self.graph is not None:
+            self.remove_old_versions()
+        logger.info(LogCategory.CACHE, "network_snapshot_load", duration_ms=(time.time() - start_time) * 1000,
+                    found=self.graph is not None, **(self.graph.stats() if self.graph else {}))
+        return self.graph
+
+    def save(self, network_graph) -> int:
+        """Snapshot the live network graph into a new version and switch to it"""
+        start_time = time.time()
+        stem, ext = os.path.splitext(self.path)
+        path = f"{stem}.{time.time_ns()}{ext}"
+        size = write_snapshot(from_network_graph(network_graph), path)
+        self.load()
+        # Even if the new version didn't load, don't let versions pile up behind it
+        self.remove_old_versions(keep=path)
+        logger.info(LogCategory.CACHE, "network_snapshot_write", duration_ms=(time.time() - start_time) * 1000,
+                    bytes=size)
+        return size
+
+    def remove_old_versions(self, keep: Optional[str] = None):
+        """Delete every snapshot but the loaded one and keep. Snapshot files start with "_", so the
+        cache manager never cleans them up; a file still mapped elsewhere (which Windows won't delete)
+        is left for the next load or save"""
+        kept = {self.loaded_path, keep}
+        old = [path for path in self.versions() + [self.path] if path not in kept and os.path.exists(path)]
+        for path in old:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(LogCategory.CACHE, "network_snapshot_remove_failed", path=path, error=str(e))
+
+    def stats(self) -> Optional[dict]:
+        if self.graph is None:
+            return None
+        return {**self.graph.stats(), "built_at": self.graph.built_at, "path": self.loaded_path}
+
+# Create a global snapshot store instance
+snapshot_store = SnapshotStore()
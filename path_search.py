@@ -0,0 +1,190 @@
+import math
+import heapq
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from cache_keys import normalize_profile_url
+from network_graph import NetworkGraph, ME
+from role_classifier import classify_role, introducer_flags
+# Cost multiplier for passing through someone who is not my direct connection
+LEVEL_FACTORS = {1: 1.0, 2: 1.5, 3: 2.5}
+UNKNOWN_LEVEL_FACTOR = 2.0
+# Longest intro chain worth returning (You -> A -> B -> C -> target)
+MAX_HOPS = 4
+
+def local_network(graph: NetworkGraph, target: str, max_hops: int = MAX_HOPS) -> Tuple[Dict[str, dict], Dict[str, Set[str]], Dict[str, int]]:
+    """Copy of the people, links and mutual counts that intro chains of up to max_hops can pass through.
+
+    Walks out from the target (not through me) for max_hops - 1 steps; the last step only keeps my
+    direct connections, since a chain has to reach me on the next hop. Call with the graph's lock held.
+    """
+    my_connections = graph.adjacency.get(ME, set())
+    depth = {target: 0}
+    frontier = [target]
+    for step in range(1, max_hops):
+        next_frontier = []
+        for key in frontier:
+            for neighbour in graph.adjacency.get(key, ()):
+                if neighbour == ME or neighbour in depth:
+                    continue
+                if step == max_hops - 1 and neighbour not in my_connections:
+                    continue
+                depth[neighbour] = step
+                next_frontier.append(neighbour)
+        frontier = next_frontier
+    keys = set(depth)
+    keys.add(ME)
+    adjacency = {key: graph.adjacency.get(key, set()) & keys for key in keys}
+    mutual_counts = {key: len(graph.adjacency.get(key, ())) for key in keys}
+    people = {key: dict(graph.people[key]) for key in keys if key in graph.people}
+    return people, adjacency, mutual_counts
+
+class IntroPathFinder:
+    """Ranks introduction chains from me to a target over the locally known network graph.
+
+    Entering a person costs less the more mutuals they have with me, the closer their
+    connection degree, and the more relevant their role; a path's score is exp(-cost).
+    Paths are found with bidirectional Dijkstra and the top K with Yen's algorithm. Given a
+    target, the finder searches a copy of the part of the graph the target's chains can use.
+    """
+
+    def __init__(self, graph: NetworkGraph, target_company: Optional[str] = None, target: Optional[str] = None,
+                 max_hops: int = MAX_HOPS):
+        if target is None:
+            self.people, self.adjacency = graph.people, graph.adjacency
+            self.mutual_counts = None
+        else:
+            # The search runs on a copy of the target's neighbourhood, so it doesn't hold the graph's lock
+            with graph._lock:
+                self.people, self.adjacency, self.mutual_counts = local_network(graph, target, max_hops)
+        self.target_company = (target_company or "").lower()
+        self._node_costs: Dict[str, float] = {}
+
+    def role_relevance(self, role: str) -> float:
+        """0..1 relevance of someone's headline for making an introduction"""
+        relevance = 0.0
+        if any(introducer_flags(classify_role(role))):
+            relevance += 0.5
+        role = (role or "").lower()
+        if self.target_company and self.target_company in role:
+            relevance += 0.5
+        return relevance
+
+    def node_cost(self, key: str) -> float:
+        """Cost of routing an introduction through this person"""
+        cost = self._node_costs.get(key)
+        if cost is None:
+            if key == ME:
+                cost = 0.0
+            else:
+                person = self.people.get(key, {})
+                if self.mutual_counts is None:
+                    mutual_count = len(self.adjacency.get(key, ()))
+                else:
+                    mutual_count = self.mutual_counts.get(key, 0)
+                level_factor = LEVEL_FACTORS.get(person.get("connection_level"), UNKNOWN_LEVEL_FACTOR)
+                cost = level_factor * (1 - 0.3 * self.role_relevance(person.get("role"))) / (1 + math.log1p(mutual_count))
+            self._node_costs[key] = cost
+        return cost
+
+    def path_cost(self, path: List[str]) -> float:
+        return sum(self.node_cost(key) for key in path[1:])
+
+    def shortest_path(self, source: str, target: str, banned_nodes: FrozenSet[str] = frozenset(),
+                      banned_edges: FrozenSet[Tuple[str, str]] = frozenset()) -> Optional[Tuple[float, List[str]]]:
+        """Bidirectional Dijkstra; edge u->v costs node_cost(v)"""
+        if source == target:
+            return 0.0, [source]
+        if source in banned_nodes or target in banned_nodes:
+            return None
+        adjacency = self.adjacency
+        dist = ({source: 0.0}, {target: 0.0})
+        parent = ({source: None}, {target: None})
+        heaps = ([(0.0, source)], [(0.0, target)])
+        done = (set(), set())
+        best, meeting = math.inf, None
+
+        while heaps[0] and heaps[1]:
+            if heaps[0][0][0] + heaps[1][0][0] >= best:
+                break
+            # Expand the side with the smaller frontier
+            side = 0 if len(heaps[0]) <= len(heaps[1]) else 1
+            d, u = heapq.heappop(heaps[side])
+            if u in done[side]:
+                continue
+            done[side].add(u)
+            for v in adjacency.get(u, ()):
+                if v in banned_nodes:
+                    continue
+                edge = (u, v) if side == 0 else (v, u)
+                if edge in banned_edges:
+                    continue
+                # Forward: entering v costs node_cost(v). Backward: the forward edge v->u costs node_cost(u)
+                nd = d + (self.node_cost(v) if side == 0 else self.node_cost(u))
+                if nd < dist[side].get(v, math.inf):
+                    dist[side][v] = nd
+                    parent[side][v] = u
+                    heapq.heappush(heaps[side], (nd, v))
+                    other = dist[1 - side].get(v)
+                    if other is not None and nd + other < best:
+                        best, meeting = nd + other, v
+
+        if meeting is None:
+            return None
+        forward = []
+        node = meeting
+        while node is not None:
+            forward.append(node)
+            node = parent[0].get(node)
+        forward.reverse()
+        node = parent[1].get(meeting)
+        while node is not None:
+            forward.append(node)
+            node = parent[1].get(node)
+        return best, forward
+
+    def top_k_paths(self, target: str, k: int = 5, max_hops: int = MAX_HOPS) -> List[Tuple[float, List[str]]]:
+        """Yen's k shortest simple paths from me to the target"""
+        first = self.shortest_path(ME, target)
+        if first is None:
+            return []
+        found = [first]
+        candidates: List[Tuple[float, List[str]]] = []
+        seen_paths: Set[Tuple[str, ...]] = {tuple(first[1])}
+        while len(found) < k:
+            last_path = found[-1][1]
+            for i in range(len(last_path) - 1):
+                spur, root = last_path[i], last_path[:i + 1]
+                banned_edges = {(p[i], p[i + 1]) for _, p in found if len(p) > i + 1 and p[:i + 1] == root}
+                result = self.shortest_path(spur, target, frozenset(root[:-1]), frozenset(banned_edges))
+                if result is None:
+                    continue
+                path = root[:-1] + result[1]
+                if len(path) - 1 > max_hops or tuple(path) in seen_paths:
+                    continue
+                seen_paths.add(tuple(path))
+                heapq.heappush(candidates, (self.path_cost(path), path))
+            if not candidates:
+                break
+            found.append(heapq.heappop(candidates))
+        return [(cost, path) for cost, path in found if len(path) - 1 <= max_hops]
+
+    def describe(self, key: str) -> dict:
+        if key == ME:
+            return {"name": "You"}
+        person = self.people.get(key, {})
+        return {"name": person.get("name"), "profile_url": key, "role": person.get("role"),
+                "connection_level": person.get("connection_level")}
+
+def find_intro_paths(graph: NetworkGraph, profile_url: str, k: int = 5, target_company: Optional[str] = None) -> List[dict]:
+    """Top-K ranked introduction chains (You -> A -> B -> target) with scores"""
+    target = normalize_profile_url(profile_url)
+    if target not in graph.people:
+        return []
+    finder = IntroPathFinder(graph, target_company, target)
+    paths = finder.top_k_paths(target, k)
+    return [{
+        "path": [finder.describe(key) for key in path],
+        "chain": " → ".join(finder.describe(key)["name"] or key for key in path),
+        "hops": len(path) - 1,
+        "cost": round(cost, 4),
+        "score": round(math.exp(-cost), 4)
+    } for cost, path in paths]
@@ -0,0 +1,238 @@
+import re
+import heapq
+import bisect
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from cache_keys import _fold, headline_company
+from cache_store import company_aliases
+from role_classifier import classify_role, title_part, text_tokens
+
+FIELDS = ("company", "title", "location", "seniority", "function", "flag")
+# Fields holding classifier labels, matched as whole values rather than free text
+LABEL_FIELDS = ("seniority", "function", "flag")
+
+def parse_query(expr: str) -> List[List[Tuple[str, bool, bool]]]:
+    """Parse 'product manager OR pm -intern eng*' into OR-groups of (term, negated, prefix) terms"""
+    groups = []
+    for group in re.split(r"\s+OR\s+|\s*\|\s*", expr.strip()):
+        terms = []
+        for raw in group.split():
+            negated = raw.startswith("-") and len(raw) > 1
+            word = raw[1:] if negated else raw
+            prefix = word.endswith("*")
+            word = word.rstrip("*")
+            # Excluding "-pm" should not exclude every manager, so only positive whole words are expanded
+            tokens = text_tokens(word, expand=not (prefix or negated))
+            for i, token in enumerate(tokens):
+                terms.append((token, negated, prefix and i == len(tokens) - 1))
+        if terms:
+            groups.append(terms)
+    return groups
+
+class PeopleIndex:
+    """Inverted indexes over the local person store: company, title token and location token -> people.
+
+    Kept up to date by the network graph as people are added, so searches and scrape
+    pre-filters never have to scan cached result files.
+    """
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self.people: Dict[str, dict] = {}
+        self.postings: Dict[str, Dict[str, Set[str]]] = {field: {} for field in FIELDS}
+        self._terms: Dict[str, Set[Tuple[str, str]]] = {}
+        self._sorted_terms: Dict[str, Optional[List[str]]] = {field: None for field in FIELDS}
+
+    def __len__(self):
+        return len(self.people)
+
+    def person_terms(self, person: dict) -> Set[Tuple[str, str]]:
+        """(field, term) pairs a person is indexed under"""
+        terms = set()
+        companies = set(person.get("companies") or ())
+        employer = headline_company(person.get("role"))
+        if employer:
+            companies.add(company_aliases.canonical(employer))
+        terms.update(("company", c) for c in companies if c)
+        terms.update(("title", t) for t in text_tokens(title_part(person.get("role"))))
+        terms.update(("location", t) for t in text_tokens(person.get("location"), expand=False))
+        role_class = classify_role(person.get("role"))
+        terms.add(("seniority", role_class["seniority"]))
+        terms.add(("function", role_class["function"]))
+        if role_class["is_recruiter"]:
+            terms.add(("flag", "recruiter"))
+        if role_class["is_hiring_manager"]:
+            terms.add(("flag", "hiring_manager"))
+        return terms
+
+    def index_person(self, person: dict):
+        """Add or re-index a person; only the postings that changed are touched"""
+        key = person.get("profile_url")
+        if not key:
+            return
+        terms = self.person_terms(person)
+        with self._lock:
+            self.people[key] = person
+            old_terms = self._terms.get(key, set())
+            if terms == old_terms:
+                return
+            for field, term in old_terms - terms:
+                posting = self.postings[field].get(term)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self.postings[field][term]
+                        self._sorted_terms[field] = None
+            for field, term in terms - old_terms:
+                posting = self.postings[field].get(term)
+                if posting is None:
+                    posting = self.postings[field][term] = set()
+                    self._sorted_terms[field] = None
+                posting.add(key)
+            self._terms[key] = terms
+
+    def index_people(self, people: Iterable[dict]):
+        for person in people:
+            self.index_person(person)
+
+    def remove_person(self, key: str):
+        """Drop a person and their postings"""
+        with self._lock:
+            self.people.pop(key, None)
+            for field, term in self._terms.pop(key, set()):
+                posting = self.postings[field].get(term)
+                if posting is not None:
+                    posting.discard(key)
+                    if not posting:
+                        del self.postings[field][term]
+                        self._sorted_terms[field] = None
+
+    def _prefix_match(self, field: str, prefix: str) -> Set[str]:
+        terms = self._sorted_terms[field]
+        if terms is None:
+            terms = self._sorted_terms[field] = sorted(self.postings[field])
+        matched: Set[str] = set()
+        i = bisect.bisect_left(terms, prefix)
+        while i < len(terms) and terms[i].startswith(prefix):
+            matched |= self.postings[field][terms[i]]
+            i += 1
+        return matched
+
+    def _term_match(self, field: str, term: str, prefix: bool) -> Set[str]:
+        if prefix:
+            return self._prefix_match(field, term)
+        return self.postings[field].get(term, set())
+
+    def _company_groups(self, expr: str) -> List[List[Tuple[str, bool, bool]]]:
+        """Company queries match whole canonical names: 'google OR meta', 'goo*', '-acme'"""
+        groups = []
+        for group in re.split(r"\s+OR\s+|\s*\|\s*", expr.strip()):
+            group = group.strip()
+            negated = group.startswith("-") and len(group) > 1
+            name = group[1:] if negated else group
+            prefix = name.endswith("*")
+            name = name.rstrip("*").strip()
+            if name:
+                term = _fold(name) if prefix else company_aliases.canonical(name)
+                groups.append([(term, negated, prefix)])
+        return groups
+
+    def _groups(self, field: str, expr: str) -> List[List[Tuple[str, bool, bool]]]:
+        if field == "company":
+            return self._company_groups(expr)
+        if field in LABEL_FIELDS:
+            return [[(word.strip().lower(), False, False)] for word in re.split(r"\s+OR\s+|\||,", expr) if word.strip()]
+        return parse_query(expr)
+
+    def _estimate(self, field: str, groups) -> int:
+        """Upper bound on matches, from the rarest exact term of each OR-group"""
+        total = 0
+        for group in groups:
+            sizes = [len(self.postings[field].get(t, ())) for t, neg, p in group if not neg and not p]
+            total += min(sizes) if sizes else len(self.people)
+        return total
+
+    def _group_matches(self, field: str, groups) -> Set[str]:
+        results = []
+        for group in groups:
+            # Intersect from the rarest term up; postings are only copied when they have to be
+            positive = sorted((self._term_match(field, t, p) for t, neg, p in group if not neg), key=len)
+            result = positive[0] if positive else set(self.people)
+            for posting in positive[1:]:
+                if not result:
+                    break
+                result = result & posting
+            for term, negated, prefix in group:
+                if negated:
+                    result = result - self._term_match(field, term, prefix)
+            results.append(result)
+        if len(results) == 1:
+            return results[0]
+        return set().union(*results)
+
+    def _person_matches(self, key: str, field: str, groups) -> bool:
+        """Evaluate a query against one person's own terms instead of the postings"""
+        terms = {term for f, term in self._terms.get(key, ()) if f == field}
+        for group in groups:
+            if all((any(t.startswith(term) for t in terms) if prefix else term in terms) != negated
+                   for term, negated, prefix in group):
+                return True
+        return False
+
+    def match(self, field: str, expr: str) -> Set[str]:
+        """Keys of people matching a boolean query on one field; the returned set must not be modified"""
+        with self._lock:
+            return self._group_matches(field, self._groups(field, expr))
+
+    def search_keys(self, company: str = None, title: str = None, location: str = None,
+                    **labels: Optional[str]) -> Set[str]:
+        """Keys matching every given field query (fields are ANDed); labels are seniority, function and flag.
+
+        The most selective field is answered from the postings; the rest filter its
+        candidates person by person once that is cheaper than another set intersection.
+        """
+        with self._lock:
+            fields = (("company", company), ("title", title), ("location", location),
+                      *((field, labels.get(field)) for field in LABEL_FIELDS))
+            queries = [(field, self._groups(field, expr)) for field, expr in fields if expr]
+            queries = [(self._estimate(field, groups), field, groups) for field, groups in queries if groups]
+            if not queries:
+                return set()
+            queries.sort(key=lambda q: q[0])
+            result = self._group_matches(queries[0][1], queries[0][2])
+            for estimate, field, groups in queries[1:]:
+                if len(result) <= estimate:
+                    result = {k for k in result if self._person_matches(k, field, groups)}
+                else:
+                    result = result & self._group_matches(field, groups)
+            return result
+
+    def search(self, company: str = None, title: str = None, location: str = None,
+               connection_levels: Optional[Iterable[int]] = None, limit: int = 50,
+               seniority: str = None, function: str = None, recruiter: bool = False,
+               hiring_manager: bool = False) -> dict:
+        """Closest connections first; total counts every match, results holds at most limit people"""
+        flags = [flag for flag, wanted in (("recruiter", recruiter), ("hiring_manager", hiring_manager)) if wanted]
+        keys = self.search_keys(company, title, location, seniority=seniority, function=function,
+                                flag=" OR ".join(flags) or None)
+        with self._lock:
+            people = (self.people[k] for k in keys)
+            if connection_levels:
+                levels = set(connection_levels)
+                people = [p for p in people if p.get("connection_level") in levels]
+            else:
+                people = list(people)
+            top = heapq.nsmallest(limit, people, key=lambda p: (p.get("connection_level") or 9, p.get("name") or ""))
+        return {"total": len(people), "results": [public_person(p) for p in top]}
+
+    def stats(self) -> dict:
+        return {"people": len(self.people), **{f"{field}_terms": len(self.postings[field]) for field in FIELDS}}
+
+def public_person(person: dict) -> dict:
+    """Result-shaped view of an indexed person"""
+    return {"name": person.get("name"), "profile_url": person.get("profile_url"), "role": person.get("role"),
+            "location": person.get("location"), "connection_level": person.get("connection_level"),
+            "role_class": classify_role(person.get("role"))}
+
+# Create a global people index instance
+people_index = PeopleIndex()
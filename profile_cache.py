@@ -0,0 +1,121 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import List, Optional
+from atomic_files import write_json_atomic
+from cache_keys import normalize_profile_url
+from cache_store import CACHE_DIR
+from logger_config import logger, LogCategory
+
+# Mutual connection lists change slowly; reuse them across jobs for this long
+PROFILE_CACHE_TTL_HOURS = float(os.getenv("LINKEDIN_PROFILE_CACHE_TTL_HOURS", "72"))
+# Entries kept in memory (least recently used dropped first); the rest are read from disk
+PROFILE_CACHE_MEMORY_ENTRIES = int(os.getenv("LINKEDIN_PROFILE_CACHE_MEMORY_ENTRIES", "2048"))
+
+class MutualConnectionsCache:
+    """Profile-level sub-cache: canonical profile URL -> mutual connections list plus fetch time.
+
+    Consulted by every path that calls get_mutual_connections_for_profile, so a 2nd degree
+    contact that shows up in several company, role or crawl jobs is only paginated once.
+    Async callers use get_async and put_async, which read and write on a worker thread.
+    """
+
+    def __init__(self, cache_dir: str, ttl_hours: float = PROFILE_CACHE_TTL_HOURS,
+                 memory_entries: int = PROFILE_CACHE_MEMORY_ENTRIES):
+        self.cache_dir = cache_dir
+        self.ttl_seconds = ttl_hours * 3600
+        self.memory_entries = memory_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, dict]" = OrderedDict()
+
+    def _path(self, canonical_url: str) -> str:
+        digest = hashlib.sha1(canonical_url.encode("utf-8")).hexdigest()[:20]
+        return os.path.join(self.cache_dir, f"{digest}.json")
+
+    def _remember(self, canonical_url: str, entry: dict):
+        with self._lock:
+            self._memory[canonical_url] = entry
+            self._memory.move_to_end(canonical_url)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _load(self, canonical_url: str) -> Optional[dict]:
+        with self._lock:
+            entry = self._memory.get(canonical_url)
+            if entry is not None:
+                self._memory.move_to_end(canonical_url)
+                return entry
+        path = self._path(canonical_url)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        # Guard against hash prefix collisions
+        if entry.get("profile_url") != canonical_url:
+            return None
+        self._remember(canonical_url, entry)
+        return entry
+
+    def get(self, profile_url: str) -> Optional[List[dict]]:
+        """Cached mutual connections for a profile, or None if missing or expired"""
+        canonical_url = normalize_profile_url(profile_url)
+        entry = self._load(canonical_url) if canonical_url else None
+        if entry and time.time() - entry.get("fetched_at", 0) <= self.ttl_seconds:
+            self.hits += 1
+            logger.info(LogCategory.CACHE, "profile_mutuals_lookup", profile_url=canonical_url, cache_hit=True)
+            return entry["mutual_connections"]
+        self.misses += 1
+        logger.info(LogCategory.CACHE, "profile_mutuals_lookup", profile_url=canonical_url, cache_hit=False)
+        return None
+
+    def get_entry(self, profile_url: str) -> Optional[dict]:
+        """Full unexpired cache entry (including fetch time) without touching hit counters"""
+        entry = self._load(normalize_profile_url(profile_url))
+        if entry and time.time() - entry.get("fetched_at", 0) <= self.ttl_seconds:
+            return entry
+        return None
+
+    def put(self, profile_url: str, mutual_connections: List[dict]):
+        """Store the mutual connections fetched for a profile"""
+        canonical_url = normalize_profile_url(profile_url)
+        if not canonical_url:
+            return
+        entry = {
+            "profile_url": canonical_url,
+            "fetched_at": time.time(),
+            "timestamp": datetime.now().isoformat(),
+            "mutual_connections": mutual_connections
+        }
+        write_json_atomic(self._path(canonical_url), entry)
+        self._remember(canonical_url, entry)
+
+    async def get_async(self, profile_url: str) -> Optional[List[dict]]:
+        """get on a worker thread"""
+        return await asyncio.to_thread(self.get, profile_url)
+
+    async def put_async(self, profile_url: str, mutual_connections: List[dict]):
+        """put on a worker thread"""
+        await asyncio.to_thread(self.put, profile_url, mutual_connections)
+
+    def stats(self) -> dict:
+        """Hit/miss counters since startup"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "ttl_hours": self.ttl_seconds / 3600
+        }
+
+# Create a global profile cache instance
+mutual_connections_cache = MutualConnectionsCache(os.path.join(CACHE_DIR, "profiles"))
@@ -0,0 +1,223 @@
+import re
+from dataclasses import dataclass, field
+from typing import List, Optional
+from cache_keys import headline_company, normalize_person_name, normalize_profile_url
+from cache_store import get_cache_filename, load_from_cache, is_fresh, data_age_seconds, company_aliases
+from logger_config import logger, LogCategory
+from profile_cache import mutual_connections_cache
+from network_graph import network_graph
+from people_index import people_index
+from network_snapshot import snapshot_store
+from role_classifier import classify_role, role_query_filters
+
+# Network codes used by search_and_process_connections, mapped to connection levels
+NETWORK_LEVELS = {"F": 1, "S": 2, "T": 3}
+
+@dataclass
+class QueryPlan:
+    """How a query will be answered: from cached datasets, by scraping, or both"""
+    strategy: str
+    results: List[dict] = field(default_factory=list)
+    sources: List[dict] = field(default_factory=list)
+    missing_networks: List[str] = field(default_factory=list)
+    # Indexed people matching the query, returned straight away while a scrape runs
+    local_matches: List[dict] = field(default_factory=list)
+
+    @property
+    def is_complete(self) -> bool:
+        """True when the cached data fully answers the query and no scrape is needed"""
+        return self.strategy != "scrape" and not self.missing_networks
+
+    def describe(self) -> dict:
+        """Plan summary reported alongside results"""
+        ages = [s["data_age_seconds"] for s in self.sources if s.get("data_age_seconds") is not None]
+        return {
+            "strategy": self.strategy,
+            "sources": self.sources,
+            "scraped_networks": self.missing_networks,
+            "data_age_seconds": max(ages) if ages else None,
+            "local_matches": len(self.local_matches)
+        }
+
+def describe_source(cache_filename: str, data: dict) -> dict:
+    """Freshness information for a cached dataset used by a plan"""
+    age = data_age_seconds(data)
+    return {
+        "cache_file": cache_filename,
+        "timestamp": data.get("timestamp"),
+        "data_age_seconds": round(age, 1) if age is not None else None
+    }
+
+def mentions(text: str, term: str) -> bool:
+    """Check whether every word of term appears as a whole word in text"""
+    if not text or not term:
+        return False
+    text = text.lower()
+    words = re.findall(r'\w+', term.lower())
+    return bool(words) and all(re.search(r'\b' + re.escape(w) + r'\b', text) for w in words)
+
+def has_role(headline: str, role: str) -> bool:
+    """Check a headline against a searched role: by classification for "recruiters" or
+    "engineering directors", otherwise by the role's words"""
+    filters = role_query_filters(role)
+    if not filters:
+        return mentions(headline, role)
+    role_class = classify_role(headline)
+    return ((not filters.get("recruiter") or role_class["is_recruiter"])
+            and (not filters.get("hiring_manager") or role_class["is_hiring_manager"])
+            and filters.get("seniority", role_class["seniority"]) == role_class["seniority"]
+            and filters.get("function", role_class["function"]) == role_class["function"])
+
+def works_at(role: str, company: str) -> bool:
+    """Check whether a headline names the company directly or through a known alias"""
+    if mentions(role, company):
+        return True
+    employer = headline_company(role)
+    return bool(employer) and company_aliases.canonical(employer) == company_aliases.canonical(company)
+
+class QueryPlanner:
+    """Answers queries by filtering or joining fresh cached datasets before scraping"""
+
+    def __init__(self, max_age_hours: float = None):
+        self.max_age_hours = max_age_hours
+
+    def _fresh_dataset(self, query_name: str, **kwargs):
+        cache_filename = get_cache_filename(query_name, **kwargs)
+        data = load_from_cache(cache_filename)
+        if is_fresh(data, self.max_age_hours):
+            return cache_filename, data
+        return None, None
+
+    def _local_matches(self, limit: int = 200, **query) -> List[dict]:
+        """Pre-filter from the local people index; fast enough to run before every scrape"""
+        return people_index.search(limit=limit, **query)["results"]
+
+    def _log_plan(self, query_name: str, plan: QueryPlan, **kwargs):
+        logger.info(LogCategory.CACHE, "query_plan",
+                    query_name=query_name,
+                    strategy=plan.strategy,
+                    result_count=len(plan.results),
+                    missing_networks=plan.missing_networks,
+                    local_matches=len(plan.local_matches),
+                    cache_hit=plan.strategy != "scrape",
+                    **kwargs)
+
+    def plan_company_search(self, company: str) -> QueryPlan:
+        """Plan for who_do_i_know_at_company: 1st and 2nd degree people at a company.
+
+        A crawl finds people by their headlines, which don't always name the employer, so it
+        never covers a company: its matches are only returned first while the search is scraped.
+        """
+        plan = QueryPlan(strategy="scrape")
+        crawl_file, crawl = self._fresh_dataset("entire_network_crawl")
+        crawl_matches = []
+        if crawl:
+            crawl_matches = [p for p in crawl.get("results", [])
+                             if p.get("connection_level") in (1, 2) and works_at(p.get("role"), company)]
+            if crawl_matches:
+                plan.sources = [describe_source(crawl_file, crawl)]
+        seen = {p.get("profile_url") for p in crawl_matches}
+        indexed = [p for p in self._local_matches(company=company, connection_levels=(1, 2))
+                   if p.get("profile_url") not in seen]
+        plan.local_matches = crawl_matches + indexed
+        self._log_plan("company_people_search", plan, company=company)
+        return plan
+
+    def plan_role_search(self, role: str, company: str) -> QueryPlan:
+        """Plan for who_works_as_role_at_company: 1st, 2nd and 3rd degree people in a role.
+
+        Cached company or crawl data covers the 1st and 2nd degree networks, so only the
+        3rd degree search is left to scrape when one of them is fresh.
+        """
+        plan = QueryPlan(strategy="scrape")
+        company_file, company_data = self._fresh_dataset("company_people_search", company=company)
+        if company_data:
+            people = [p for p in company_data.get("results", []) if has_role(p.get("role"), role)]
+            plan = QueryPlan(strategy="company_search_filter", results=people,
+                             sources=[describe_source(company_file, company_data)],
+                             missing_networks=["T"])
+        else:
+            crawl_file, crawl = self._fresh_dataset("entire_network_crawl")
+            if crawl:
+                people = [p for p in crawl.get("results", [])
+                          if works_at(p.get("role"), company) and has_role(p.get("role"), role)]
+                if people:
+                    plan = QueryPlan(strategy="network_crawl_filter", results=people,
+                                     sources=[describe_source(crawl_file, crawl)],
+                                     missing_networks=["T"])
+        if plan.strategy == "scrape":
+            # Classification queries ("recruiters", "hiring managers") are one label lookup
+            plan.local_matches = self._local_matches(company=company, **(role_query_filters(role) or {"title": role}))
+        self._log_plan("role_search", plan, role=role, company=company)
+        return plan
+
+    def plan_mutual_connections(self, profile_url: str = None, person: str = None, company: str = None) -> QueryPlan:
+        """Plan for who_can_introduce_me_to_person using mutuals already stored on 2nd degree people"""
+        candidates = []
+        if company:
+            company_file, company_data = self._fresh_dataset("company_people_search", company=company)
+            if company_data:
+                candidates.append((company_file, company_data, "company_search_join", False))
+        crawl_file, crawl = self._fresh_dataset("entire_network_crawl")
+        if crawl:
+            candidates.append((crawl_file, crawl, "network_crawl_join", bool(company)))
+
+        plan = QueryPlan(strategy="scrape")
+        graph_plan = self._graph_introducers(profile_url, person, company)
+        entry = mutual_connections_cache.get_entry(profile_url) if profile_url and not graph_plan else None
+        if graph_plan:
+            plan = graph_plan
+            candidates = []
+        elif entry:
+            plan = QueryPlan(strategy="profile_cache", results=entry["mutual_connections"],
+                             sources=[describe_source(mutual_connections_cache.cache_dir, entry)])
+            candidates = []
+        for cache_filename, data, strategy, check_company in candidates:
+            match = self._find_person(data.get("results", []), profile_url, person, company if check_company else None)
+            if match is not None:
+                plan = QueryPlan(strategy=strategy, results=match["mutual_connections"],
+                                 sources=[describe_source(cache_filename, data)])
+                break
+        self._log_plan("mutual_connections", plan, profile_url=profile_url, person=person, company=company)
+        return plan
+
+    def _graph_introducers(self, profile_url: str, person: str, company: str) -> Optional[QueryPlan]:
+        """Introducers straight from the in-memory network graph, when the target's full mutual
+        connection list was fetched within the freshness window.
+
+        Until the graph has loaded from the cache directory, the memory-mapped snapshot answers.
+        """
+        use_snapshot = not network_graph.ready and snapshot_store.graph is not None
+        graph = snapshot_store.graph if use_snapshot else network_graph
+        if not profile_url:
+            if use_snapshot:
+                return None
+            keys = network_graph.find_people(person, company)
+            if len(keys) != 1:
+                return None
+            profile_url = keys[0]
+        introducers = graph.introducers_for(profile_url)
+        if not introducers:
+            return None
+        # Only a fresh full mutual list answers the query; links seen elsewhere may be partial
+        source = {"status": "complete", "timestamp": graph.mutuals_fetched_at(profile_url)}
+        if not is_fresh(source, self.max_age_hours):
+            return None
+        return QueryPlan(strategy="graph_snapshot" if use_snapshot else "graph_index", results=introducers,
+                         sources=[describe_source(snapshot_store.loaded_path if use_snapshot else "network_graph", source)])
+
+    def _find_person(self, people: List[dict], profile_url: str, person: str, company: Optional[str]):
+        """Find exactly one person with stored mutual connections, or None"""
+        if profile_url:
+            key = normalize_profile_url(profile_url)
+            matches = [p for p in people if normalize_profile_url(p.get("profile_url")) == key]
+        else:
+            name = normalize_person_name(person)
+            matches = [p for p in people if normalize_person_name(p.get("name")) == name]
+            if company:
+                matches = [p for p in matches if works_at(p.get("role"), company)]
+        matches = [p for p in matches if "mutual_connections" in p]
+        return matches[0] if len(matches) == 1 else None
+
+# Create a global query planner instance
+query_planner = QueryPlanner()
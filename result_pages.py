@@ -0,0 +1,220 @@
+import os
+import json
+import math
+import base64
+import hashlib
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import islice
+from typing import List, Optional
+from introducer_ranking import RANKED_RESULTS_LIMIT, truncate_ranked
+
+# Largest page a caller can ask for
+RESULT_PAGE_MAX_LIMIT = int(os.getenv("LINKEDIN_RESULT_PAGE_MAX_LIMIT", "1000"))
+# Parsed result documents kept in memory, so paging through a big result parses it once
+PARSED_RESULTS_CACHE_SIZE = int(os.getenv("LINKEDIN_PARSED_RESULTS_CACHE_SIZE", "4"))
+# Token budget of a compacted result (max_tokens=), the form handed to the assistant as tool output
+TOOL_OUTPUT_MAX_TOKENS = int(os.getenv("LINKEDIN_TOOL_OUTPUT_MAX_TOKENS", "4000"))
+# Characters of compact JSON per token, to estimate sizes without a tokenizer
+TOOL_OUTPUT_CHARS_PER_TOKEN = float(os.getenv("LINKEDIN_TOOL_OUTPUT_CHARS_PER_TOKEN", "3.5"))
+# Mutual connections named per person in a compacted result; the rest are only counted
+TOOL_OUTPUT_TOP_MUTUALS = int(os.getenv("LINKEDIN_TOOL_OUTPUT_TOP_MUTUALS", "3"))
+# Longer strings are cut in a compacted result
+TOOL_OUTPUT_MAX_TEXT = 160
+# Person fields a compacted result keeps unless fields= asks for others
+TOOL_OUTPUT_FIELDS = ("name", "role", "location", "connection_level", "profile_url", "rank_score")
+
+class ParsedResultCache:
+    """Recently read cache documents, reused while the file's mtime and size are unchanged"""
+
+    def __init__(self, size: int = PARSED_RESULTS_CACHE_SIZE):
+        self.size = size
+        self._lock = threading.Lock()
+        self._documents: "OrderedDict[str, tuple]" = OrderedDict()
+
+    def load(self, filename: str) -> Optional[dict]:
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        version = (stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            cached = self._documents.get(filename)
+            if cached and cached[0] == version:
+                self._documents.move_to_end(filename)
+                return cached[1]
+        with open(filename, 'r') as f:
+            data = json.load(f)
+        with self._lock:
+            self._documents[filename] = (version, data)
+            self._documents.move_to_end(filename)
+            while len(self._documents) > self.size:
+                self._documents.popitem(last=False)
+        return data
+
+def encode_cursor(offset: int, version: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([offset, version]).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, version: str) -> int:
+    """Offset a cursor points at; raises ValueError if it is malformed or from another version of the result"""
+    try:
+        offset, cursor_version = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+    if cursor_version != version or not isinstance(offset, int) or offset < 0:
+        raise ValueError("Cursor does not belong to the current version of this result; start again without it")
+    return offset
+
+def result_version(data: dict) -> str:
+    return f"{data.get('timestamp')}/{len(data.get('results') or [])}"
+
+def project_person(person: dict, fields: Optional[List[str]], include_mutuals: bool) -> dict:
+    """A person with only the requested fields; mutual lists become counts unless included"""
+    if fields:
+        projected = {key: person[key] for key in fields if key in person}
+    else:
+        projected = dict(person)
+    if "mutual_connections" in person and (not include_mutuals or (fields and "mutual_connections" not in fields)):
+        projected.pop("mutual_connections", None)
+        projected["mutual_count"] = len(person["mutual_connections"] or [])
+    return projected
+
+def estimate_tokens(value) -> int:
+    """Approximate tokens of a value serialized as compact JSON"""
+    text = json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return math.ceil(len(text) / TOOL_OUTPUT_CHARS_PER_TOKEN)
+
+def clip(value):
+    if isinstance(value, str) and len(value) > TOOL_OUTPUT_MAX_TEXT:
+        return value[:TOOL_OUTPUT_MAX_TEXT - 1] + "…"
+    return value
+
+def compact_person(person: dict, fields: Optional[List[str]] = None) -> dict:
+    """A person for the assistant: a few short fields, mutual connections as a count plus the top names"""
+    compacted = {key: clip(person[key]) for key in (fields or TOOL_OUTPUT_FIELDS)
+                 if key in person and key != "mutual_connections" and person[key] not in (None, "")}
+    mutuals = person.get("mutual_connections")
+    if mutuals:
+        compacted["mutual_count"] = len(mutuals)
+        compacted["top_mutuals"] = [clip(m.get("name")) if isinstance(m, dict) else clip(m)
+                                    for m in mutuals[:TOOL_OUTPUT_TOP_MUTUALS]]
+    return compacted
+
+def content_etag(filename: str, variant: str = "") -> Optional[str]:
+    """ETag for a response built from a cache file: its version (mtime and size) plus the query that shaped it.
+
+    Always weak: the body may go out gzip-compressed or not, and some bodies (a cache hit's
+    data_age_seconds) drift between identical reads, so byte-for-byte equality isn't promised.
+    """
+    try:
+        stat = os.stat(filename)
+    except OSError:
+        return None
+    digest = hashlib.blake2b(f"{stat.st_mtime_ns}:{stat.st_size}:{variant}".encode("utf-8"), digest_size=12).hexdigest()
+    return f'W/"{digest}"'
+
+def etag_matches(if_none_match: Optional[str], etag: Optional[str]) -> bool:
+    """If-None-Match check (weak comparison, as the header requires)"""
+    if not if_none_match or not etag:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    return any((tag.strip()[2:] if tag.strip().startswith("W/") else tag.strip()) == opaque
+               for tag in if_none_match.split(","))
+
+@dataclass
+class ResultView:
+    """How much of a stored result a response carries: fields=, limit=, cursor=, include_mutuals=
+    and max_tokens= (a compacted page that fits a token budget).
+
+    Also carries the request's If-None-Match and query string, which conditional responses need.
+    """
+    fields: Optional[List[str]] = None
+    limit: Optional[int] = None
+    cursor: Optional[str] = None
+    include_mutuals: bool = True
+    if_none_match: Optional[str] = None
+    variant: str = ""
+    max_tokens: Optional[int] = None
+
+    @classmethod
+    def from_params(cls, fields: str = None, limit: int = None, cursor: str = None, include_mutuals: bool = True,
+                    if_none_match: str = None, variant: str = "", max_tokens: int = None) -> "ResultView":
+        return cls([f.strip() for f in fields.split(",") if f.strip()] if fields else None, limit, cursor,
+                   include_mutuals, if_none_match, variant, max_tokens)
+
+    @property
+    def is_default(self) -> bool:
+        return (not self.fields and self.limit is None and not self.cursor and self.include_mutuals
+                and self.max_tokens is None)
+
+    def apply(self, data: dict, job_id: Optional[str] = None) -> dict:
+        """Response view of a stored document; only the requested page is copied and projected.
+
+        Raises ValueError for a cursor that doesn't match the document.
+        """
+        results = data.get("results") if data else None
+        if self.max_tokens is not None and isinstance(results, list):
+            return self.compact(data, results, job_id)
+        if self.is_default or not isinstance(results, list):
+            return truncate_ranked(data)
+        version = result_version(data)
+        offset = decode_cursor(self.cursor, version) if self.cursor else 0
+        limit = max(1, min(self.limit or RANKED_RESULTS_LIMIT, RESULT_PAGE_MAX_LIMIT))
+        page = [project_person(p, self.fields, self.include_mutuals) for p in islice(results, offset, offset + limit)]
+        response = {key: value for key, value in data.items() if key != "results"}
+        next_offset = offset + len(page)
+        response.update({
+            "results": page,
+            "total_results": len(results),
+            "offset": offset,
+            "next_cursor": encode_cursor(next_offset, version) if next_offset < len(results) else None,
+            "truncated": next_offset < len(results)
+        })
+        return response
+
+    def compact(self, data: dict, results: list, job_id: Optional[str] = None) -> dict:
+        """The top ranked people from the cursor on, compacted, as many as fit max_tokens.
+
+        Top-level fields are kept only if they are short scalars, so the size is set by the
+        budget rather than the stored document. job_id and next_cursor are the handle for the
+        next page; at least one person is returned, so paging always moves on.
+        """
+        version = result_version(data)
+        offset = decode_cursor(self.cursor, version) if self.cursor else 0
+        response = {key: clip(value) for key, value in data.items()
+                    if key != "results" and (value is None or isinstance(value, (str, int, float, bool)))}
+        if isinstance(data.get("plan"), dict) and "data_age_seconds" in data["plan"]:
+            response["data_age_seconds"] = data["plan"]["data_age_seconds"]
+        if job_id:
+            response["job_id"] = job_id
+        # The paging fields cost about the same whatever their values
+        handle = {"total_results": len(results), "offset": offset, "returned": len(results),
+                  "next_cursor": encode_cursor(len(results), version), "truncated": True, "estimated_tokens": 0}
+        used = estimate_tokens({**response, **handle, "results": []})
+        page = []
+        for person in islice(results, offset, None):
+            compacted = compact_person(person, self.fields)
+            cost = estimate_tokens(compacted) + 1
+            if page and used + cost > self.max_tokens:
+                break
+            page.append(compacted)
+            used += cost
+            if self.limit and len(page) >= self.limit:
+                break
+        next_offset = offset + len(page)
+        response.update({
+            "results": page,
+            "total_results": len(results),
+            "offset": offset,
+            "returned": len(page),
+            "next_cursor": encode_cursor(next_offset, version) if next_offset < len(results) else None,
+            "truncated": next_offset < len(results),
+            "estimated_tokens": used
+        })
+        return response
+
+# Create a global parsed result cache instance
+parsed_results = ParsedResultCache()
@@ -0,0 +1,144 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+from cache_keys import _fold
+
+# Abbreviations expanded so "Sr. PM" and "Senior Product Manager" share tokens
+TITLE_ABBREVIATIONS = {
+    "sr": ["senior"], "snr": ["senior"], "jr": ["junior"], "mgr": ["manager"], "eng": ["engineer"],
+    "engr": ["engineer"], "swe": ["software", "engineer"], "sde": ["software", "engineer"],
+    "pm": ["product", "manager"], "tpm": ["technical", "program", "manager"], "em": ["engineering", "manager"],
+    "dir": ["director"], "mktg": ["marketing"], "ml": ["machine", "learning"],
+}
+STOP_WORDS = {"of", "and", "the", "a", "an", "for", "in", "&", "-"}
+
+# Most senior first; the first level whose pattern matches the normalized title wins
+SENIORITY_PATTERNS = [
+    ("intern", r"\bintern(ship)?\b|\bco ?op\b|\bstudent\b|\btrainee\b"),
+    ("cxo", r"\bchief\b|\bc[aefimoprst]o\b|\bfounder\b|\bco ?founder\b|\bpresident\b|\bowner\b"),
+    ("vp", r"\bvp\b|\bvice president\b|\b[saeg]vp\b"),
+    ("director", r"\bdirector\b|\bhead\b"),
+    ("manager", r"\bmanager\b|\bsupervisor\b"),
+    ("lead", r"\blead\b|\bstaff\b|\bprincipal\b|\barchitect\b|\bdistinguished\b|\bfellow\b"),
+    ("senior", r"\bsenior\b|\biii\b|\biv\b"),
+    ("junior", r"\bjunior\b|\bassociate\b|\bentry\b|\bgraduate\b|\bapprentice\b"),
+]
+SENIORITY_LEVELS = ("intern", "junior", "mid", "senior", "lead", "manager", "director", "vp", "cxo")
+
+# "Product manager" and friends name a job, not a team: they don't make someone a people manager
+IC_MANAGER_PATTERN = re.compile(
+    r"\b(product|program|project|account|customer success|community|brand|marketing|office|partner|"
+    r"social media|content|relationship|territory|case|release|technical program) manager\b")
+# Manager titles that still mean someone who runs a team and hires
+PEOPLE_MANAGER_PATTERN = re.compile(
+    r"\b(engineering|development|team|general|hiring|people|design|data science|research|sales|district|area)"
+    r" manager\b|\bmanager,|\bmanager (of|engineering|software)\b")
+
+# First function whose pattern matches wins, so the more specific ones come first
+FUNCTION_PATTERNS = [
+    ("recruiting", r"recruit|\btalent (acquisition|partner|sourcing|scout)|\bsourc(er|ing)\b|headhunter"),
+    ("hr", r"\bhr\b|\bhrbp\b|human resources|\bpeople (ops|operations|partner|team)\b|\bcompensation\b"),
+    ("executive", r"\bceo\b|\bfounder\b|\bco ?founder\b|\bpresident\b|\bchief executive\b|\bowner\b"),
+    ("data", r"\bdata\b|machine learning|\bai\b|analytics|\banalyst\b|statistic"),
+    ("design", r"design|\bux\b|\bui\b|user research"),
+    ("product", r"\bproduct\b"),
+    ("engineering", r"engineer|\bdeveloper\b|\bdevops\b|\bsre\b|programmer|\barchitect\b|\bqa\b|\bcto\b|"
+                    r"\bsoftware\b|firmware|technical program"),
+    ("sales", r"\bsales\b|account executive|business development|\b[bs]dr\b|\baccount manager\b"),
+    ("marketing", r"marketing|\bgrowth\b|\bbrand\b|\bcontent\b|communications|\bpr\b|\bseo\b|\bcmo\b"),
+    ("finance", r"financ|account(ant|ing)|controller|\bcfo\b|treasury|\bfp a\b|\baudit"),
+    ("operations", r"operations|\bops\b|supply chain|logistics|\bcoo\b|procurement"),
+    ("legal", r"legal|counsel|attorney|lawyer|paralegal|compliance"),
+    ("support", r"support|customer success|customer service|customer experience"),
+    ("research", r"research|scientist"),
+]
+FUNCTIONS = tuple(name for name, _ in FUNCTION_PATTERNS) + ("other",)
+
+_SENIORITY = [(level, re.compile(pattern)) for level, pattern in SENIORITY_PATTERNS]
+_FUNCTIONS = [(name, re.compile(pattern)) for name, pattern in FUNCTION_PATTERNS]
+HIRING_SENIORITY = {"manager", "director", "vp", "cxo"}
+# Levels senior enough to make a referral or introduction count
+INTRODUCER_SENIORITY = {"lead", "manager", "director", "vp", "cxo"}
+
+def title_part(role: str) -> str:
+    """Job title half of a headline: 'Senior PM at Meta | ex-Google' -> 'Senior PM'"""
+    if not role:
+        return ""
+    return re.split(r"\s(?:at|@)\s|@|\||•|·", role, maxsplit=1, flags=re.IGNORECASE)[0]
+
+def text_tokens(text: str, expand: bool = True) -> List[str]:
+    """Lowercased word tokens with abbreviations expanded and stop words dropped"""
+    tokens = []
+    for word in re.findall(r"[\w+#]+", _fold(text or "")):
+        if word in STOP_WORDS:
+            continue
+        tokens.extend(TITLE_ABBREVIATIONS.get(word, [word]) if expand else [word])
+    return tokens
+
+def normalize_title(role: str) -> str:
+    """Canonical title text: 'Sr. SWE @ Stripe' -> 'senior software engineer'"""
+    return " ".join(text_tokens(title_part(role)))
+
+def seniority_of(title: str) -> str:
+    for level, pattern in _SENIORITY:
+        if pattern.search(title):
+            if level == "manager" and IC_MANAGER_PATTERN.search(title) and not PEOPLE_MANAGER_PATTERN.search(title):
+                continue
+            return level
+    return "mid"
+
+def function_of(title: str) -> str:
+    for name, pattern in _FUNCTIONS:
+        if pattern.search(title):
+            return name
+    return "other"
+
+@lru_cache(maxsize=65536)
+def classify_role(role: Optional[str]) -> dict:
+    """Seniority, function, recruiter and hiring manager flags, and normalized title for a headline.
+
+    Results are cached per headline string; callers must not modify the returned dict.
+    """
+    title = normalize_title(role or "")
+    seniority = seniority_of(title) if title else "unknown"
+    function = function_of(title) if title else "other"
+    is_recruiter = function == "recruiting"
+    return {
+        "normalized_title": title,
+        "seniority": seniority,
+        "function": function,
+        "is_recruiter": is_recruiter,
+        # People managers outside HR can usually open and fill roles on their own team
+        "is_hiring_manager": seniority in HIRING_SENIORITY and function not in ("recruiting", "hr"),
+    }
+
+def introducer_flags(role_class: dict) -> Tuple[bool, bool]:
+    """(hiring, senior) for a classified headline: recruiters and HR hire; leads and up are senior"""
+    hiring = role_class["is_recruiter"] or role_class["function"] == "hr"
+    return hiring, role_class["seniority"] in INTRODUCER_SENIORITY
+
+def _singular(word: str) -> str:
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss") and word not in FUNCTIONS:
+        return word[:-1]
+    return word
+
+def role_query_filters(role: str) -> Optional[dict]:
+    """Index filters for role searches that name a classification rather than a title.
+
+    "recruiters" -> {"recruiter": True}; "hiring manager" -> {"hiring_manager": True};
+    "engineering directors" -> {"function": "engineering", "seniority": "director"}.
+    Returns None when the role should be matched on title words instead.
+    """
+    words = [_singular(w) for w in text_tokens(role)]
+    text = " ".join(words)
+    if re.fullmatch(r"(technical |tech )?(recruiter|recruiting|talent acquisition|talent partner|sourcer)", text):
+        return {"recruiter": True}
+    if re.fullmatch(r"hiring manager", text):
+        return {"hiring_manager": True}
+    if IC_MANAGER_PATTERN.search(text):
+        return None
+    levels = [w for w in words if w in SENIORITY_LEVELS and w != "mid"]
+    functions = [w for w in words if w in FUNCTIONS]
+    if len(levels) == 1 and len(functions) <= 1 and len(words) == len(levels) + len(functions):
+        return {"seniority": levels[0], **({"function": functions[0]} if functions else {})}
+    return None
@@ -0,0 +1,57 @@
+import json
+import asyncio
+import pytest
+import cache_store
+from batch_jobs import BatchJob, parse_batch_queries
+from job_events import job_events
+
+def test_parse_batch_queries():
+    """Test that batch items are validated against the queries they name"""
+    parsed = parse_batch_queries([{"query": "who_do_i_know_at_company", "company": "Acme"},
+                                  {"query": "who_can_introduce_me_to_person", "person": "Ann", "company": "Acme"}])
+    assert parsed == [("who_do_i_know_at_company", {"company": "Acme"}),
+                      ("who_can_introduce_me_to_person", {"person": "Ann", "company": "Acme"})]
+    for bad in ([], [{"query": "drop_tables"}], [{"query": "who_do_i_know_at_company", "role": "cto"}],
+                [{"query": "who_works_as_role_at_company", "company": "Acme"}]):
+        with pytest.raises(ValueError):
+            parse_batch_queries(bad)
+
+def test_batch_document_tracks_items(tmp_path):
+    """Test item states, counts and completion of the stored batch document"""
+    batch = BatchJob(parse_batch_queries([{"query": "who_do_i_know_at_company", "company": "Acme"},
+                                          {"query": "who_do_i_know_at_company", "company": "Globex"}]),
+                     cache_dir=str(tmp_path))
+    batch.update(0, "complete", source="cache", result={"status": "complete", "results": []}, publish=False)
+    batch.update(1, "queued", job_id="cache/globex.json", source="scrape", publish=False)
+    batch.save()
+    stored = json.loads(open(batch.batch_id).read())
+    assert stored["status"] == "processing" and stored["counts"] == {"complete": 1, "queued": 1}
+    batch.update(1, "error", error="boom", publish=False)
+    batch.save()
+    stored = json.loads(open(batch.batch_id).read())
+    assert stored["status"] == "complete" and stored["items"][1]["error"] == "boom"
+    assert stored["items"][1]["job_id"] == "cache/globex.json"
+
+def test_item_events_stream_on_batch_job(tmp_path, monkeypatch):
+    """Test that each item update is pushed on the batch's event stream until the batch completes"""
+    monkeypatch.setattr(cache_store, "_save_listeners", [job_events.on_cache_save])
+    batch = BatchJob(parse_batch_queries([{"query": "who_do_i_know_at_company", "company": "Acme"}]),
+                     cache_dir=str(tmp_path))
+    batch.save()
+
+    async def scenario():
+        events = []
+
+        async def follow():
+            async for record in job_events.subscribe(batch.batch_id, lambda: batch.document()):
+                if record is not None:
+                    events.append((record["event"], record["data"].get("status")))
+
+        stream = asyncio.create_task(follow())
+        await asyncio.sleep(0)
+        batch.update(0, "complete", result={"status": "complete"})
+        batch.save()
+        await asyncio.wait_for(stream, 1)
+        return events
+
+    assert asyncio.run(scenario()) == [("status", "processing"), ("item", "complete"), ("status", "complete")]
@@ -0,0 +1,87 @@
+import asyncio
+from browser_pool import BrowserPool
+
+class FakePage:
+    def __init__(self, context):
+        self.context = context
+        self.url = None
+        self.closed = False
+
+    async def goto(self, url):
+        self.url = url
+
+    async def close(self):
+        self.closed = True
+
+class FakeContext:
+    def __init__(self):
+        self.pages = []
+
+    async def new_page(self):
+        page = FakePage(self)
+        self.pages.append(page)
+        return page
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+
+    def is_connected(self):
+        return self.connected
+
+def launcher(calls):
+    async def launch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        context = FakeContext()
+        return FakeBrowser(), await context.new_page(), object()
+    return launch
+
+def test_warm_pool_leases_idle_pages_and_refills():
+    """Test that warm-up opens idle pages on the neutral URL and a leased page is replaced and closed on release"""
+    async def scenario():
+        pool = BrowserPool(pages=2, url="about:blank")
+        assert await pool.warm(launcher([]))
+        assert pool.status()["idle_pages"] == 2
+        leased = await pool.acquire()
+        assert leased.page.url == "about:blank"
+        await asyncio.sleep(0)
+        assert pool.status()["idle_pages"] == 2 and pool.status()["leased_pages"] == 1
+        await leased.close()
+        await leased.close()
+        return pool, leased
+
+    pool, leased = asyncio.run(scenario())
+    assert leased.page.closed and pool.status()["leased_pages"] == 0
+
+def test_job_during_warm_up_waits_for_it():
+    """Test that a job arriving mid warm-up gets a warm page instead of launching a second browser"""
+    calls = []
+
+    async def scenario():
+        pool = BrowserPool(pages=1)
+        warming = asyncio.create_task(pool.warm(launcher(calls)))
+        await asyncio.sleep(0)
+        assert pool.status()["state"] == "warming"
+        leased = await pool.acquire()
+        await warming
+        return leased
+
+    assert asyncio.run(scenario()) is not None and calls == [1]
+
+def test_failed_or_disconnected_pool_falls_back():
+    """Test that a failed login or a disconnected browser makes acquire return None"""
+    async def failed_launch():
+        return None, None, None
+
+    async def scenario():
+        failed = BrowserPool()
+        assert not await failed.warm(failed_launch)
+        ready = BrowserPool(pages=1)
+        await ready.warm(launcher([]))
+        ready.browser.connected = False
+        return failed, await failed.acquire(), ready, await ready.acquire()
+
+    failed, failed_lease, ready, ready_lease = asyncio.run(scenario())
+    assert failed_lease is None and failed.status()["state"] == "failed" and "login" in failed.status()["error"]
+    assert ready_lease is None and ready.status()["error"] == "Browser disconnected"
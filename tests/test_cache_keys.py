@@ -0,0 +1,98 @@
+import json
+import pytest
+from cache_keys import (CompanyAliasTable, normalize_company, normalize_person_name, normalize_profile_url,
+                        headline_company, make_cache_key, legacy_cache_key, compare_hit_rates, read_cache_lookups)
+
+@pytest.fixture
+def aliases(tmp_path):
+    """Alias table persisted in a temporary directory"""
+    return CompanyAliasTable(str(tmp_path / "aliases.json"))
+
+def test_normalize_company_keeps_meaningful_punctuation():
+    """Test that AT&T and ATT stay distinct while legal suffixes are dropped"""
+    assert normalize_company("AT&T") != normalize_company("ATT")
+    assert normalize_company("Acme, Inc.") == normalize_company("acme")
+    assert normalize_company("  Nestlé  S.A. ") == "nestle"
+
+def test_normalize_person_name():
+    """Test that credentials, honorifics and accents don't change a person's key"""
+    assert normalize_person_name("Dr. José  García, PhD") == "jose garcia"
+    assert normalize_person_name("JANE DOE") == "jane doe"
+
+def test_normalize_profile_url():
+    """Test that tracking params, locale hosts and slashes are removed from profile URLs"""
+    canonical = "https://www.linkedin.com/in/jane-doe"
+    assert normalize_profile_url("https://www.linkedin.com/in/Jane-Doe/?miniProfileUrn=abc") == canonical
+    assert normalize_profile_url("http://uk.linkedin.com/in/jane-doe#about") == canonical
+    assert normalize_profile_url("/in/jane-doe/") == canonical
+    assert normalize_profile_url("") == ""
+
+def test_headline_company():
+    """Test extraction of the employer from a headline"""
+    assert headline_company("Software Engineer at Meta Platforms, Inc.") == "meta platforms"
+    assert headline_company("PM @ Stripe | ex-Google") == "stripe"
+    assert headline_company("Independent consultant") is None
+
+def test_seed_aliases_share_a_key(aliases):
+    """Test that Meta, Meta Platforms and Facebook map to one cache key"""
+    keys = {make_cache_key("company_people_search", aliases, company=c) for c in ("Meta", "Meta Platforms", "Facebook")}
+    assert len(keys) == 1
+
+def test_slug_collisions_get_distinct_keys(aliases):
+    """Test that values which slugify the same still get separate keys"""
+    assert legacy_cache_key("company_people_search", company="AT&T") == legacy_cache_key("company_people_search", company="ATT")
+    assert make_cache_key("company_people_search", aliases, company="AT&T") != make_cache_key("company_people_search", aliases, company="ATT")
+
+def test_cache_key_is_stable_and_readable(aliases):
+    """Test that keys are deterministic and keep a readable slug"""
+    key = make_cache_key("role_search", aliases, role="Product Manager", company="Stripe")
+    assert key == make_cache_key("role_search", aliases, company="stripe", role="product  manager")
+    assert key.startswith("role_search_stripe_productmanager_")
+    assert make_cache_key("entire_network_crawl", aliases) == "entire_network_crawl"
+
+def test_learn_alias_from_headlines(aliases, tmp_path):
+    """Test that a company search whose people all name another employer learns an alias"""
+    people = [{"role": f"Engineer {i} at Initech"} for i in range(10)] + [{"role": "Student"}]
+    assert aliases.learn("Initrode", people) == "initech"
+    assert aliases.canonical("Initrode") == "initech"
+    # The learned alias is persisted and reloaded
+    assert CompanyAliasTable(str(tmp_path / "aliases.json")).canonical("initrode") == "initech"
+
+def test_learn_alias_requires_strong_signal(aliases):
+    """Test that mixed headlines, small samples and divisions of the searched company don't create an alias"""
+    mixed = [{"role": "Engineer at Initech"}] * 8 + [{"role": "Engineer at Globex"}] * 2
+    assert aliases.learn("Initrode", mixed) is None
+    assert aliases.learn("Initrode", [{"role": "Engineer at Initech"}] * 5) is None
+    deepmind = [{"role": "Researcher at Google DeepMind"}] * 12
+    assert aliases.learn("Google", deepmind) is None
+    still_used = [{"role": "Engineer at Initech"}] * 19 + [{"role": "Engineer at Initrode"}]
+    assert aliases.learn("Initrode", still_used) is None
+    assert aliases.learned == {}
+
+def test_learned_aliases_stay_out_of_cache_keys(aliases):
+    """Test that learning an alias doesn't move a query to another cache key"""
+    before = make_cache_key("company_people_search", aliases, company="Instagram")
+    assert aliases.add_alias("instagram", "meta")
+    assert aliases.canonical("Instagram") == "meta"
+    assert make_cache_key("company_people_search", aliases, company="Instagram") == before
+
+def test_alias_cycles_are_refused(aliases):
+    """Test that an alias can't point back at itself through a chain"""
+    assert aliases.add_alias("initrode", "initech")
+    assert not aliases.add_alias("initech", "initrode")
+    assert aliases.canonical("initech") == "initech"
+
+def test_compare_hit_rates_from_log(aliases, tmp_path):
+    """Test hit-rate reporting before and after canonicalization from logged lookups"""
+    log_file = tmp_path / "server.log"
+    entries = [{"operation": "cache_lookup", "query_name": "company_people_search", "params": {"company": c}}
+               for c in ("Meta", "Facebook", "Meta Platforms", "meta")]
+    entries.append({"operation": "query_plan", "query_name": "role_search"})
+    log_file.write_text("\n".join(json.dumps(e) for e in entries) + "\nnot json\n")
+
+    lookups = read_cache_lookups(str(log_file))
+    assert len(lookups) == 4
+    report = compare_hit_rates(lookups, aliases)
+    assert report["legacy"]["hits"] == 1
+    assert report["canonical"]["hits"] == 3
+    assert report["canonical"]["hit_rate"] == 0.75
@@ -0,0 +1,125 @@
+import os
+import json
+import time
+import pytest
+from datetime import datetime, timedelta
+from cache_manager import CacheManager, query_type
+
+@pytest.fixture
+def cache_dir(tmp_path):
+    return tmp_path
+
+def write_entry(cache_dir, name, status, age_hours=0, size=0):
+    """Write a cache file with a given status, age and approximate size"""
+    data = {"status": status, "timestamp": (datetime.now() - timedelta(hours=age_hours)).isoformat()}
+    if size:
+        data["results"] = ["x" * size]
+    path = os.path.join(cache_dir, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(data, f)
+    return path
+
+def test_query_type():
+    """Test that cache files are attributed to their query type"""
+    assert query_type("company_people_search_acme_1a2b3c.json") == "company_people_search"
+    assert query_type("entire_network_crawl.json") == "entire_network_crawl"
+    assert query_type("profiles/abc.json") == "profile_mutuals"
+
+def test_compaction_drops_errors_orphans_and_stale(cache_dir):
+    """Test that compaction removes old errors, orphaned markers and long-stale results"""
+    write_entry(cache_dir, "role_search_old_error.json", "error", age_hours=2)
+    write_entry(cache_dir, "role_search_new_error.json", "error", age_hours=0)
+    write_entry(cache_dir, "company_people_search_dead.json", "processing", age_hours=1)
+    write_entry(cache_dir, "entire_network_crawl.json", "complete", age_hours=24 * 365)
+    write_entry(cache_dir, "company_people_search_ok.json", "complete", age_hours=1)
+    manager = CacheManager(str(cache_dir))
+    # A job started after the manager is live
+    write_entry(cache_dir, "company_people_search_running.json", "processing")
+    manager.started_at -= 1
+
+    removed = manager.compact()
+    assert removed == {"error": 1, "orphaned_processing": 1, "stale": 1, "batch": 0}
+    remaining = sorted(os.listdir(cache_dir))
+    assert remaining == ["company_people_search_ok.json", "company_people_search_running.json", "role_search_new_error.json"]
+
+def test_compaction_expires_batch_documents(cache_dir):
+    """Test that batch documents are dropped once past their retention, and orphaned ones at once"""
+    old = write_entry(cache_dir, "_batch_old.json", "complete")
+    os.utime(old, (time.time() - 48 * 3600,) * 2)
+    dead = write_entry(cache_dir, "_batch_dead.json", "processing")
+    os.utime(dead, (time.time() - 3600,) * 2)
+    manager = CacheManager(str(cache_dir))
+    write_entry(cache_dir, "_batch_recent.json", "complete")
+    write_entry(cache_dir, "_batch_running.json", "processing")
+    manager.started_at -= 1
+
+    removed = manager.compact()
+    assert removed == {"error": 0, "orphaned_processing": 1, "stale": 0, "batch": 1}
+    assert sorted(os.listdir(cache_dir)) == ["_batch_recent.json", "_batch_running.json"]
+
+def test_maintenance_expires_old_access_stats(cache_dir):
+    """Test that access statistics are dropped once not looked up for the retention period, file or not"""
+    manager = CacheManager(str(cache_dir))
+    for name in ("recent", "old"):
+        manager.record_lookup({"query_name": "company_people_search", "company": name},
+                              os.path.join(cache_dir, f"company_people_search_{name}.json"), False)
+    manager.access["company_people_search_old.json"]["last_access"] = time.time() - 31 * 86400
+
+    assert manager.maintain()["access_pruned"] == 1
+    assert list(manager.access) == ["company_people_search_recent.json"]
+
+def test_lru_eviction_respects_budget(cache_dir):
+    """Test that the least recently accessed entries are evicted first"""
+    paths = [write_entry(cache_dir, f"company_people_search_{i}.json", "complete", size=1000) for i in range(4)]
+    manager = CacheManager(str(cache_dir), max_bytes=2500, policy="lru")
+    for i in (2, 0, 3, 1):
+        manager.record_lookup({"query_name": "company_people_search", "company": str(i)}, paths[i], True)
+        time.sleep(0.001)
+
+    result = manager.evict()
+    assert result["evicted"] == 2
+    assert sorted(os.listdir(cache_dir)) == ["company_people_search_1.json", "company_people_search_3.json"]
+
+def test_lfu_eviction_keeps_popular_entries(cache_dir):
+    """Test that the least frequently accessed entries are evicted first"""
+    paths = [write_entry(cache_dir, f"company_people_search_{i}.json", "complete", size=1000) for i in range(3)]
+    manager = CacheManager(str(cache_dir), max_bytes=2500, policy="lfu")
+    for i, count in enumerate((5, 1, 3)):
+        for _ in range(count):
+            manager.record_lookup({"query_name": "company_people_search"}, paths[i], True)
+
+    manager.evict()
+    assert sorted(os.listdir(cache_dir)) == ["company_people_search_0.json", "company_people_search_2.json"]
+
+def test_processing_markers_are_never_evicted(cache_dir):
+    """Test that a running job's marker survives eviction"""
+    write_entry(cache_dir, "role_search_running.json", "processing", size=5000)
+    manager = CacheManager(str(cache_dir), max_bytes=100)
+    manager.evict()
+    assert os.listdir(cache_dir) == ["role_search_running.json"]
+
+def test_stats_report_hit_rate_per_query_type(cache_dir):
+    """Test entries, bytes and per-query-type hit rate reporting"""
+    path = write_entry(cache_dir, "role_search_a.json", "complete")
+    write_entry(cache_dir, "profiles/abc.json", "complete")
+    manager = CacheManager(str(cache_dir))
+    manager.record_lookup({"query_name": "role_search"}, path, False)
+    manager.record_lookup({"query_name": "role_search"}, path, True)
+    manager.record_lookup({"query_name": "role_search"}, path, True)
+
+    stats = manager.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] > 0
+    assert stats["by_query_type"]["role_search"]["hit_rate"] == round(2 / 3, 4)
+    assert stats["by_query_type"]["profile_mutuals"]["entries"] == 1
+
+def test_access_stats_persist(cache_dir):
+    """Test that access stats survive a restart and are not counted as entries"""
+    path = write_entry(cache_dir, "role_search_a.json", "complete")
+    manager = CacheManager(str(cache_dir))
+    manager.record_lookup({"query_name": "role_search"}, path, True)
+    manager.maintain()
+    reloaded = CacheManager(str(cache_dir))
+    assert reloaded.access["role_search_a.json"]["count"] == 1
+    assert reloaded.stats()["entries"] == 1
@@ -0,0 +1,86 @@
+import os
+import json
+import math
+import time
+import asyncio
+import pytest
+import cache_store
+from cache_store import save_to_cache, save_to_cache_async, load_from_cache, load_from_cache_async
+
+def test_atomic_save_leaves_no_partial_files(tmp_path, monkeypatch):
+    """Test that a save replaces the file whole, runs listeners, and cleans up after a failed write"""
+    seen = []
+    monkeypatch.setattr(cache_store, "_save_listeners", [lambda filename, data: seen.append(data["status"])])
+    path = str(tmp_path / "job.json")
+    save_to_cache(path, {"status": "processing"})
+    asyncio.run(save_to_cache_async(path, {"status": "complete", "results": [1, 2]}))
+    assert asyncio.run(load_from_cache_async(path)) == {"status": "complete", "results": [1, 2]}
+    assert seen == ["processing", "complete"]
+    with pytest.raises(TypeError):
+        save_to_cache(path, {"status": "complete", "results": {object()}})
+    assert load_from_cache(path)["results"] == [1, 2]
+    assert os.listdir(tmp_path) == ["job.json"]
+
+def big_result(people: int) -> dict:
+    return {"status": "complete", "timestamp": "2026-01-01T00:00:00",
+            "results": [{"name": f"Person {i}", "profile_url": f"https://www.linkedin.com/in/p{i}",
+                         "role": "Engineer at Acme", "mutual_connections": [{"name": f"Mutual {j}"} for j in range(10)]}
+                        for i in range(people)]}
+
+async def status_poll_latencies(status_path: str, write) -> list:
+    """Latencies of /job_status-style reads of a small file while write() saves a big result"""
+    latencies, writing = [], True
+
+    async def poll():
+        # A request "arrives" every 2 ms; its latency runs from arrival to the answer
+        while writing:
+            arrival = time.perf_counter() + 0.002
+            await asyncio.sleep(0.002)
+            await load_from_cache_async(status_path)
+            latencies.append((time.perf_counter() - arrival) * 1000)
+
+    poller = asyncio.create_task(poll())
+    await asyncio.sleep(0.02)
+    await write()
+    writing = False
+    await poller
+    return sorted(latencies)
+
+@pytest.mark.slow
+def test_status_latency_flat_during_big_write(tmp_path, monkeypatch):
+    """Benchmark: status reads keep a low p99 while a multi-megabyte result is written"""
+    monkeypatch.setattr(cache_store, "_save_listeners", [])
+    status_path = str(tmp_path / "status.json")
+    save_to_cache(status_path, {"status": "processing"})
+    doc = big_result(30_000)
+
+    async def blocking_write():
+        save_to_cache(str(tmp_path / "blocking.json"), doc)
+
+    async def threaded_write():
+        await save_to_cache_async(str(tmp_path / "threaded.json"), doc)
+
+    blocking = asyncio.run(status_poll_latencies(status_path, blocking_write))
+    threaded = asyncio.run(status_poll_latencies(status_path, threaded_write))
+    p99 = lambda latencies: latencies[math.ceil(len(latencies) * 0.99) - 1]
+    size_mb = os.path.getsize(tmp_path / "threaded.json") / 2**20
+    print(f"\n{size_mb:.1f} MB write: status p99 {p99(blocking):.1f} ms blocking, {p99(threaded):.1f} ms off-loop "
+          f"({len(blocking)} vs {len(threaded)} reads)")
+    assert p99(threaded) < 100
+    assert p99(blocking) > 5 * p99(threaded)
+
+def test_migrate_cache_keys(tmp_path, monkeypatch):
+    """Test that results saved under older keys move to their current key, once"""
+    monkeypatch.setattr(cache_store, "CACHE_DIR", str(tmp_path))
+    legacy = tmp_path / "company_people_search_acme.json"
+    legacy.write_text(json.dumps({"company": "Acme", "status": "complete", "results": []}))
+    learned = tmp_path / "role_search_meta_pm_0123456789.json"
+    learned.write_text(json.dumps({"role": "PM", "company": "Instagram", "status": "complete", "results": []}))
+    (tmp_path / "company_people_search_x_processing.json").write_text(json.dumps({"status": "processing"}))
+    assert cache_store.migrate_cache_keys() == {"moved": 2, "kept": 0}
+    assert not legacy.exists() and not learned.exists()
+    assert load_from_cache(cache_store.get_cache_filename("company_people_search", company="acme"))["company"] == "Acme"
+    assert load_from_cache(cache_store.get_cache_filename("role_search", role="pm", company="instagram"))
+    # Recorded as done, so later startups don't scan again
+    legacy.write_text(json.dumps({"company": "Acme", "status": "complete", "results": []}))
+    assert cache_store.migrate_cache_keys() == {"moved": 0, "kept": 0}
@@ -0,0 +1,96 @@
+import time
+import asyncio
+import pytest
+from datetime import datetime, timedelta
+import cache_store
+import cache_warmer as warmer_module
+from cache_store import get_cache_filename, save_to_cache
+from cache_manager import CacheManager
+from cache_warmer import CacheWarmer
+from rate_limiter import RateLimiter
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    """Cache manager over a temporary cache directory"""
+    monkeypatch.setattr(cache_store, "CACHE_DIR", str(tmp_path))
+    return CacheManager(str(tmp_path))
+
+def lookup(manager, query_name, count, **params):
+    """Simulate interactive lookups that happened well before now"""
+    query_params = {"query_name": query_name, **params}
+    for _ in range(count):
+        manager.record_lookup(query_params, get_cache_filename(**query_params), False)
+    entry = manager.access[manager._entry_name(get_cache_filename(**query_params))]
+    entry["last_access"] = time.time() - 3600
+
+def test_popularity_ranks_by_decayed_count(manager):
+    """Test that frequently queried companies and roles rank first"""
+    lookup(manager, "company_people_search", 5, company="Acme")
+    lookup(manager, "role_search", 3, role="Recruiter", company="Globex")
+    lookup(manager, "company_people_search", 1, company="Initech")
+    lookup(manager, "mutual_connections", 9, profile_url="https://www.linkedin.com/in/bob")
+
+    ranked = CacheWarmer(manager, top_n=2).popularity()
+    assert [(c.query_name, c.params) for c in ranked] == [
+        ("company_people_search", {"company": "Acme"}),
+        ("role_search", {"company": "Globex", "role": "Recruiter"}),
+    ]
+
+def test_due_skips_fresh_and_running_entries(manager):
+    """Test that only missing or nearly stale entries are warmed"""
+    lookup(manager, "company_people_search", 5, company="Fresh")
+    lookup(manager, "company_people_search", 4, company="Stale")
+    lookup(manager, "company_people_search", 3, company="Running")
+    lookup(manager, "company_people_search", 2, company="Missing")
+    save_to_cache(get_cache_filename("company_people_search", company="Fresh"),
+                  {"status": "complete", "timestamp": datetime.now().isoformat(), "results": []})
+    save_to_cache(get_cache_filename("company_people_search", company="Stale"),
+                  {"status": "complete", "timestamp": (datetime.now() - timedelta(days=30)).isoformat(), "results": []})
+    save_to_cache(get_cache_filename("company_people_search", company="Running"),
+                  {"status": "processing", "timestamp": datetime.now().isoformat()})
+
+    due = CacheWarmer(manager).due()
+    assert [c.params["company"] for c in due] == ["Stale", "Missing"]
+
+def test_compacted_entries_are_still_warmed(manager):
+    """Test that a popular query whose entry compaction removed keeps its stats and is warmed again"""
+    lookup(manager, "company_people_search", 5, company="Acme")
+    filename = get_cache_filename("company_people_search", company="Acme")
+    save_to_cache(filename, {"status": "error", "timestamp": (datetime.now() - timedelta(hours=2)).isoformat()})
+    assert manager.maintain()["compacted"]["error"] == 1
+
+    due = CacheWarmer(manager).due()
+    assert [(c.query_name, c.params) for c in due] == [("company_people_search", {"company": "Acme"})]
+
+def test_warm_once_runs_top_due_query(manager):
+    """Test that an idle server with budget warms the most popular due query"""
+    lookup(manager, "company_people_search", 5, company="Acme")
+    calls = []
+
+    async def run_job(query_name, params):
+        calls.append((query_name, params))
+        return {"status": "complete"}
+
+    warmer = CacheWarmer(manager, limiter=RateLimiter())
+    warmed = asyncio.run(warmer.warm_once(run_job))
+    assert warmed.params == {"company": "Acme"}
+    assert calls == [("company_people_search", {"company": "Acme"})]
+    assert warmer.last_warmed["status"] == "complete"
+
+def test_warm_once_waits_for_idle_and_budget(manager, monkeypatch):
+    """Test that warming yields to interactive traffic, busy browsers and the rate limit"""
+    lookup(manager, "company_people_search", 5, company="Acme")
+
+    async def run_job(query_name, params):
+        raise AssertionError("should not run")
+
+    warmer = CacheWarmer(manager, limiter=RateLimiter())
+    assert asyncio.run(warmer.warm_once(run_job, browser_idle=lambda: False)) is None
+
+    monkeypatch.setattr(warmer_module, "WARM_MAX_JOBS_PER_HOUR", 1)
+    warmer.warm_history.append(time.time())
+    assert asyncio.run(warmer.warm_once(run_job)) is None
+
+    warmer.warm_history.clear()
+    manager.record_lookup({"query_name": "role_search"}, "x.json", True)
+    assert asyncio.run(warmer.warm_once(run_job)) is None
@@ -0,0 +1,82 @@
+import json
+from datetime import datetime, timedelta
+import pytest
+
+pytest.importorskip("numpy")
+from network_graph import NetworkGraph, ME
+from compact_graph import CompactGraphBuilder, from_network_graph, from_cache_dir, memory_benchmark
+
+ALICE = {"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice?trk=1", "role": "Engineer at Acme"}
+DAVE = {"name": "Dave Brown", "profile_url": "https://www.linkedin.com/in/dave", "role": "Designer at Hooli"}
+BOB = {"name": "Bob Jones", "profile_url": "https://www.linkedin.com/in/bob/", "role": "PM at Acme",
+       "location": "Seattle", "connection_level": 2, "mutual_connections": [ALICE, DAVE]}
+COMPANY_RESULT = {
+    "company": "Acme", "status": "complete", "timestamp": datetime.now().isoformat(),
+    "results": [{**ALICE, "connection_level": 1}, BOB]
+}
+
+def by_url(people):
+    return sorted(people, key=lambda p: p["profile_url"])
+
+@pytest.fixture
+def compact():
+    builder = CompactGraphBuilder()
+    builder.add_result(COMPANY_RESULT, "company_people_search")
+    # Repeated results must not duplicate edges
+    builder.add_result(COMPANY_RESULT, "company_people_search")
+    return builder.build()
+
+def test_csr_matches_dict_graph(compact):
+    """Test that the compact form has the same people, edges and introducers as the dict form"""
+    graph = NetworkGraph()
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    assert compact.stats()["people"] == graph.stats()["people"] == 3
+    assert compact.edge_count == graph.edge_count == 4
+    for url in ("https://www.linkedin.com/in/bob", "https://www.linkedin.com/in/alice"):
+        assert sorted(compact.neighbours(url)) == sorted(graph.neighbours(url))
+    assert by_url(compact.introducers_for("https://www.linkedin.com/in/Bob?x=1")) == by_url(
+        graph.introducers_for("https://www.linkedin.com/in/bob"))
+
+def test_columnar_attributes_are_interned(compact):
+    """Test person attributes and that repeated strings are stored once"""
+    bob = compact.get_person("https://www.linkedin.com/in/bob")
+    assert bob == {"profile_url": "https://www.linkedin.com/in/bob", "name": "Bob Jones", "role": "PM at Acme",
+                   "location": "Seattle", "company": "acme", "connection_level": 2}
+    roles = compact.columns["role"]
+    assert len(set(compact.strings[i] for i in range(len(compact.strings)))) == len(compact.strings)
+    assert compact.get_person("https://www.linkedin.com/in/nobody") is None
+    assert roles.dtype.itemsize == 4
+
+def test_from_network_graph_and_cache_dir(tmp_path):
+    """Test both conversions from existing data"""
+    graph = NetworkGraph()
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    converted = from_network_graph(graph)
+    assert converted.edge_count == 4
+    assert by_url(converted.introducers_for("https://www.linkedin.com/in/bob")) == by_url(
+        graph.introducers_for("https://www.linkedin.com/in/bob"))
+    (tmp_path / "company_people_search_acme_1a.json").write_text(json.dumps(COMPANY_RESULT))
+    compact = from_cache_dir(str(tmp_path))
+    assert compact.edge_count == 4
+    assert len(compact.neighbours(ME)) == 2
+
+@pytest.mark.slow
+def test_memory_against_dict_forms():
+    """Benchmark: at 1M edges the compact graph uses a small fraction of the dict forms' memory"""
+    report = memory_benchmark()
+    print(f"\n{report}")
+    assert report["edges"] >= 1_000_000
+    assert report["compact_graph_mb"] * 5 < report["network_graph_mb"]
+    assert report["compact_graph_mb"] * 10 < report["parsed_result_mb"]
+
+def test_superseded_links_match_dict_graph():
+    """Test that the builder drops the links a newer mutual list replaced, as the dict form does"""
+    graph, builder = NetworkGraph(), CompactGraphBuilder()
+    newer = (datetime.now() + timedelta(minutes=1)).isoformat()
+    for target in (graph, builder):
+        target.add_result(COMPANY_RESULT, "company_people_search")
+        target.add_mutuals({"profile_url": BOB["profile_url"]}, [DAVE], seen_at=newer)
+    compact = builder.build()
+    assert by_url(compact.introducers_for(BOB["profile_url"])) == by_url(graph.introducers_for(BOB["profile_url"]))
+    assert [p["name"] for p in compact.introducers_for(BOB["profile_url"])] == ["Dave Brown"]
+    assert compact.introducers_for(ALICE["profile_url"]) is None
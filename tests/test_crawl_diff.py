@@ -0,0 +1,70 @@
+import json
+from crawl_diff import CrawlChangeLog, digest_people, diff_digests
+
+ALICE = {"name": "Alice", "profile_url": "https://www.linkedin.com/in/alice/", "role": "Engineer at Acme",
+         "connection_level": 1}
+CAROL = {"name": "Carol", "profile_url": "https://www.linkedin.com/in/carol", "role": "Designer at Globex",
+         "connection_level": 1}
+
+def crawl(*people, timestamp="2026-01-01T00:00:00"):
+    return {"status": "complete", "timestamp": timestamp, "results": list(people)}
+
+def second(name, role, *mutuals):
+    return {"name": name, "profile_url": f"https://www.linkedin.com/in/{name.lower()}", "role": role,
+            "connection_level": 2, "mutual_connections": list(mutuals)}
+
+def changes_between(old, new):
+    previous, _ = digest_people(old["results"])
+    current, mutuals = digest_people(new["results"])
+    return diff_digests(previous, current, mutuals, new["timestamp"])
+
+def test_unchanged_crawl_has_no_changes():
+    """Test that identical people (URL variants included) produce no changes"""
+    old = crawl(ALICE, second("Bob", "PM at Acme", ALICE))
+    new = crawl({**ALICE, "profile_url": "https://linkedin.com/in/Alice?trk=x"}, second("Bob", "PM at Acme", ALICE))
+    assert changes_between(old, new) == []
+
+def test_joins_leaves_and_role_changes():
+    """Test detection of joins, leaves and a company change"""
+    old = crawl(ALICE, second("Bob", "PM at Acme", ALICE), second("Dan", "Engineer at Initech", ALICE))
+    new = crawl(ALICE, second("Bob", "Senior PM at Globex", ALICE), second("Erin", "Analyst at Acme", ALICE))
+    by_type = {c["type"]: c for c in changes_between(old, new)}
+    assert set(by_type) == {"join", "leave", "role_change"}
+    assert by_type["join"]["name"] == "Erin"
+    assert by_type["leave"]["name"] == "Dan" and by_type["leave"]["company"] == "initech"
+    role_change = by_type["role_change"]
+    assert (role_change["previous_company"], role_change["company"]) == ("acme", "globex")
+    assert role_change["company_changed"] and role_change["previous_role"] == "PM at Acme"
+
+def test_new_mutual_links():
+    """Test that only newly added mutual connections are reported"""
+    old = crawl(ALICE, CAROL, second("Bob", "PM at Acme", ALICE))
+    new = crawl(ALICE, CAROL, second("Bob", "PM at Acme", ALICE, CAROL))
+    [change] = changes_between(old, new)
+    assert change["type"] == "new_mutual_links"
+    assert change["mutuals"] == [{"name": "Carol", "profile_url": "https://www.linkedin.com/in/carol"}]
+
+def test_change_log_records_and_queries_by_company(tmp_path):
+    """Test that the first crawl is a baseline and later changes are queryable by either employer"""
+    log = CrawlChangeLog(str(tmp_path / "_crawl_digest.json"), str(tmp_path / "_crawl_changes.jsonl"))
+    assert log.record(crawl(ALICE, second("Bob", "PM at Acme", ALICE))) == []
+    changes = log.record(crawl(ALICE, second("Bob", "PM at Globex", ALICE), second("Fay", "CTO at Hooli"),
+                               timestamp="2026-02-01T00:00:00"))
+    assert len(changes) == 2
+    assert [c["name"] for c in log.query(company="Acme Inc")] == ["Bob"]
+    assert [c["name"] for c in log.query(company="globex")] == ["Bob"]
+    assert [c["type"] for c in log.query(change_types=["join"])] == ["join"]
+    assert log.query(since="2026-03-01") == []
+    digest = json.loads((tmp_path / "_crawl_digest.json").read_text())
+    assert digest["timestamp"] == "2026-02-01T00:00:00" and len(digest["people"]) == 3
+
+def test_change_log_keeps_newest_entries(tmp_path):
+    """Test that the log is capped, dropping the oldest changes first"""
+    log = CrawlChangeLog(str(tmp_path / "_crawl_digest.json"), str(tmp_path / "_crawl_changes.jsonl"), max_entries=3)
+    log.record(crawl(ALICE))
+    people = [ALICE]
+    for i, name in enumerate(("Bob", "Dan", "Eve", "Fay")):
+        people.append(second(name, "PM at Acme"))
+        log.record(crawl(*people, timestamp=f"2026-0{i + 2}-01T00:00:00"))
+    assert [c["name"] for c in log.query()] == ["Fay", "Eve", "Dan"]
+    assert len((tmp_path / "_crawl_changes.jsonl").read_text().splitlines()) == 3
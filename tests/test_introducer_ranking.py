@@ -0,0 +1,79 @@
+import time
+import random
+import pytest
+
+np = pytest.importorskip("numpy")
+from introducer_ranking import rank_people, truncate_ranked, feature_matrix
+
+def person(name, role="", level=2, location="", mutuals=0):
+    return {"name": name, "profile_url": f"https://www.linkedin.com/in/{name.lower()}", "role": role,
+            "location": location, "connection_level": level,
+            "mutual_connections": [{"name": f"m{i}"} for i in range(mutuals)]}
+
+def test_features_are_normalized():
+    """Test that every feature lies in 0..1 and mutual counts are log scaled"""
+    people = [person("A", "Recruiter at Acme", 1, "Seattle, WA", 10), person("B", "Engineer", 3, "Austin, TX", 0)]
+    features = feature_matrix(people, location="Seattle")
+    assert features.shape == (2, 5)
+    assert features.min() >= 0 and features.max() <= 1
+    assert features[0].tolist() == [1.0, 1.0, 0.0, 1.0, 1.0]
+    assert features[1, 0] == 0.0
+
+def test_ranking_order_and_scores():
+    """Test that well connected recruiters and managers outrank isolated individual contributors"""
+    people = [
+        person("Ic", "Software Engineer at Acme", 2, mutuals=1),
+        person("Recruiter", "Technical Recruiter at Acme", 2, mutuals=8),
+        person("Manager", "Engineering Manager at Acme", 2, mutuals=3),
+        person("Far", "Software Engineer at Acme", 3),
+    ]
+    ranked = rank_people(people, location="")
+    assert [p["name"] for p in ranked] == ["Recruiter", "Manager", "Ic", "Far"]
+    assert ranked[0]["rank_score"] > ranked[1]["rank_score"] > ranked[-1]["rank_score"]
+    # The input is left as it was
+    assert not any("rank_score" in p for p in people)
+
+def test_role_features_follow_the_classifier():
+    """Test that hiring and seniority flags come from role_classifier, not keyword matches"""
+    people = [person("Pm", "Senior Product Manager at Acme"), person("Hr", "HR Business Partner"),
+              person("Staff", "Staff Engineer"), person("Talent", "Engineer at Talentful")]
+    features = feature_matrix(people, location="")
+    assert features[:, 1].tolist() == [0.0, 1.0, 0.0, 0.0]
+    assert features[:, 2].tolist() == [0.0, 0.0, 1.0, 0.0]
+
+def test_degree_fallback_for_people_without_mutual_lists():
+    """Test that mutual counts come from degree_of when a result has no mutual list"""
+    people = [{"name": "A", "profile_url": "a", "connection_level": 1},
+              {"name": "B", "profile_url": "b", "connection_level": 1}]
+    ranked = rank_people(people, location="", degree_of={"a": 1, "b": 20}.get)
+    assert [p["name"] for p in ranked] == ["B", "A"]
+
+def test_truncate_ranked():
+    """Test that responses are cut to the limit while the totals are reported"""
+    data = {"status": "complete", "results": [{"n": i} for i in range(10)]}
+    view = truncate_ranked(data, limit=3)
+    assert view["results"] == [{"n": 0}, {"n": 1}, {"n": 2}]
+    assert view["total_results"] == 10 and view["truncated"]
+    assert len(data["results"]) == 10
+    assert truncate_ranked({"status": "error"}, limit=3) == {"status": "error"}
+
+@pytest.mark.slow
+def test_rank_100k_candidates():
+    """Benchmark: ranking 100k candidates takes under a second and scales near-linearly from 10k"""
+    rng = random.Random(3)
+    roles = ["Software Engineer", "Technical Recruiter", "Engineering Manager", "Designer", "VP Sales", "Analyst"]
+    people = [{"name": f"p{i}", "profile_url": f"https://www.linkedin.com/in/p{i}",
+               "role": f"{rng.choice(roles)} at Company{i % 5000}", "location": rng.choice(["Seattle, WA", "Austin, TX"]),
+               "connection_level": rng.choice((1, 2, 3)),
+               "mutual_connections": [None] * rng.randint(0, 30)} for i in range(100000)]
+    rank_people(people[:1000], location="Seattle")
+    start = time.perf_counter()
+    rank_people(people[:10000], location="Seattle")
+    elapsed_10k = time.perf_counter() - start
+    start = time.perf_counter()
+    ranked = rank_people(people, location="Seattle")
+    elapsed = time.perf_counter() - start
+    print(f"\nranked {len(ranked)} candidates in {elapsed * 1000:.1f} ms (10k in {elapsed_10k * 1000:.1f} ms)")
+    assert len(ranked) == 100000
+    assert elapsed < 1.0
+    assert elapsed < 20 * elapsed_10k
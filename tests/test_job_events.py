@@ -0,0 +1,90 @@
+import asyncio
+import threading
+from job_events import JobEventBus, sse_message
+
+JOB = "cache/job.json"
+
+async def collect(bus, job_id, load_current, after_id=0):
+    return [record async for record in bus.subscribe(job_id, load_current, after_id) if record is not None]
+
+def test_stream_replays_and_ends_on_completion():
+    """Test that a late subscriber gets the run so far, then live events until the job completes"""
+    async def scenario():
+        bus = JobEventBus()
+        bus.on_cache_save(JOB, {"status": "processing"})
+        bus.bind(JOB)
+        bus.publish_current("people", {"network": "F", "people": [{"name": "Alice"}]})
+        stream = asyncio.create_task(collect(bus, JOB, lambda: {"status": "processing"}))
+        await asyncio.sleep(0)
+        bus.publish_current("progress", {"phase": "search", "page": 2, "people_found": 11})
+        bus.on_cache_save(JOB, {"status": "complete", "results": []})
+        return bus, await asyncio.wait_for(stream, 1)
+
+    bus, records = asyncio.run(scenario())
+    assert [r["event"] for r in records] == ["status", "progress", "people", "progress", "status"]
+    assert records[-1]["data"]["status"] == "complete"
+    assert bus.history(JOB) == [] and bus.subscriber_count(JOB) == 0
+
+def test_finished_job_yields_its_result_only():
+    """Test that subscribing to a finished job returns the stored result at once"""
+    records = asyncio.run(collect(JobEventBus(), JOB, lambda: {"status": "error", "error": "boom"}))
+    assert [(r["event"], r["data"]["status"]) for r in records] == [("status", "error")]
+
+def test_resume_after_last_event_id():
+    """Test that a reconnecting client skips events it already received"""
+    async def scenario():
+        bus = JobEventBus()
+        bus.on_cache_save(JOB, {"status": "processing"})
+        bus.publish(JOB, "people", {"people": [{"name": "Alice"}]})
+        seen = bus.history(JOB)[-1]["id"]
+        bus.publish(JOB, "people", {"people": [{"name": "Bob"}]})
+        stream = asyncio.create_task(collect(bus, JOB, lambda: {"status": "processing"}, after_id=seen))
+        await asyncio.sleep(0)
+        bus.on_cache_save(JOB, {"status": "complete"})
+        return await asyncio.wait_for(stream, 1)
+
+    records = asyncio.run(scenario())
+    assert [r["data"].get("people", [{}])[0].get("name") for r in records if r["event"] == "people"] == ["Bob"]
+
+def test_publish_from_worker_thread():
+    """Test that events published off the event loop thread still reach subscribers"""
+    async def scenario():
+        bus = JobEventBus()
+        stream = asyncio.create_task(collect(bus, JOB, lambda: {"status": "processing"}))
+        await asyncio.sleep(0)
+        worker = threading.Thread(target=bus.on_cache_save, args=(JOB, {"status": "complete"}))
+        worker.start()
+        worker.join()
+        return await asyncio.wait_for(stream, 1)
+
+    assert asyncio.run(scenario())[-1]["data"]["status"] == "complete"
+
+def test_sse_message_format():
+    """Test the SSE wire format and keep-alive comments"""
+    assert sse_message({"id": 3, "event": "people", "data": {"n": 1}}) == 'id: 3\nevent: people\ndata: {"n": 1}\n\n'
+    assert sse_message(None) == ": keep-alive\n\n"
+
+def test_long_poll_wakes_on_status_change():
+    """Test that a long-poll returns as soon as the job's status is saved, without re-reading the file"""
+    reads = []
+
+    def load_current():
+        reads.append(1)
+        return {"status": "processing"}
+
+    async def scenario():
+        bus = JobEventBus()
+        waiter = asyncio.create_task(bus.wait_for_status_change(JOB, load_current, timeout=30))
+        await asyncio.sleep(0)
+        bus.publish(JOB, "people", {"people": []})
+        bus.on_cache_save(JOB, {"status": "complete", "results": [1]})
+        return await asyncio.wait_for(waiter, 1)
+
+    assert asyncio.run(scenario()) == {"status": "complete", "results": [1]}
+    assert len(reads) == 1
+
+def test_long_poll_times_out_with_current_status():
+    """Test that a long-poll with no change returns the stored entry at the timeout"""
+    result = asyncio.run(JobEventBus().wait_for_status_change(JOB, lambda: {"status": "processing"}, timeout=0.05))
+    assert result == {"status": "processing"}
+    assert asyncio.run(JobEventBus().wait_for_status_change(JOB, lambda: {"status": "complete"}, timeout=30)) == {"status": "complete"}
@@ -0,0 +1,70 @@
+import json
+import asyncio
+import cache_store
+from cache_store import save_to_cache, load_from_cache
+from job_events import current_job
+from job_progress import JobProgressTracker, DEFAULT_TIMINGS
+
+def run_job(tracker, job_id, search_pages, people_per_page=10):
+    """Drive the progress hooks as search_and_process_connections does, for an F then an S search"""
+    async def scenario():
+        current_job.set(job_id)
+        tracker.start(job_id, searches=("F", "S"))
+        etas = [tracker.snapshot(job_id)["eta_seconds"]]
+        for network in ("F", "S"):
+            await tracker.begin_search(network, max_pages=10)
+            for _ in range(search_pages):
+                await tracker.page_done("search", 2.0, people_per_page)
+            await tracker.page_done("search", 1.0, 0)
+            await tracker.search_done(search_pages * people_per_page)
+            for _ in range(search_pages * people_per_page):
+                await tracker.profile_done(timed=network == "S")
+            etas.append(tracker.snapshot(job_id)["eta_seconds"])
+        return etas, load_from_cache(job_id)
+
+    return asyncio.run(scenario())
+
+def test_progress_is_written_into_the_processing_record(tmp_path, monkeypatch):
+    """Test that progress lands in the job's record without firing save listeners"""
+    notified = []
+    monkeypatch.setattr(cache_store, "_save_listeners", [lambda filename, data: notified.append(data["status"])])
+    job_id = str(tmp_path / "job.json")
+    save_to_cache(job_id, {"status": "processing", "company": "Acme"})
+    tracker = JobProgressTracker(str(tmp_path / "_job_timings.json"), write_interval=0)
+    etas, record = run_job(tracker, job_id, search_pages=2)
+    progress = record["progress"]
+    assert record["status"] == "processing" and record["company"] == "Acme"
+    assert progress["phase"] == "profiles" and progress["network"] == "S"
+    assert progress["profiles"] == {"done": 20, "total": 20} and progress["pages"] == {"done": 2, "max": 10}
+    assert progress["searches"] == {"done": 1, "total": 2}
+    assert progress["throughput"]["profiles_per_minute"] > 0
+    assert etas[0] > etas[1] > etas[2] == 0
+    assert notified == ["processing"]
+
+def test_finished_job_updates_timing_history(tmp_path, monkeypatch):
+    """Test that a completed job's per-page timings feed the next job's ETA"""
+    monkeypatch.setattr(cache_store, "_save_listeners", [])
+    timings_path = tmp_path / "_job_timings.json"
+    tracker = JobProgressTracker(str(timings_path), write_interval=0)
+    job_id = str(tmp_path / "job.json")
+    save_to_cache(job_id, {"status": "processing"})
+    run_job(tracker, job_id, search_pages=5)
+    tracker.on_cache_save(job_id, {"status": "complete", "results": []})
+    history = json.loads(timings_path.read_text())
+    assert history["jobs"] == 1 and history["search_pages"] == 5.0
+    assert history["seconds_per_page"]["search"] == round(11 / 6, 3)
+    assert tracker.snapshot(job_id) is None
+
+    fresh = JobProgressTracker(str(timings_path))
+    fresh.start("next", searches=("F",))
+    default = JobProgressTracker(str(tmp_path / "missing.json"))
+    default.start("next", searches=("F",))
+    expected = DEFAULT_TIMINGS["search_pages"] * DEFAULT_TIMINGS["seconds_per_page"]["search"]
+    assert default.snapshot("next")["eta_seconds"] == round(expected)
+    assert fresh.snapshot("next")["eta_seconds"] == round(5 * 11 / 6)
+
+def test_untracked_jobs_are_ignored(tmp_path):
+    """Test that the hooks do nothing for a task with no tracked job"""
+    tracker = JobProgressTracker(str(tmp_path / "_job_timings.json"))
+    asyncio.run(tracker.page_done("search", 1.0, 10))
+    assert tracker.snapshot("cache/none.json") is None
@@ -0,0 +1,74 @@
+from datetime import datetime, timedelta
+import pytest
+from name_index import NameIndex, name_similarity, soundex
+from network_graph import NetworkGraph
+
+def person(slug, name, role="", level=2, companies=()):
+    return {"name": name, "profile_url": f"https://www.linkedin.com/in/{slug}", "role": role,
+            "connection_level": level, "companies": set(companies)}
+
+@pytest.fixture
+def index():
+    index = NameIndex()
+    index.index_people([
+        person("jon", "Jonathan Smith", "Engineer at Acme", 1),
+        person("jane", "Jane Smith, PhD", "Designer at Globex", 2),
+        person("jan", "Jan Smith", "Engineer at Globex", 2),
+        person("katherine", "Katherine O'Brien", "VP Sales at Initech", 2),
+        person("zoe", "Zoë Quinn", "Recruiter", 1, companies=["acme"]),
+    ])
+    return index
+
+def test_soundex():
+    """Test standard Soundex codes"""
+    assert soundex("Robert") == soundex("Rupert") == "r163"
+    assert soundex("Ashcraft") == "a261"
+
+def test_exact_and_accent_folded_match(index):
+    """Test that normalization makes accents and credentials irrelevant"""
+    resolution = index.resolve("Zoe Quinn")
+    assert resolution.profile_url == "https://www.linkedin.com/in/zoe"
+    assert resolution.confidence == 1.0
+    assert index.resolve("Dr. Jane Smith").profile_url == "https://www.linkedin.com/in/jane"
+
+def test_fuzzy_spelling_match(index):
+    """Test that a misspelling still resolves when it is clearly the best match"""
+    assert name_similarity("catherine o'brien", "katherine o'brien") > 0.85
+    assert index.resolve("Catherine O'Brien").profile_url == "https://www.linkedin.com/in/katherine"
+
+def test_ambiguous_names_fall_back(index):
+    """Test that close candidates are reported but not resolved"""
+    resolution = index.resolve("Jan Smyth")
+    assert resolution.profile_url is None
+    assert resolution.reason in ("ambiguous", "no_confident_match")
+    assert {m["profile_url"] for m in resolution.matches[:2]} >= {"https://www.linkedin.com/in/jan"}
+
+def test_company_and_degree_scope(index):
+    """Test that scoping by company or degree disambiguates"""
+    assert index.resolve("Jan Smith", company="Globex").profile_url == "https://www.linkedin.com/in/jan"
+    assert index.resolve("Jane Smith", connection_levels=(1,)).profile_url is None
+    assert index.resolve("Zoe Quinn", company="Acme Inc").profile_url == "https://www.linkedin.com/in/zoe"
+
+def test_unknown_name(index):
+    """Test that unknown names report no confident match"""
+    resolution = index.resolve("Nobody Known")
+    assert resolution.profile_url is None
+    assert resolution.describe()["result"] == "no_confident_match"
+
+def test_reindex_on_name_change(index):
+    """Test that a changed display name replaces the old postings"""
+    index.index_person(person("jon", "Jon Smithers", "Engineer at Acme", 1))
+    assert index.resolve("Jonathan Smith", company="Acme").profile_url is None
+    assert index.resolve("Jon Smithers").profile_url == "https://www.linkedin.com/in/jon"
+
+def test_people_expired_from_graph_leave_index():
+    """Test that a person the graph expires no longer matches, fuzzily or otherwise"""
+    graph, index = NetworkGraph(), NameIndex()
+    graph.add_person_listener(index.index_person)
+    graph.add_person_removed_listener(index.remove_person)
+    graph.add_person({"name": "Katherine O'Brien", "profile_url": "https://www.linkedin.com/in/katherine"}, 2,
+                     seen_at=(datetime.now() - timedelta(days=365)).isoformat())
+    assert [m["profile_url"] for m in index.candidates("Catherine OBrien")] == ["https://www.linkedin.com/in/katherine"]
+    graph.expire(max_age_hours=24)
+    assert index.candidates("Catherine OBrien") == []
+    assert not index.gram_postings and not index.phonetic_postings
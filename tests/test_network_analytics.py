@@ -0,0 +1,72 @@
+import time
+import pytest
+
+pytest.importorskip("scipy")
+from compact_graph import synthetic_crawl
+from network_analytics import AnalyticsStore, compute_analytics, graph_from_crawl
+
+def person(slug, role, level, mutuals=()):
+    return {"name": slug.title(), "profile_url": f"https://www.linkedin.com/in/{slug}", "role": role,
+            "connection_level": level, "mutual_connections": [{"name": m.title(), "profile_url": f"https://www.linkedin.com/in/{m}"}
+                                                              for m in mutuals]}
+
+CRAWL = {"status": "complete", "timestamp": "2026-01-01T00:00:00", "results": [
+    person("alice", "Engineer at Acme", 1),
+    person("bob", "Designer at Globex", 1),
+    person("carol", "Engineer at Initech", 1),
+    person("dan", "PM at Acme", 2, ["alice", "bob"]),
+    person("erin", "Engineer at Acme", 2, ["alice"]),
+    person("fay", "Engineer at Globex", 2, ["alice"]),
+    person("gus", "Analyst at Initech", 2, ["carol"]),
+    person("hal", "Analyst at Hooli", 2, ["carol"]),
+]}
+
+def test_reach_and_bridge_scores():
+    """Test reach per company and bridge credit for sole introducers"""
+    tables = compute_analytics(graph_from_crawl(CRAWL))
+    contacts = {c["name"]: c for c in tables["contacts"]}
+    assert tables["first_degree"] == 3 and tables["second_degree"] == 5
+    assert contacts["Alice"]["second_degree_reach"] == 3
+    assert contacts["Alice"]["top_companies"][0] == {"company": "acme", "people": 2}
+    # Alice shares Dan with Bob, so she gets half of him plus all of Erin and Fay
+    assert contacts["Alice"]["bridge_score"] == 2.5
+    assert contacts["Alice"]["exclusive_reach"] == 2
+    assert contacts["Bob"]["bridge_score"] == 0.5
+    assert tables["contacts"][0]["name"] == "Alice"
+    assert [c["name"] for c in tables["company_reach"]["acme"]] == ["Alice", "Bob"]
+
+def test_company_clusters():
+    """Test that companies reached through the same contacts are clustered together"""
+    clusters = compute_analytics(graph_from_crawl(CRAWL))["clusters"]
+    companies = [sorted(c["companies"]) for c in clusters]
+    assert ["hooli", "initech"] in companies
+    assert not any("hooli" in c and "acme" in c for c in companies)
+
+def test_target_companies_limit_reach_table():
+    """Test that target companies restrict the company reach table"""
+    tables = compute_analytics(graph_from_crawl(CRAWL), target_companies=["Hooli"])
+    assert list(tables["company_reach"]) == ["hooli"]
+
+def test_store_serves_precomputed_tables(tmp_path):
+    """Test that the batch run writes tables the store serves by company"""
+    store = AnalyticsStore(str(tmp_path / "_network_analytics.json"))
+    assert store.tables() is None and store.company_reach("acme") is None
+    assert store.run({"status": "processing"}) is None
+    store.run(CRAWL)
+    assert AnalyticsStore(store.path).company_reach("ACME Inc")[0]["name"] == "Alice"
+    assert store.company_reach("unknown co") == []
+
+@pytest.mark.slow
+def test_analytics_benchmark():
+    """Benchmark: a 50k person, 500k edge network is analysed in seconds, scaling linearly from half its size"""
+    elapsed = {}
+    for edges in (250_000, 500_000):
+        graph = graph_from_crawl(synthetic_crawl(edges, mutuals_per_person=10))
+        start = time.perf_counter()
+        tables = compute_analytics(graph)
+        elapsed[edges] = time.perf_counter() - start
+    print(f"\nanalytics: {elapsed[500_000]:.2f} s for {tables['people']} people, {tables['edges']} edges, "
+          f"{tables['companies']} companies ({elapsed[250_000]:.2f} s at half the edges)")
+    assert tables["first_degree"] == 2000
+    assert elapsed[500_000] < 10
+    assert elapsed[500_000] < 4 * elapsed[250_000]
@@ -0,0 +1,111 @@
+import json
+import time
+from datetime import datetime, timedelta
+import pytest
+from network_graph import NetworkGraph, ME
+
+ALICE = {"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice?trk=1", "role": "Engineer at Acme"}
+DAVE = {"name": "Dave Brown", "profile_url": "https://www.linkedin.com/in/dave", "role": "Designer at Hooli"}
+BOB = {"name": "Bob Jones", "profile_url": "https://www.linkedin.com/in/bob/", "role": "PM at Acme",
+       "connection_level": 2, "mutual_connections": [ALICE, DAVE]}
+COMPANY_RESULT = {
+    "company": "Acme", "status": "complete", "timestamp": datetime.now().isoformat(),
+    "results": [{**ALICE, "connection_level": 1}, BOB]
+}
+
+@pytest.fixture
+def graph():
+    graph = NetworkGraph()
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    return graph
+
+def test_company_result_builds_edges(graph):
+    """Test that 1st degree people link to me and mutuals link to 2nd degree people"""
+    assert graph.stats() == {"people": 3, "edges": 4, "first_degree": 2}
+    assert "https://www.linkedin.com/in/bob" in graph.neighbours("https://www.linkedin.com/in/alice")
+    assert graph.get_person("https://www.linkedin.com/in/bob")["companies"] == ["acme"]
+
+def test_introducers_for_known_profile(graph):
+    """Test that introducers come from the index, regardless of URL variant"""
+    introducers = graph.introducers_for("https://www.linkedin.com/in/Bob?miniProfileUrn=x")
+    assert sorted(p["name"] for p in introducers) == ["Alice Smith", "Dave Brown"]
+    assert all(p["connection_level"] == 1 for p in introducers)
+
+def test_introducers_for_unknown_profile(graph):
+    """Test that unknown targets return None so the caller falls back to scraping"""
+    assert graph.introducers_for("https://www.linkedin.com/in/nobody") is None
+
+def test_incremental_update_from_cache_save(graph):
+    """Test that finished mutual connection jobs extend the index"""
+    graph.on_cache_saved("cache/mutual_connections_erin_abc.json", {
+        "status": "complete", "timestamp": datetime.now().isoformat(),
+        "target_profile_url": "https://www.linkedin.com/in/erin", "person": "Erin", "results": [ALICE]})
+    assert [p["name"] for p in graph.introducers_for("https://www.linkedin.com/in/erin")] == ["Alice Smith"]
+    # Processing markers and errors are ignored
+    graph.on_cache_saved("cache/role_search_x.json", {"status": "processing"})
+    assert graph.stats()["people"] == 4
+
+def test_newer_mutual_list_replaces_links(graph):
+    """Test that a newer full mutual list replaces older links and older results can't add them back"""
+    bob = "https://www.linkedin.com/in/bob"
+    newer = (datetime.now() + timedelta(minutes=1)).isoformat()
+    graph.add_mutuals({"profile_url": bob}, [DAVE], seen_at=newer)
+    assert [p["name"] for p in graph.introducers_for(bob)] == ["Dave Brown"]
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    graph.add_result({"status": "complete", "timestamp": COMPANY_RESULT["timestamp"], "company_name": "Acme",
+                      "target_profile_url": ALICE["profile_url"], "results": [BOB]}, "connections_through_person")
+    assert [p["name"] for p in graph.introducers_for(bob)] == ["Dave Brown"]
+    assert graph.mutuals_fetched_at(bob) == newer
+
+def test_introducers_need_a_full_mutual_list(graph):
+    """Test that a link implied by another result doesn't make the target's introducers known"""
+    graph.add_result({"status": "complete", "timestamp": COMPANY_RESULT["timestamp"], "company_name": "Acme",
+                      "target_profile_url": ALICE["profile_url"],
+                      "results": [{"name": "Erin", "profile_url": "https://www.linkedin.com/in/erin"}]},
+                     "connections_through_person")
+    assert "https://www.linkedin.com/in/erin" in graph.neighbours("https://www.linkedin.com/in/alice")
+    assert graph.introducers_for("https://www.linkedin.com/in/erin") is None
+
+def test_expire_drops_old_people_and_links(graph):
+    """Test that people and links last seen before the retention window are dropped"""
+    old = (datetime.now() - timedelta(days=30)).isoformat()
+    graph.add_mutuals({"name": "Olga", "profile_url": "https://www.linkedin.com/in/olga"},
+                      [{"name": "Oscar", "profile_url": "https://www.linkedin.com/in/oscar"}], seen_at=old)
+    assert graph.expire(max_age_hours=24) == {"people": 2, "edges": 1}
+    assert graph.get_person("https://www.linkedin.com/in/olga") is None
+    assert graph.stats() == {"people": 3, "edges": 4, "first_degree": 2}
+
+def test_find_people_by_name_and_company(graph):
+    """Test name lookup scoped by company"""
+    assert graph.find_people("bob jones", "Acme") == ["https://www.linkedin.com/in/bob"]
+    assert graph.find_people("Bob Jones", "Hooli") == []
+
+def test_load_from_cache_dir(tmp_path):
+    """Test building the index from cached results and profile entries"""
+    (tmp_path / "company_people_search_acme_1a.json").write_text(json.dumps(COMPANY_RESULT))
+    (tmp_path / "_access_stats.json").write_text("{}")
+    (tmp_path / "profiles").mkdir()
+    (tmp_path / "profiles" / "x.json").write_text(json.dumps(
+        {"profile_url": "https://www.linkedin.com/in/frank", "mutual_connections": [DAVE],
+         "timestamp": datetime.now().isoformat()}))
+    graph = NetworkGraph()
+    assert graph.load_from_cache_dir(str(tmp_path)) == 2
+    assert [p["name"] for p in graph.introducers_for("https://www.linkedin.com/in/frank")] == ["Dave Brown"]
+
+def test_introducer_lookup_is_fast():
+    """Test that an introducer lookup takes microseconds, a small fraction of scanning the graph for the same answer"""
+    graph = NetworkGraph()
+    firsts = [{"name": f"F{i}", "profile_url": f"https://www.linkedin.com/in/f{i}"} for i in range(200)]
+    for j in range(5000):
+        graph.add_mutuals({"name": f"S{j}", "profile_url": f"https://www.linkedin.com/in/s{j}"},
+                          [firsts[(j + k) % 200] for k in range(5)], seen_at=datetime.now().isoformat())
+    start = time.perf_counter()
+    for j in range(1000):
+        graph.introducers_for(f"https://www.linkedin.com/in/s{j}")
+    per_lookup = (time.perf_counter() - start) / 1000
+    start = time.perf_counter()
+    target = "https://www.linkedin.com/in/s0"
+    [key for key, linked in graph.adjacency.items() if target in linked and graph.people[key]["connection_level"] == 1]
+    scan = time.perf_counter() - start
+    assert per_lookup < 0.001
+    assert per_lookup * 10 < scan
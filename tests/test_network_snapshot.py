@@ -0,0 +1,105 @@
+import os
+import time
+from datetime import datetime
+import pytest
+
+pytest.importorskip("numpy")
+from network_graph import NetworkGraph, ME
+from compact_graph import CompactGraphBuilder, synthetic_crawl
+from network_snapshot import SnapshotStore, write_snapshot, load_snapshot
+import query_planner
+from query_planner import QueryPlanner
+
+ALICE = {"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice", "role": "Engineer at Acme"}
+BOB = {"name": "Bøb Jones", "profile_url": "https://www.linkedin.com/in/bob", "role": "PM at Acme",
+       "location": "Seattle", "connection_level": 2, "mutual_connections": [ALICE]}
+COMPANY_RESULT = {"company": "Acme", "status": "complete", "timestamp": datetime.now().isoformat(),
+                  "results": [{**ALICE, "connection_level": 1}, BOB]}
+
+def build(result=COMPANY_RESULT, query_name="company_people_search"):
+    builder = CompactGraphBuilder()
+    builder.add_result(result, query_name)
+    return builder.build()
+
+def test_round_trip(tmp_path):
+    """Test that a mapped snapshot answers exactly like the graph it was written from"""
+    path = str(tmp_path / "_network_snapshot.bin")
+    graph = build()
+    size = write_snapshot(graph, path)
+    loaded = load_snapshot(path)
+    assert size % 8 == 0
+    assert loaded.stats()["people"] == graph.stats()["people"] == 2
+    assert loaded.edge_count == graph.edge_count
+    assert loaded.get_person("https://www.linkedin.com/in/bob") == graph.get_person("https://www.linkedin.com/in/bob")
+    assert loaded.introducers_for("https://www.linkedin.com/in/bob")[0]["name"] == "Alice Smith"
+    assert loaded.mutuals_fetched_at("https://www.linkedin.com/in/bob") == graph.mutuals_fetched_at(
+        "https://www.linkedin.com/in/bob")
+    assert loaded.introducers_for("https://www.linkedin.com/in/alice") is None
+    assert loaded.neighbours(ME) == ["https://www.linkedin.com/in/alice"]
+    assert loaded.built_at
+
+def test_missing_or_corrupt_snapshot(tmp_path):
+    """Test that an absent or foreign file is ignored rather than raising"""
+    assert load_snapshot(str(tmp_path / "missing.bin")) is None
+    (tmp_path / "bad.bin").write_bytes(b"not a snapshot at all, just some bytes....")
+    assert load_snapshot(str(tmp_path / "bad.bin")) is None
+
+def test_store_save_replaces_snapshot(tmp_path):
+    """Test that saving the live graph swaps the store to the new file"""
+    store = SnapshotStore(str(tmp_path / "_network_snapshot.bin"))
+    assert store.load() is None and store.stats() is None
+    graph = NetworkGraph()
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    store.save(graph)
+    assert store.stats()["people"] == 2
+    first = store.loaded_path
+    assert first != store.path
+    # The mapped file is never replaced in place: a new version is written and the old one removed
+    graph.add_person({"name": "Carol", "profile_url": "https://www.linkedin.com/in/carol"}, 2)
+    store.save(graph)
+    assert store.stats()["people"] == 3
+    assert store.versions() == [store.loaded_path] and store.loaded_path != first
+    assert SnapshotStore(store.path).load().person_count == store.graph.person_count
+
+def test_save_prunes_leftover_versions(tmp_path):
+    """Test that versions left by earlier runs are deleted when a new snapshot is written"""
+    store = SnapshotStore(str(tmp_path / "_network_snapshot.bin"))
+    for version in (1, 2):
+        (tmp_path / f"_network_snapshot.{version}.bin").write_bytes(b"left over from a crashed run")
+    graph = NetworkGraph()
+    graph.add_result(COMPANY_RESULT, "company_people_search")
+    store.save(graph)
+    assert store.versions() == [store.loaded_path]
+    assert not [name for name in os.listdir(tmp_path) if name.endswith(".tmp")]
+
+def test_planner_uses_snapshot_until_graph_is_ready(tmp_path, monkeypatch):
+    """Test that introducer lookups are served from the snapshot before the graph has loaded"""
+    store = SnapshotStore(str(tmp_path / "_network_snapshot.bin"))
+    write_snapshot(build(), store.path)
+    store.load()
+    monkeypatch.setattr(query_planner, "snapshot_store", store)
+    monkeypatch.setattr(query_planner, "network_graph", NetworkGraph())
+    plan = QueryPlanner()._graph_introducers("https://www.linkedin.com/in/bob", None, None)
+    assert plan.strategy == "graph_snapshot"
+    assert [p["name"] for p in plan.results] == ["Alice Smith"]
+    query_planner.network_graph.ready = True
+    assert QueryPlanner()._graph_introducers("https://www.linkedin.com/in/bob", None, None) is None
+
+@pytest.mark.slow
+def test_snapshot_loads_instantly(tmp_path):
+    """Benchmark: mapping a 200k edge snapshot and answering a query takes milliseconds, far less than a rebuild"""
+    path = str(tmp_path / "_network_snapshot.bin")
+    crawl = synthetic_crawl(200_000)
+    start = time.perf_counter()
+    compact = build(crawl, "entire_network_crawl")
+    rebuild_ms = (time.perf_counter() - start) * 1000
+    write_snapshot(compact, path)
+    start = time.perf_counter()
+    loaded = load_snapshot(path)
+    introducers = loaded.introducers_for("https://www.linkedin.com/in/second-123")
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    print(f"\nsnapshot load + first query: {elapsed_ms:.2f} ms for {loaded.edge_count} edges, "
+          f"rebuilding from the crawl {rebuild_ms:.0f} ms")
+    assert len(introducers) == 50
+    assert elapsed_ms < 50
+    assert elapsed_ms * 20 < rebuild_ms
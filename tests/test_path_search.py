@@ -0,0 +1,90 @@
+import time
+import random
+import pytest
+from network_graph import NetworkGraph, ME
+from path_search import IntroPathFinder, find_intro_paths
+
+def url(name):
+    return f"https://www.linkedin.com/in/{name}"
+
+@pytest.fixture
+def graph():
+    """You -> alice/bob (1st) -> carol (2nd) -> dave (3rd)"""
+    graph = NetworkGraph()
+    alice = {"name": "Alice", "profile_url": url("alice"), "role": "Engineer"}
+    bob = {"name": "Bob", "profile_url": url("bob"), "role": "Technical Recruiter at Acme"}
+    graph.add_mutuals({"name": "Carol", "profile_url": url("carol"), "role": "PM at Acme"}, [alice, bob])
+    graph.add_mutuals({"name": "Erin", "profile_url": url("erin")}, [bob])
+    dave = graph.add_person({"name": "Dave", "profile_url": url("dave"), "role": "CTO at Initech"}, 3)
+    graph._link(url("carol"), dave)
+    return graph
+
+def test_two_hop_paths_ranked(graph):
+    """Test that the better-connected, more relevant introducer ranks first"""
+    paths = find_intro_paths(graph, url("carol"), k=5)
+    assert [p["chain"] for p in paths] == ["You → Bob → Carol", "You → Alice → Carol"]
+    assert paths[0]["score"] > paths[1]["score"]
+    assert paths[0]["hops"] == 2
+
+def test_multi_hop_path(graph):
+    """Test that a target two introductions away is reachable"""
+    paths = find_intro_paths(graph, url("dave"), k=3)
+    assert paths[0]["chain"] == "You → Bob → Carol → Dave"
+    assert {p["chain"] for p in paths} == {"You → Bob → Carol → Dave", "You → Alice → Carol → Dave"}
+
+def test_unknown_target_returns_no_paths(graph):
+    assert find_intro_paths(graph, url("nobody")) == []
+
+def test_bidirectional_matches_unidirectional(graph):
+    """Test bidirectional Dijkstra against an exhaustive search on a random graph"""
+    rng = random.Random(7)
+    graph = NetworkGraph()
+    firsts = [{"name": f"F{i}", "profile_url": url(f"f{i}")} for i in range(30)]
+    for j in range(200):
+        graph.add_mutuals({"name": f"S{j}", "profile_url": url(f"s{j}")}, rng.sample(firsts, rng.randint(1, 4)))
+    finder = IntroPathFinder(graph)
+    for j in range(0, 200, 17):
+        cost, path = finder.shortest_path(ME, url(f"s{j}"))
+        best = min(finder.path_cost([ME, f, url(f"s{j}")]) for f in graph.neighbours(url(f"s{j}")))
+        assert cost == pytest.approx(best)
+        assert path[0] == ME and path[-1] == url(f"s{j}")
+
+def test_local_network_finds_the_same_paths(graph):
+    """Test that searching a copy of the target's neighbourhood ranks the same chains as the whole graph"""
+    for target in (url("carol"), url("dave"), url("erin")):
+        local = IntroPathFinder(graph, target=target)
+        assert ME in local.adjacency and url("alice") in local.adjacency
+        assert local.top_k_paths(target, 5) == IntroPathFinder(graph).top_k_paths(target, 5)
+    assert url("erin") not in IntroPathFinder(graph, target=url("dave")).adjacency
+
+@pytest.mark.slow
+def test_benchmark_top_k_on_large_graph():
+    """Benchmark: top-5 intro chains answer in milliseconds with 300k+ edges, searching a small neighbourhood"""
+    rng = random.Random(42)
+    graph = NetworkGraph()
+    first_degree = [url(f"f{i}") for i in range(2000)]
+    for key in first_degree:
+        graph.people[key] = {"name": key, "role": "", "connection_level": 1}
+        graph.adjacency[key] = {ME}
+        graph.adjacency[ME].add(key)
+    for j in range(100000):
+        key = url(f"s{j}")
+        graph.people[key] = {"name": key, "role": "", "connection_level": 2}
+        graph.adjacency[key] = set(rng.sample(first_degree, 3))
+        for f in graph.adjacency[key]:
+            graph.adjacency[f].add(key)
+    assert graph.edge_count >= 300000
+
+    timings, searched = [], []
+    for j in rng.sample(range(100000), 20):
+        start = time.perf_counter()
+        paths = find_intro_paths(graph, url(f"s{j}"), k=5)
+        timings.append(time.perf_counter() - start)
+        assert paths
+        searched.append(len(IntroPathFinder(graph, target=url(f"s{j}")).adjacency))
+    timings.sort()
+    median_ms = timings[len(timings) // 2] * 1000
+    print(f"\ntop-5 intro paths over {graph.edge_count} edges: median {median_ms:.2f} ms, max {timings[-1] * 1000:.2f} ms, "
+          f"up to {max(searched)} of {len(graph.people)} people searched")
+    assert max(searched) * 20 < len(graph.people)
+    assert median_ms < 100
@@ -0,0 +1,119 @@
+import time
+import random
+from datetime import datetime, timedelta
+import pytest
+from people_index import PeopleIndex, parse_query, title_part
+from network_graph import NetworkGraph
+
+def person(slug, role, location="", level=2, companies=()):
+    return {"name": slug.title(), "profile_url": f"https://www.linkedin.com/in/{slug}", "role": role,
+            "location": location, "connection_level": level, "companies": set(companies)}
+
+@pytest.fixture
+def index():
+    index = PeopleIndex()
+    index.index_people([
+        person("ann", "Senior Product Manager at Google", "San Francisco Bay Area", 1),
+        person("ben", "Sr. PM @ Facebook | ex-Google", "Seattle, Washington", 2),
+        person("cat", "Technical Program Manager at Stripe", "San Francisco, California", 2),
+        person("dan", "Product Manager Intern at Google", "New York, New York", 3),
+        person("eve", "Software Engineer", "Seattle, Washington", 2, companies=["stripe"]),
+    ])
+    return index
+
+def names(result):
+    return [p["name"] for p in result["results"]]
+
+def test_title_part_and_abbreviations():
+    """Test that only the title half of a headline is indexed and abbreviations expand"""
+    assert title_part("Sr. PM @ Facebook | ex-Google") == "Sr. PM"
+    assert parse_query("sr pm") == [[("senior", False, False), ("product", False, False), ("manager", False, False)]]
+
+def test_company_query_uses_aliases(index):
+    """Test that company postings are canonical, so Meta finds a Facebook headline"""
+    assert names(index.search(company="Meta")) == ["Ben"]
+    assert names(index.search(company="Stripe, Inc.")) == ["Cat", "Eve"]
+
+def test_boolean_title_queries(index):
+    """Test AND within a group, OR between groups and negation"""
+    assert names(index.search(title="product manager")) == ["Ann", "Ben", "Dan"]
+    assert names(index.search(title="product manager -intern")) == ["Ann", "Ben"]
+    assert names(index.search(title="senior pm OR software engineer")) == ["Ann", "Ben", "Eve"]
+
+def test_prefix_queries(index):
+    """Test prefix matching on title, location and company"""
+    assert names(index.search(title="prog*")) == ["Cat"]
+    assert names(index.search(location="sea*")) == ["Ben", "Eve"]
+    assert names(index.search(company="goo*")) == ["Ann", "Dan"]
+
+def test_fields_are_anded_and_sorted_by_level(index):
+    """Test that field queries combine and closer connections come first"""
+    result = index.search(company="google", title="manager", location="san francisco")
+    assert names(result) == ["Ann"]
+    assert names(index.search(title="manager", connection_levels=[2])) == ["Ben", "Cat"]
+    assert index.search(title="manager", limit=1)["total"] == 4
+
+def test_reindex_on_role_change(index):
+    """Test that updated people move postings instead of being duplicated"""
+    index.index_person(person("eve", "Engineering Manager at Stripe", "Seattle, Washington", 2))
+    assert names(index.search(title="software")) == []
+    assert names(index.search(title="em")) == ["Eve"]
+
+def test_graph_feeds_index():
+    """Test that people added to the network graph are indexed through the listener"""
+    graph, index = NetworkGraph(), PeopleIndex()
+    graph.add_person_listener(index.index_person)
+    graph.add_result({"company": "Acme", "status": "complete", "timestamp": "2026-01-01T00:00:00",
+                      "results": [{"name": "Zoe", "profile_url": "https://www.linkedin.com/in/zoe",
+                                   "role": "Recruiter", "connection_level": 1}]}, "company_people_search")
+    assert names(index.search(company="acme", title="recruiter")) == ["Zoe"]
+
+def test_people_expired_from_graph_leave_index():
+    """Test that a person the graph expires is no longer returned by the index"""
+    graph, index = NetworkGraph(), PeopleIndex()
+    graph.add_person_listener(index.index_person)
+    graph.add_person_removed_listener(index.remove_person)
+    graph.add_result({"company": "Acme", "status": "complete", "timestamp": datetime.now().isoformat(),
+                      "results": [{"name": "Zoe", "profile_url": "https://www.linkedin.com/in/zoe",
+                                   "role": "Recruiter", "connection_level": 1}]}, "company_people_search")
+    graph.people["https://www.linkedin.com/in/zoe"]["seen_at"] = (datetime.now() - timedelta(days=365)).isoformat()
+    graph.expire(max_age_hours=24)
+    assert names(index.search(company="acme", title="recruiter")) == []
+    assert len(index) == 0 and not index.postings["company"]
+
+@pytest.mark.slow
+def test_query_latency_at_100k_people():
+    """Benchmark: selective boolean and prefix queries over 100k people stay under a millisecond"""
+    rng = random.Random(7)
+    companies = [f"company{i}" for i in range(2000)]
+    titles = ["Software Engineer", "Senior Product Manager", "Recruiter", "Data Scientist", "Designer",
+              "Engineering Manager", "Sales Director", "Technical Program Manager", "Staff Engineer", "Analyst"]
+    cities = ["Seattle, Washington", "San Francisco, California", "New York, New York", "London, England",
+              "Austin, Texas", "Bangalore, India"]
+    index = PeopleIndex()
+    people = [person(f"p{i}", f"{rng.choice(titles)} at {rng.choice(companies)}", rng.choice(cities), rng.choice((1, 2, 3)))
+              for i in range(100000)]
+    for p in people:
+        index.index_person(p)
+    queries = [{"company": "company42", "title": "product manager"},
+               {"company": "company7 OR company8", "title": "engineer -staff", "location": "seattle"},
+               {"company": "company1999", "title": "recruit*"},
+               {"company": "company123", "location": "san*"}]
+    for query in queries:
+        index.search(**query)
+    timings = []
+    for _ in range(50):
+        for query in queries:
+            start = time.perf_counter()
+            index.search(**query)
+            timings.append(time.perf_counter() - start)
+    timings.sort()
+    median_ms = timings[len(timings) // 2] * 1000
+    # What answering without the index costs: one pass over everyone's headline
+    start = time.perf_counter()
+    [p for p in people if "company42" in p["role"].lower() and "product manager" in p["role"].lower()]
+    scan_ms = (time.perf_counter() - start) * 1000
+    print(f"\npeople index over {len(index)} people: median {median_ms:.3f} ms, p95 {timings[int(len(timings) * 0.95)] * 1000:.3f} ms, "
+          f"scan {scan_ms:.1f} ms")
+    assert median_ms < 1
+    assert median_ms * 10 < scan_ms
@@ -0,0 +1,56 @@
+import time
+import asyncio
+import pytest
+from profile_cache import MutualConnectionsCache
+
+MUTUALS = [{"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice"}]
+
+@pytest.fixture
+def profile_cache(tmp_path):
+    """Profile cache in a temporary directory"""
+    return MutualConnectionsCache(str(tmp_path / "profiles"), ttl_hours=1)
+
+def test_miss_then_hit(profile_cache):
+    """Test that a stored profile is served on the next lookup"""
+    assert profile_cache.get("https://www.linkedin.com/in/bob") is None
+    profile_cache.put("https://www.linkedin.com/in/bob", MUTUALS)
+    assert profile_cache.get("https://www.linkedin.com/in/bob") == MUTUALS
+    assert profile_cache.stats()["hits"] == 1
+    assert profile_cache.stats()["misses"] == 1
+
+def test_lookup_uses_canonical_profile_url(profile_cache):
+    """Test that URL variants of the same profile share an entry"""
+    profile_cache.put("https://www.linkedin.com/in/Bob/?miniProfileUrn=123", MUTUALS)
+    assert profile_cache.get("https://uk.linkedin.com/in/bob") == MUTUALS
+
+def test_empty_mutual_list_is_cached(profile_cache):
+    """Test that profiles without mutuals are not re-fetched"""
+    profile_cache.put("https://www.linkedin.com/in/carol", [])
+    assert profile_cache.get("https://www.linkedin.com/in/carol") == []
+
+def test_entries_expire_after_ttl(profile_cache):
+    """Test that entries older than the TTL are treated as misses"""
+    profile_cache.put("https://www.linkedin.com/in/bob", MUTUALS)
+    profile_cache._memory["https://www.linkedin.com/in/bob"]["fetched_at"] = time.time() - 7200
+    assert profile_cache.get("https://www.linkedin.com/in/bob") is None
+    assert profile_cache.get_entry("https://www.linkedin.com/in/bob") is None
+
+def test_entries_survive_restart(profile_cache):
+    """Test that entries are persisted to disk"""
+    profile_cache.put("https://www.linkedin.com/in/bob", MUTUALS)
+    reloaded = MutualConnectionsCache(profile_cache.cache_dir, ttl_hours=1)
+    assert reloaded.get("https://www.linkedin.com/in/bob") == MUTUALS
+
+def test_memory_is_bounded_lru(tmp_path):
+    """Test that only the most recently used entries stay in memory; older ones are read back from disk"""
+    cache = MutualConnectionsCache(str(tmp_path / "profiles"), ttl_hours=1, memory_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put(f"https://www.linkedin.com/in/{name}", MUTUALS)
+    assert list(cache._memory) == ["https://www.linkedin.com/in/b", "https://www.linkedin.com/in/c"]
+    assert cache.get("https://www.linkedin.com/in/a") == MUTUALS
+    assert list(cache._memory) == ["https://www.linkedin.com/in/c", "https://www.linkedin.com/in/a"]
+
+def test_async_access(profile_cache):
+    """Test that the async variants store and serve entries"""
+    asyncio.run(profile_cache.put_async("https://www.linkedin.com/in/bob", MUTUALS))
+    assert asyncio.run(profile_cache.get_async("https://www.linkedin.com/in/bob")) == MUTUALS
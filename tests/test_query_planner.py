@@ -0,0 +1,122 @@
+import pytest
+from datetime import datetime, timedelta
+import cache_store
+import query_planner
+from cache_store import get_cache_filename, save_to_cache
+from profile_cache import MutualConnectionsCache
+from network_graph import NetworkGraph
+from query_planner import QueryPlanner, mentions
+
+CRAWL_PEOPLE = [
+    {"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice?mini=1", "role": "Engineer at Acme",
+     "location": "Seattle", "connection_level": 1},
+    {"name": "Bob Jones", "profile_url": "https://www.linkedin.com/in/bob/", "role": "Product Manager at Acme Corp",
+     "location": "Boston", "connection_level": 2,
+     "mutual_connections": [{"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice"}]},
+    {"name": "Carol White", "profile_url": "https://www.linkedin.com/in/carol", "role": "Recruiter at Globex",
+     "location": "Austin", "connection_level": 2, "mutual_connections": []},
+]
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """Point the cache at a temporary directory"""
+    monkeypatch.setattr(cache_store, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(query_planner, "mutual_connections_cache", MutualConnectionsCache(str(tmp_path / "profiles")))
+    monkeypatch.setattr(query_planner, "network_graph", NetworkGraph())
+    return tmp_path
+
+def save_crawl(people=CRAWL_PEOPLE, age_hours=1):
+    timestamp = (datetime.now() - timedelta(hours=age_hours)).isoformat()
+    save_to_cache(get_cache_filename("entire_network_crawl"),
+                  {"status": "complete", "timestamp": timestamp, "results": people})
+
+def test_mentions_matches_whole_words():
+    """Test that company and role terms match whole words only"""
+    assert mentions("Product Manager at Acme Corp", "acme")
+    assert mentions("Senior Product Manager", "product manager")
+    assert not mentions("Engineer at Acmeville", "Acme")
+    assert not mentions("", "Acme")
+
+def test_company_search_without_cache_scrapes(cache_dir):
+    """Test that an empty cache falls back to scraping"""
+    plan = QueryPlanner().plan_company_search("Acme")
+    assert plan.strategy == "scrape"
+    assert not plan.is_complete
+
+def test_company_search_crawl_matches_are_local(cache_dir):
+    """Test that a fresh crawl's headline matches come back straight away but the company is still scraped"""
+    save_crawl()
+    plan = QueryPlanner().plan_company_search("Acme")
+    assert not plan.is_complete
+    assert plan.strategy == "scrape" and plan.results == []
+    assert [p["name"] for p in plan.local_matches] == ["Alice Smith", "Bob Jones"]
+    summary = plan.describe()
+    assert summary["data_age_seconds"] >= 3600
+    assert summary["sources"][0]["cache_file"].endswith("entire_network_crawl.json")
+
+def test_stale_crawl_is_ignored(cache_dir):
+    """Test that datasets older than the max age are not used"""
+    save_crawl(age_hours=10)
+    plan = QueryPlanner(max_age_hours=5).plan_company_search("Acme")
+    assert plan.strategy == "scrape"
+
+def test_role_search_scrapes_only_missing_network(cache_dir):
+    """Test that a cached company search leaves only the 3rd degree to scrape"""
+    save_to_cache(get_cache_filename("company_people_search", company="Acme"),
+                  {"status": "complete", "timestamp": datetime.now().isoformat(), "results": CRAWL_PEOPLE[:2]})
+    plan = QueryPlanner().plan_role_search("Product Manager", "Acme")
+    assert plan.strategy == "company_search_filter"
+    assert plan.missing_networks == ["T"]
+    assert not plan.is_complete
+    assert [p["name"] for p in plan.results] == ["Bob Jones"]
+
+def test_mutual_connections_joined_from_crawl(cache_dir):
+    """Test that stored mutuals of a 2nd degree person answer an introduction query"""
+    save_crawl()
+    plan = QueryPlanner().plan_mutual_connections(profile_url="https://www.linkedin.com/in/bob")
+    assert plan.is_complete
+    assert plan.strategy == "network_crawl_join"
+    assert plan.results[0]["name"] == "Alice Smith"
+
+    by_name = QueryPlanner().plan_mutual_connections(person="bob jones", company="Acme")
+    assert by_name.is_complete
+
+def test_mutual_connections_for_unknown_person_scrapes(cache_dir):
+    """Test that people without stored mutuals still need a scrape"""
+    save_crawl()
+    plan = QueryPlanner().plan_mutual_connections(profile_url="https://www.linkedin.com/in/alice")
+    assert plan.strategy == "scrape"
+
+def test_mutual_connections_from_profile_cache(cache_dir):
+    """Test that a profile fetched by an earlier job answers without any dataset"""
+    query_planner.mutual_connections_cache.put("https://www.linkedin.com/in/dave", [{"name": "Alice Smith"}])
+    plan = QueryPlanner().plan_mutual_connections(profile_url="https://www.linkedin.com/in/Dave/?trk=x")
+    assert plan.is_complete
+    assert plan.strategy == "profile_cache"
+    assert plan.results == [{"name": "Alice Smith"}]
+
+def test_mutual_connections_from_graph_index(cache_dir):
+    """Test that a target known to the network graph is answered from the index"""
+    timestamp = datetime.now().isoformat()
+    query_planner.network_graph.add_result(
+        {"status": "complete", "timestamp": timestamp, "company": "Acme", "results": CRAWL_PEOPLE},
+        "company_people_search")
+    plan = QueryPlanner().plan_mutual_connections(person="Bob Jones", company="Acme")
+    assert plan.strategy == "graph_index"
+    assert [p["name"] for p in plan.results] == ["Alice Smith"]
+    assert plan.sources[0]["timestamp"] == timestamp
+
+def test_graph_index_needs_a_fresh_full_mutual_list(cache_dir):
+    """Test that incidental links or an old mutual list don't answer from the graph"""
+    graph = query_planner.network_graph
+    graph.add_result({"status": "complete", "timestamp": "2020-01-01T00:00:00", "company_name": "Acme",
+                      "target_profile_url": "https://www.linkedin.com/in/alice", "results": [
+                          {"name": "Erin", "profile_url": "https://www.linkedin.com/in/erin"}]},
+                     "connections_through_person")
+    assert graph.introducers_for("https://www.linkedin.com/in/erin") is None
+    assert QueryPlanner()._graph_introducers("https://www.linkedin.com/in/erin", None, None) is None
+    graph.add_mutuals({"profile_url": "https://www.linkedin.com/in/erin"},
+                      [{"name": "Alice Smith", "profile_url": "https://www.linkedin.com/in/alice"}],
+                      seen_at=(datetime.now() - timedelta(hours=48)).isoformat())
+    assert graph.introducers_for("https://www.linkedin.com/in/erin")
+    assert QueryPlanner(max_age_hours=24)._graph_introducers("https://www.linkedin.com/in/erin", None, None) is None
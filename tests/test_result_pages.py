@@ -0,0 +1,107 @@
+import json
+import pytest
+from result_pages import ResultView, ParsedResultCache, project_person, content_etag, etag_matches, estimate_tokens
+
+DOC = {"status": "complete", "timestamp": "2026-01-01T00:00:00", "company": "Acme",
+       "results": [{"name": f"Person {i}", "profile_url": f"https://www.linkedin.com/in/p{i}", "role": "Engineer",
+                    "mutual_connections": [{"name": "Alice"}] * i} for i in range(5)]}
+
+def test_default_view_keeps_top_ranked_truncation():
+    """Test that without paging parameters the response is the usual top-ranked view"""
+    assert ResultView().apply(DOC) is DOC
+
+def test_pages_follow_cursor_to_the_end():
+    """Test that limit and next_cursor walk the whole result exactly once"""
+    seen, cursor = [], None
+    while True:
+        page = ResultView(limit=2, cursor=cursor).apply(DOC)
+        seen += [p["name"] for p in page["results"]]
+        assert page["total_results"] == 5 and page["company"] == "Acme"
+        cursor = page["next_cursor"]
+        if cursor is None:
+            assert page["truncated"] is False
+            break
+    assert seen == [f"Person {i}" for i in range(5)]
+    assert len(DOC["results"]) == 5 and "mutual_connections" in DOC["results"][4]
+
+def test_fields_and_mutual_counts():
+    """Test field projection and collapsing mutual lists into counts"""
+    page = ResultView.from_params(fields="name, profile_url", limit=10).apply(DOC)
+    assert page["results"][3] == {"name": "Person 3", "profile_url": "https://www.linkedin.com/in/p3", "mutual_count": 3}
+    page = ResultView(include_mutuals=False).apply(DOC)
+    assert "mutual_connections" not in page["results"][2] and page["results"][2]["role"] == "Engineer"
+    assert project_person(DOC["results"][1], ["name", "mutual_connections"], True)["mutual_connections"] == [{"name": "Alice"}]
+
+def big_doc(people=2000, mutuals=40):
+    return {"status": "complete", "timestamp": "2026-01-01T00:00:00", "company": "Acme",
+            "plan": {"strategy": "cache", "data_age_seconds": 12.0, "sources": [{"cache_file": "x"}] * 50},
+            "results": [{"name": f"Person {i}", "profile_url": f"https://www.linkedin.com/in/p{i}",
+                         "role": "Staff Engineer " * 30, "connection_level": 2, "rank_score": 0.5,
+                         "role_class": {"engineer": True},
+                         "mutual_connections": [{"name": f"Mutual {j}", "profile_url": f"/in/m{j}"}
+                                                for j in range(mutuals)]} for i in range(people)]}
+
+def test_compacted_result_fits_token_budget():
+    """Test that max_tokens keeps the response within budget whatever the stored result's size"""
+    doc = big_doc()
+    for budget in (500, 2000, 8000):
+        page = ResultView(max_tokens=budget).apply(doc, "cache/acme.json")
+        assert estimate_tokens(page) <= budget
+        assert page["estimated_tokens"] >= estimate_tokens(page) - 5
+    page = ResultView(max_tokens=2000).apply(doc, "cache/acme.json")
+    person = page["results"][0]
+    assert person["mutual_count"] == 40 and person["top_mutuals"] == ["Mutual 0", "Mutual 1", "Mutual 2"]
+    assert len(person["role"]) <= 160 and "role_class" not in person
+    assert page["job_id"] == "cache/acme.json" and page["data_age_seconds"] == 12.0 and "plan" not in page
+    assert page["truncated"] and page["total_results"] == 2000
+
+def test_compacted_pages_follow_the_handle():
+    """Test that next_cursor from a compacted page continues where it stopped"""
+    doc = big_doc(people=30, mutuals=2)
+    seen, cursor = [], None
+    while True:
+        page = ResultView(max_tokens=600, cursor=cursor).apply(doc)
+        assert page["returned"] >= 1
+        seen += [p["name"] for p in page["results"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [f"Person {i}" for i in range(30)]
+
+def test_compaction_leaves_unfinished_jobs_alone():
+    """Test that processing and error entries are returned as stored"""
+    processing = {"status": "processing", "progress": {"phase": "search"}}
+    assert ResultView(max_tokens=100).apply(processing) is processing
+
+def test_stale_or_bad_cursor_is_rejected():
+    """Test that a cursor from another version of the result is refused"""
+    cursor = ResultView(limit=2).apply(DOC)["next_cursor"]
+    updated = {**DOC, "timestamp": "2026-02-01T00:00:00"}
+    with pytest.raises(ValueError):
+        ResultView(limit=2, cursor=cursor).apply(updated)
+    with pytest.raises(ValueError):
+        ResultView(cursor="not-a-cursor").apply(DOC)
+
+def test_parsed_result_cache_reuses_until_file_changes(tmp_path):
+    """Test that a document is parsed once and re-read after it is rewritten"""
+    path = tmp_path / "job.json"
+    path.write_text(json.dumps({"status": "processing"}))
+    cache = ParsedResultCache(size=1)
+    first = cache.load(str(path))
+    assert cache.load(str(path)) is first
+    path.write_text(json.dumps(DOC))
+    assert cache.load(str(path))["status"] == "complete"
+    assert cache.load(str(tmp_path / "missing.json")) is None
+
+def test_content_etag_tracks_file_version_and_query(tmp_path):
+    """Test that ETags change with the file or the query and match If-None-Match (weakly)"""
+    path = tmp_path / "job.json"
+    path.write_text(json.dumps({"status": "processing"}))
+    etag = content_etag(str(path), "/job_status?limit=10")
+    assert etag.startswith('W/"') and etag == content_etag(str(path), "/job_status?limit=10")
+    assert etag != content_etag(str(path), "/job_status?limit=20")
+    assert etag_matches(f'"other", {etag}', etag) and etag_matches(etag[2:], etag) and etag_matches("*", etag)
+    assert not etag_matches('"other"', etag) and not etag_matches(None, etag)
+    path.write_text(json.dumps({"status": "complete", "results": []}))
+    assert content_etag(str(path), "/job_status?limit=10") != etag
+    assert content_etag(str(tmp_path / "missing.json")) is None
@@ -0,0 +1,56 @@
+import pytest
+from role_classifier import classify_role, normalize_title, role_query_filters
+from people_index import PeopleIndex
+from query_planner import has_role
+
+@pytest.mark.parametrize("headline,seniority,function,recruiter,hiring_manager", [
+    ("Senior Technical Recruiter at Google", "senior", "recruiting", True, False),
+    ("Head of Talent Acquisition", "director", "recruiting", True, False),
+    ("Engineering Manager at Stripe", "manager", "engineering", False, True),
+    ("Sr. PM @ Meta", "senior", "product", False, False),
+    ("Principal Product Manager", "lead", "product", False, False),
+    ("VP of Engineering", "vp", "engineering", False, True),
+    ("Co-Founder & CEO", "cxo", "executive", False, True),
+    ("HR Business Partner", "mid", "hr", False, False),
+    ("Data Scientist | ex-Amazon", "mid", "data", False, False),
+    ("Software Engineering Intern", "intern", "engineering", False, False),
+    ("", "unknown", "other", False, False),
+])
+def test_classify_role(headline, seniority, function, recruiter, hiring_manager):
+    """Test seniority, function and flags for common headline shapes"""
+    role_class = classify_role(headline)
+    assert (role_class["seniority"], role_class["function"]) == (seniority, function)
+    assert role_class["is_recruiter"] is recruiter
+    assert role_class["is_hiring_manager"] is hiring_manager
+
+def test_normalize_title():
+    """Test that only the title is kept, with abbreviations expanded"""
+    assert normalize_title("Sr. SWE @ Stripe | ex-Google") == "senior software engineer"
+    assert normalize_title("VP of Engineering at Acme") == "vp engineering"
+
+def test_role_query_filters():
+    """Test that classification queries become label filters and titles stay free text"""
+    assert role_query_filters("Recruiters") == {"recruiter": True}
+    assert role_query_filters("hiring managers") == {"hiring_manager": True}
+    assert role_query_filters("engineering directors") == {"seniority": "director", "function": "engineering"}
+    assert role_query_filters("product managers") is None
+    assert role_query_filters("software engineer") is None
+
+def test_index_label_search():
+    """Test that indexed classifications answer recruiter and hiring manager queries in one lookup"""
+    index = PeopleIndex()
+    index.index_people([
+        {"name": "Rita", "profile_url": "u/rita", "role": "Technical Recruiter at Acme", "connection_level": 2},
+        {"name": "Hank", "profile_url": "u/hank", "role": "Director of Engineering at Acme", "connection_level": 2},
+        {"name": "Ivy", "profile_url": "u/ivy", "role": "Software Engineer at Acme", "connection_level": 1},
+    ])
+    assert [p["name"] for p in index.search(company="acme", recruiter=True)["results"]] == ["Rita"]
+    assert [p["name"] for p in index.search(hiring_manager=True)["results"]] == ["Hank"]
+    assert [p["name"] for p in index.search(function="engineering", seniority="mid OR director")["results"]] == ["Ivy", "Hank"]
+    assert index.search(recruiter=True)["results"][0]["role_class"]["function"] == "recruiting"
+
+def test_has_role():
+    """Test that cached-data role filters understand plural and classification queries"""
+    assert has_role("Senior Technical Recruiter at Acme", "recruiters")
+    assert not has_role("Recruiting Coordinator Intern", "hiring manager")
+    assert has_role("Product Manager at Acme", "product manager")
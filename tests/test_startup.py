@@ -0,0 +1,119 @@
+import os
+import ast
+import sys
+import json
+import time
+import asyncio
+import subprocess
+from types import SimpleNamespace
+import pytest
+from assistant_manager import AssistantResolver, ASSISTANT_CONFIG_VERSION
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class NotFound(Exception):
+    status_code = 404
+
+def fake_client(retrieve, updates=None):
+    assistants = SimpleNamespace(retrieve=retrieve, create=lambda **kwargs: SimpleNamespace(id="asst_new"),
+                                 update=lambda assistant_id, **kwargs: updates.append((assistant_id, kwargs)))
+    return SimpleNamespace(beta=SimpleNamespace(assistants=assistants))
+
+def offline(*args):
+    raise ConnectionError("offline")
+
+def import_in_subprocess(code, tmp_path):
+    env = {key: value for key, value in os.environ.items() if key != "OPENAI_API_KEY"}
+    env["LINKEDIN_CACHE_DIR"] = str(tmp_path / "cache")
+    started = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1]), (time.perf_counter() - started) * 1000
+
+def test_recently_verified_id_needs_no_network(tmp_path):
+    """Test that a stored ID verified within the TTL is used without creating a client"""
+    id_file = tmp_path / ".assistant_id"
+    id_file.write_text(f"asst_stored\n{ASSISTANT_CONFIG_VERSION}")
+    resolver = AssistantResolver(str(id_file), client_factory=lambda: pytest.fail("no client needed"))
+    assert asyncio.run(resolver.wait(1)) == "asst_stored"
+    assert resolver.status()["verified"] and resolver.status()["resolved"]
+
+def test_offline_keeps_stored_id(tmp_path):
+    """Test that a failed verification keeps the stored ID instead of deleting it"""
+    id_file = tmp_path / ".assistant_id"
+    id_file.write_text("asst_stored")
+    os.utime(id_file, (0, 0))
+    resolver = AssistantResolver(str(id_file), client_factory=lambda: fake_client(offline))
+    assert resolver.resolve() == "asst_stored"
+    assert not resolver.verified and "offline" in resolver.error
+    assert id_file.read_text() == "asst_stored"
+
+def test_unknown_assistant_is_replaced(tmp_path):
+    """Test that an ID OpenAI no longer knows is replaced by a newly created assistant"""
+    id_file = tmp_path / ".assistant_id"
+    id_file.write_text("asst_gone")
+    os.utime(id_file, (0, 0))
+
+    def retrieve(assistant_id):
+        raise NotFound(assistant_id)
+
+    resolver = AssistantResolver(str(id_file), client_factory=lambda: fake_client(retrieve))
+    assert resolver.resolve() == "asst_new"
+    assert resolver.verified and id_file.read_text().splitlines()[0] == "asst_new"
+
+def test_outdated_assistant_is_updated(tmp_path):
+    """Test that a stored assistant created with older instructions or tools is updated in place"""
+    id_file = tmp_path / ".assistant_id"
+    id_file.write_text("asst_stored")
+    updates = []
+    client = fake_client(lambda assistant_id: SimpleNamespace(id=assistant_id, metadata={}), updates)
+    resolver = AssistantResolver(str(id_file), client_factory=lambda: client)
+    assert resolver.resolve() == "asst_stored"
+    assert [assistant_id for assistant_id, _ in updates] == ["asst_stored"]
+    assert "get_more_results" in json.dumps(updates[0][1]["tools"])
+    assert resolver.stored_config_version() == ASSISTANT_CONFIG_VERSION
+    # Now current, so the next start needs no network
+    assert AssistantResolver(str(id_file), client_factory=lambda: pytest.fail("no client needed")).resolve() == "asst_stored"
+
+def test_missing_api_key_is_reported_not_raised(tmp_path):
+    """Test that without OPENAI_API_KEY the resolver finishes with an error instead of raising"""
+    resolver = AssistantResolver(str(tmp_path / ".assistant_id"), client_factory=lambda: None)
+    assert asyncio.run(resolver.wait(1)) is None
+    assert "OPENAI_API_KEY" in resolver.error
+
+def test_import_creates_no_cache_dir(tmp_path):
+    """Test that importing the cache and index modules doesn't create CACHE_DIR or import openai"""
+    code = ("import sys, json, os, cache_store, profile_cache, batch_jobs, crawl_diff, assistant_manager; "
+            "print(json.dumps([os.path.exists(cache_store.CACHE_DIR), 'openai' in sys.modules]))")
+    (cache_dir_exists, openai_imported), _ = import_in_subprocess(code, tmp_path)
+    assert not cache_dir_exists and not openai_imported
+
+def server_local_modules():
+    """The repo modules the server imports at load, read from its import statements"""
+    with open(os.path.join(ROOT, "linkedin_network_builder.py"), encoding="utf-8") as f:
+        tree = ast.parse(f.read())
+    names = [node.module if isinstance(node, ast.ImportFrom) else alias.name
+             for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom))
+             for alias in node.names]
+    return sorted({name for name in names if name and os.path.exists(os.path.join(ROOT, f"{name}.py"))})
+
+def test_server_modules_load_no_numpy_or_scipy(tmp_path):
+    """Test that the modules the server imports defer numpy and scipy to the functions that use them"""
+    modules = server_local_modules()
+    assert "network_analytics" in modules and "introducer_ranking" in modules
+    code = (f"import sys, json; import {', '.join(modules)}; "
+            "print(json.dumps(sorted(m for m in ('numpy', 'scipy') if m in sys.modules)))")
+    heavy, _ = import_in_subprocess(code, tmp_path)
+    assert heavy == []
+
+@pytest.mark.slow
+def test_server_import_time(tmp_path):
+    """Benchmark: importing the server offline, without an API key, and which heavy modules it loads"""
+    pytest.importorskip("fastapi")
+    code = ("import sys, json, time, os; started = time.perf_counter(); import linkedin_network_builder as m; "
+            "print(json.dumps([(time.perf_counter() - started) * 1000, 'playwright' in sys.modules, "
+            "'openai' in sys.modules, 'numpy' in sys.modules, os.path.exists(m.CACHE_DIR)]))")
+    (import_ms, playwright_imported, openai_imported, numpy_imported, cache_dir_exists), cold_start_ms = \
+        import_in_subprocess(code, tmp_path)
+    print(f"\nserver import {import_ms:.0f} ms, cold start (interpreter + import) {cold_start_ms:.0f} ms")
+    assert not playwright_imported and not openai_imported and not numpy_imported and not cache_dir_exists